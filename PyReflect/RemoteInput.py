@@ -45,8 +45,6 @@ TODO:
         [ ] EIOS_KillClient
         [ ] EIOS_KillZombieClients
         [ ] Reflect_GetEIOS
-    
-    [ ] Functions that still need written:
         [ ] Reflect_Object
         [ ] Reflect_IsSame_Object
         [ ] Reflect_InstanceOf
@@ -76,13 +74,218 @@ TODO:
     [x] not sure how to properly capture the bool from EIOS_HasFocus. always getting c_bool(True)
         RESOLVED: had to set `.restype` to a bool
 """
-from ctypes import *
-import getpass
-import platform
-import time
-from typing import Tuple
+import ctypes
+import os
+import sys
+import threading
+from ctypes import (
+    CDLL,
+    POINTER,
+    byref,
+    c_bool,
+    c_char,
+    c_char_p,
+    c_double,
+    c_float,
+    c_int16,
+    c_int32,
+    c_int64,
+    c_size_t,
+    c_uint8,
+    c_void_p,
+    create_string_buffer,
+)
+from enum import IntEnum
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+
+def __getattr__(name: str):
+    """
+    Key constants, VK_ESC and the rest of hex_keycodes, imported the first time one is used.
+    """
+    if name.startswith("VK_"):
+        import hex_keycodes
+
+        value = getattr(hex_keycodes, name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+class ReflectionArrayType(IntEnum):
+    """
+    Element type argument of the Reflect_Array_Index* functions.
+    """
+
+    CHAR = 0
+    BYTE = 1
+    BOOL = 2
+    SHORT = 3
+    INT = 4
+    LONG = 5
+    FLOAT = 6
+    DOUBLE = 7
+    STRING = 8
+    OBJECT = 9
+
+
+# Native prototypes as `name: (restype, argtypes)`, taken from the RemoteInput headers.
+# They are bound once when the library is loaded, never per call.
+PROTOTYPES = {
+    ## EIOS
+    "EIOS_RequestTarget": (c_void_p, [c_char_p]),
+    "EIOS_ReleaseTarget": (None, [c_void_p]),
+    "EIOS_GetTargetDimensions": (None, [c_void_p, POINTER(c_int32), POINTER(c_int32)]),
+    "EIOS_GetImageBuffer": (POINTER(c_uint8), [c_void_p]),
+    "EIOS_GetDebugImageBuffer": (POINTER(c_uint8), [c_void_p]),
+    "EIOS_SetGraphicsDebugging": (None, [c_void_p, c_bool]),
+    "EIOS_UpdateImageBuffer": (None, [c_void_p]),
+    "EIOS_HasFocus": (c_bool, [c_void_p]),
+    "EIOS_GainFocus": (None, [c_void_p]),
+    "EIOS_LoseFocus": (None, [c_void_p]),
+    "EIOS_IsInputEnabled": (c_bool, [c_void_p]),
+    "EIOS_SetInputEnabled": (None, [c_void_p, c_bool]),
+    "EIOS_GetMousePosition": (None, [c_void_p, POINTER(c_int32), POINTER(c_int32)]),
+    "EIOS_GetRealMousePosition": (None, [c_void_p, POINTER(c_int32), POINTER(c_int32)]),
+    "EIOS_MoveMouse": (None, [c_void_p, c_int32, c_int32]),
+    "EIOS_HoldMouse": (None, [c_void_p, c_int32, c_int32, c_int32]),
+    "EIOS_ReleaseMouse": (None, [c_void_p, c_int32, c_int32, c_int32]),
+    "EIOS_ScrollMouse": (None, [c_void_p, c_int32, c_int32, c_int32]),
+    "EIOS_IsMouseButtonHeld": (c_bool, [c_void_p, c_int32]),
+    "EIOS_SendString": (None, [c_void_p, c_char_p, c_int32, c_int32]),
+    "EIOS_HoldKey": (None, [c_void_p, c_int32]),
+    "EIOS_ReleaseKey": (None, [c_void_p, c_int32]),
+    "EIOS_IsKeyHeld": (c_bool, [c_void_p, c_int32]),
+    "EIOS_GetKeyboardSpeed": (c_int32, [c_void_p]),
+    "EIOS_SetKeyboardSpeed": (None, [c_void_p, c_int32]),
+    "EIOS_GetKeyboardRepeatDelay": (c_int32, [c_void_p]),
+    "EIOS_SetKeyboardRepeatDelay": (None, [c_void_p, c_int32]),
+    "EIOS_PairClient": (c_void_p, [c_int32]),
+    "EIOS_KillClientPID": (None, [c_int32]),
+    "EIOS_KillClient": (None, [c_void_p]),
+    "EIOS_KillZombieClients": (None, []),
+    "EIOS_GetClients": (c_size_t, [c_bool]),
+    "EIOS_GetClientPID": (c_int32, [c_size_t]),
+    ## Reflection
+    "EIOS_Inject": (None, [c_char_p]),
+    "EIOS_Inject_PID": (None, [c_int32]),
+    "Reflect_GetEIOS": (c_void_p, [c_int32]),
+    "Reflect_Object": (c_void_p, [c_void_p, c_void_p, c_char_p, c_char_p, c_char_p]),
+    "Reflect_IsSame_Object": (c_bool, [c_void_p, c_void_p, c_void_p]),
+    "Reflect_InstanceOf": (c_bool, [c_void_p, c_void_p, c_char_p]),
+    "Reflect_Release_Object": (None, [c_void_p, c_void_p]),
+    "Reflect_Release_Objects": (None, [c_void_p, POINTER(c_void_p), c_size_t]),
+    "Reflect_Bool": (c_bool, [c_void_p, c_void_p, c_char_p, c_char_p, c_char_p]),
+    "Reflect_Char": (c_char, [c_void_p, c_void_p, c_char_p, c_char_p, c_char_p]),
+    "Reflect_Byte": (c_uint8, [c_void_p, c_void_p, c_char_p, c_char_p, c_char_p]),
+    "Reflect_Short": (c_int16, [c_void_p, c_void_p, c_char_p, c_char_p, c_char_p]),
+    "Reflect_Int": (c_int32, [c_void_p, c_void_p, c_char_p, c_char_p, c_char_p]),
+    "Reflect_Long": (c_int64, [c_void_p, c_void_p, c_char_p, c_char_p, c_char_p]),
+    "Reflect_Float": (c_float, [c_void_p, c_void_p, c_char_p, c_char_p, c_char_p]),
+    "Reflect_Double": (c_double, [c_void_p, c_void_p, c_char_p, c_char_p, c_char_p]),
+    "Reflect_String": (
+        None,
+        [c_void_p, c_void_p, c_char_p, c_char_p, c_char_p, c_char_p, c_size_t],
+    ),
+    "Reflect_Array": (c_void_p, [c_void_p, c_void_p, c_char_p, c_char_p, c_char_p]),
+    "Reflect_Array_With_Size": (
+        c_void_p,
+        [c_void_p, c_void_p, POINTER(c_size_t), c_char_p, c_char_p, c_char_p],
+    ),
+    "Reflect_Array_Size": (c_size_t, [c_void_p, c_void_p]),
+    "Reflect_Array_Index": (c_void_p, [c_void_p, c_void_p, c_int32, c_size_t, c_size_t]),
+    "Reflect_Array_Index2D": (
+        c_void_p,
+        [c_void_p, c_void_p, c_int32, c_size_t, c_int32, c_int32],
+    ),
+    "Reflect_Array_Index3D": (
+        c_void_p,
+        [c_void_p, c_void_p, c_int32, c_size_t, c_int32, c_int32, c_int32],
+    ),
+    "Reflect_Array_Index4D": (
+        c_void_p,
+        [c_void_p, c_void_p, c_int32, c_size_t, c_int32, c_int32, c_int32, c_int32],
+    ),
+    "Reflect_Array_Indices": (
+        c_void_p,
+        [c_void_p, c_void_p, c_int32, POINTER(c_int32), c_size_t],
+    ),
+}
+
+# Bound through the cdecl handle, otherwise WinDLL raises
+# "ValueError: Procedure probably called with too many arguments (4 bytes in excess)"
+CDECL_FUNCTIONS = ("EIOS_Inject", "EIOS_Inject_PID")
+
+# file name of the library by sys.platform, libremoteinput.so anywhere else
+LIBRARY_NAMES = {"win32": "libremoteinput.dll", "darwin": "libremoteinput.dylib"}
+
+
+def default_library_path() -> str:
+    """
+    $REMOTEINPUT_LIBRARY if it is set, otherwise the library for this platform in the
+    working directory.
+    """
+    return os.environ.get("REMOTEINPUT_LIBRARY") or "./" + LIBRARY_NAMES.get(
+        sys.platform, "libremoteinput.so"
+    )
+
+
+class Library(NamedTuple):
+    path: str
+    # stdcall on Windows, the same as `cri` everywhere else
+    ri: object
+    cri: object
+    # `_<name>` -> foreign function with its prototype set, for every exported function
+    functions: Dict[str, object]
 
-from hex_keycodes import *
+
+# loaded libraries by path, shared by every RemoteInput in the process
+_libraries: Dict[str, Library] = {}
+_libraries_lock = threading.Lock()
+
+
+def _bind(ri, cri) -> Dict[str, object]:
+    """
+    Sets argtypes/restype for every entry of PROTOTYPES once.
+
+    :return: `_<name>` -> foreign function
+    """
+    functions = {}
+    for name, (restype, argtypes) in PROTOTYPES.items():
+        lib = cri if name in CDECL_FUNCTIONS else ri
+        try:
+            function = getattr(lib, name)
+        except AttributeError:
+            # older builds of libremoteinput don't export every function
+            continue
+        function.restype = restype
+        function.argtypes = argtypes
+        functions["_" + name] = function
+    return functions
+
+
+def load_library(path: Optional[str] = None) -> Library:
+    """
+    Opens libremoteinput and binds its functions, once per process and path; later calls
+    return the same Library.
+
+    :param path: see default_library_path
+    """
+    if path is None:
+        path = default_library_path()
+    # bare names are found by the loader, other paths are relative to the working directory
+    key = os.path.abspath(path) if os.path.dirname(path) else path
+    with _libraries_lock:
+        library = _libraries.get(key)
+        if library is None:
+            if sys.platform == "win32":
+                ri = ctypes.WinDLL(path)
+                # the cdecl functions through the same handle, rather than loading it again
+                cri = CDLL(path, handle=ri._handle)
+            else:
+                ri = cri = CDLL(path)
+            library = _libraries[key] = Library(path, ri, cri, _bind(ri, cri))
+    return library
 
 
 class RemoteInput:
@@ -90,33 +293,54 @@ class RemoteInput:
     This class allows for python to access RemoteInput
     """
 
-    def __init__(self):
-        if platform.system() == "Windows":
-            self.ri = WinDLL("./libremoteinput.dll")
-            self.cri = CDLL(
-                "./libremoteinput.dll"
-            )  # needed for EIOS_Inject, otherwise get
-        elif platform.system() == "Dawrin":
-            self.cri = self.ri = CDLL("./libremoteinput.dylib")
-        else:
-            self.cri = self.ri = CDLL(".libremoteinput.so")
+    def __init__(self, lib=None, path: Optional[str] = None):
+        """
+        :param lib: an already loaded library, or a stand-in like fakeclient.FakeLibrary
+        :param path: where to load libremoteinput from, see default_library_path. It is
+                     opened when first used, and only once per process, see load_library
+        """
+        self.path = path
+        # target -> number of EIOS_UpdateImageBuffer calls, lets a Frame notice it is stale
+        self.image_updates = {}
+        if lib is not None:
+            self.cri = self.ri = lib
+            self.__dict__.update(_bind(lib, lib))
+
+    @property
+    def loaded(self) -> bool:
+        return "ri" in self.__dict__
+
+    def load(self) -> "RemoteInput":
+        """
+        Loads the library now instead of on the first call.
+
+        The foreign functions are cached on the instance as `_<name>`, so calls skip the lookup.
+        """
+        if not self.loaded:
+            library = load_library(self.path)
+            self.__dict__.update(library.functions)
+            self.cri, self.ri = library.cri, library.ri
+        return self
+
+    def __getattr__(self, name: str):
+        # only called for attributes not set yet, the library and its functions before load()
+        lazy = name in ("ri", "cri") or (name.startswith("_") and name[1:] in PROTOTYPES)
+        if lazy and not self.loaded:
+            return getattr(self.load(), name)
+        raise AttributeError(f"{type(self).__name__!r} object has no attribute {name!r}")
 
     ## EIOS
     def EIOS_RequestTarget(self, initstr: str) -> c_void_p:
         """
         EIOS* EIOS_RequestTarget(const char* initargs) noexcept;
         """
-        self.ri.EIOS_RequestTarget.argtypes = [c_char_p]
-        self.ri.EIOS_RequestTarget.restype = c_void_p
-        return self.EIOS_RequestTarget(bytes(initstr, encoding="utf8"))
+        return self._EIOS_RequestTarget(bytes(initstr, encoding="utf8"))
 
     def EIOS_ReleaseTarget(self, target: c_void_p) -> None:
         """
         void EIOS_ReleaseTarget(EIOS* eios) noexcept;
         """
-        self.ri.EIOS_ReleaseTarget.argtypes = [c_void_p]
-        self.ri.EIOS_ReleaseTarget.restype = None
-        self.ri.EIOS_ReleaseTarget(target)
+        self._EIOS_ReleaseTarget(target)
 
     def EIOS_GetTargetDimensions(self, target: c_void_p):
         """
@@ -125,22 +349,16 @@ class RemoteInput:
         """
         width = c_int32()
         height = c_int32()
-        self.ri.EIOS_GetTargetDimensions.argtypes = [
-            c_void_p,
-            POINTER(c_int32),
-            POINTER(c_int32),
-        ]
-        self.ri.EIOS_GetTargetDimensions.restype = None
-        self.ri.EIOS_GetTargetDimensions(target, byref(width), byref(height))
+        self._EIOS_GetTargetDimensions(target, byref(width), byref(height))
         return [width.value, height.value]
 
     def EIOS_GetImageBuffer(self, target: c_void_p):
         """
         std::uint8_t* EIOS_GetImageBuffer(EIOS* eios) noexcept;
+
+        Returns the first pixel byte only, use frame.Frame.from_target for the whole image.
         """
-        self.ri.EIOS_GetImageBuffer.argtypes = [c_void_p]
-        self.ri.EIOS_GetImageBuffer.restype = POINTER(c_uint8)
-        buffer = self.ri.EIOS_GetImageBuffer(target)
+        buffer = self._EIOS_GetImageBuffer(target)
         return buffer.contents
         # return cast(buffer, POINTER(c_uint8)).contents
 
@@ -148,9 +366,7 @@ class RemoteInput:
         """
         std::uint8_t* EIOS_GetDebugImageBuffer(EIOS* eios) noexcept;
         """
-        self.ri.EIOS_GetDebugImageBuffer.argtypes = [c_void_p]
-        self.ri.EIOS_GetDebugImageBuffer.restype = POINTER(c_uint8)
-        buffer = self.ri.EIOS_GetDebugImageBuffer(target)
+        buffer = self._EIOS_GetDebugImageBuffer(target)
         return buffer.contents
         # return cast(buffer, POINTER(c_uint8)).contents
 
@@ -158,57 +374,44 @@ class RemoteInput:
         """
         void EIOS_SetGraphicsDebugging(EIOS* eios, bool enabled) noexcept;
         """
-        self.ri.EIOS_SetGraphicsDebugging.argtypes = [c_void_p, c_bool]
-        self.ri.EIOS_SetGraphicsDebugging.restype = None
-        self.ri.EIOS_SetGraphicsDebugging(target, enabled)
+        self._EIOS_SetGraphicsDebugging(target, enabled)
 
     def EIOS_UpdateImageBuffer(self, target: c_void_p) -> None:
         """
         void EIOS_UpdateImageBuffer(EIOS* eios) noexcept;
         """
-        self.ri.EIOS_UpdateImageBuffer.argtypes = [c_void_p]
-        self.ri.EIOS_UpdateImageBuffer.restype = None
-        self.ri.EIOS_UpdateImageBuffer(target)
+        self._EIOS_UpdateImageBuffer(target)
+        self.image_updates[target] = self.image_updates.get(target, 0) + 1
 
     def EIOS_HasFocus(self, target: c_void_p) -> bool:
         """
         bool EIOS_HasFocus(EIOS* eios) noexcept;
         """
-        self.ri.EIOS_HasFocus.argtypes = [c_void_p]
-        self.ri.EIOS_HasFocus.restype = c_bool
-        return self.ri.EIOS_HasFocus(target)
+        return self._EIOS_HasFocus(target)
 
     def EIOS_GainFocus(self, target: c_void_p) -> None:
         """
         void EIOS_GainFocus(EIOS* eios) noexcept;
         """
-        self.ri.EIOS_GainFocus.argtypes = [c_void_p]
-        self.ri.EIOS_GainFocus.restype = None
-        self.ri.EIOS_GainFocus(target)
+        self._EIOS_GainFocus(target)
 
     def EIOS_LoseFocus(self, target: c_void_p) -> None:
         """
         void EIOS_LoseFocus(EIOS* eios) noexcept;
         """
-        self.ri.EIOS_LoseFocus.argtypes = [c_void_p]
-        self.ri.EIOS_LoseFocus.restype = None
-        self.ri.EIOS_LoseFocus(target)
+        self._EIOS_LoseFocus(target)
 
     def EIOS_IsInputEnabled(self, target: c_void_p) -> bool:
         """
         bool EIOS_IsInputEnabled(EIOS* eios) noexcept;
         """
-        self.ri.EIOS_IsInputEnabled.argtypes = [c_void_p]
-        self.ri.EIOS_IsInputEnabled.restype = c_bool
-        return self.ri.EIOS_IsInputEnabled(target)
+        return self._EIOS_IsInputEnabled(target)
 
     def EIOS_SetInputEnabled(self, target: c_void_p, enabled: bool) -> None:
         """
         void EIOS_SetInputEnabled(EIOS* eios, bool enabled) noexcept;
         """
-        self.ri.EIOS_SetInputEnabled.argtypes = [c_void_p, c_bool]
-        self.ri.EIOS_SetInputEnabled.restype = None
-        self.ri.EIOS_SetInputEnabled(target, enabled)
+        self._EIOS_SetInputEnabled(target, enabled)
 
     def EIOS_GetMousePosition(self, target: c_void_p) -> Tuple[int, int]:
         """
@@ -221,13 +424,7 @@ class RemoteInput:
         """
         x = c_int32()
         y = c_int32()
-        self.ri.EIOS_GetMousePosition.argtypes = [
-            c_void_p,
-            POINTER(c_int32),
-            POINTER(c_int32),
-        ]
-        self.ri.EIOS_GetMousePosition.restype = None
-        self.ri.EIOS_GetMousePosition(target, byref(x), byref(y))
+        self._EIOS_GetMousePosition(target, byref(x), byref(y))
         return (x.value, y.value)
 
     def EIOS_GetRealMousePosition(self, target: c_void_p) -> Tuple[int, int]:
@@ -241,54 +438,38 @@ class RemoteInput:
         """
         x = c_int32()
         y = c_int32()
-        self.ri.EIOS_GetRealMousePosition.argtypes = [
-            c_void_p,
-            POINTER(c_int32),
-            POINTER(c_int32),
-        ]
-        self.ri.EIOS_GetRealMousePosition.restype = None
-        self.ri.EIOS_GetRealMousePosition(target, byref(x), byref(y))
+        self._EIOS_GetRealMousePosition(target, byref(x), byref(y))
         return (x.value, y.value)
 
     def EIOS_MoveMouse(self, target: c_void_p, x: int, y: int) -> None:
         """
         void EIOS_MoveMouse(EIOS* eios, std::int32_t x, std::int32_t y) noexcept;
         """
-        self.ri.EIOS_MoveMouse.argtypes = [c_void_p, c_int32, c_int32]
-        self.ri.EIOS_MoveMouse.restype = None
-        self.ri.EIOS_MoveMouse(target, x, y)
+        self._EIOS_MoveMouse(target, x, y)
 
     def EIOS_HoldMouse(self, target: c_void_p, x: int, y: int, button: int) -> None:
         """
         void EIOS_HoldMouse(EIOS* eios, std::int32_t x, std::int32_t y, std::int32_t button) noexcept;
         """
-        self.ri.EIOS_HoldMouse.argtypes = [c_void_p, c_int32, c_int32, c_int32]
-        self.ri.EIOS_HoldMouse.restype = None
-        self.ri.EIOS_HoldMouse(target, x, y, button)
+        self._EIOS_HoldMouse(target, x, y, button)
 
     def EIOS_ReleaseMouse(self, target: c_void_p, x: int, y: int, button: int) -> None:
         """
         void EIOS_ReleaseMouse(EIOS* eios, std::int32_t x, std::int32_t y, std::int32_t button) noexcept;
         """
-        self.ri.EIOS_ReleaseMouse.argtypes = [c_void_p, c_int32, c_int32, c_int32]
-        self.ri.EIOS_ReleaseMouse.restype = None
-        self.ri.EIOS_ReleaseMouse(target, x, y, button)
+        self._EIOS_ReleaseMouse(target, x, y, button)
 
     def EIOS_ScrollMouse(self, target: c_void_p, x: int, y: int, lines: int) -> None:
         """
         void EIOS_ScrollMouse(EIOS* eios, std::int32_t x, std::int32_t y, std::int32_t lines) noexcept;
         """
-        self.ri.EIOS_ScrollMouse.argtypes = [c_void_p, c_int32, c_int32, c_int32]
-        self.ri.EIOS_ScrollMouse.restype = None
-        self.ri.EIOS_ScrollMouse(target, x, y, lines)
+        self._EIOS_ScrollMouse(target, x, y, lines)
 
     def EIOS_IsMouseButtonHeld(self, target: c_void_p, button: int) -> bool:
         """
         bool EIOS_IsMouseButtonHeld(EIOS* eios, std::int32_t button) noexcept;
         """
-        self.ri.EIOS_IsMouseButtonHeld.argtypes = [c_void_p, c_int32]
-        self.ri.EIOS_IsMouseButtonHeld.restype = c_bool
-        return self.ri.EIOS_IsMouseButtonHeld(target, button)
+        return self._EIOS_IsMouseButtonHeld(target, button)
 
     def EIOS_SendString(
         self, target: c_void_p, text: str, keywait: int, keymodwait: int
@@ -297,91 +478,73 @@ class RemoteInput:
         void EIOS_SendString(EIOS* eios, const char* string, std::int32_t keywait, std::int32_t keymodwait) noexcept;
         """
         _text = bytes(text, encoding="utf8")
-        self.ri.EIOS_SendString.argtypes = [c_void_p, c_char_p, c_int32, c_int32]
-        self.ri.EIOS_SendString.restype = None
-        self.ri.EIOS_SendString(target, _text, keywait, keymodwait)
+        self._EIOS_SendString(target, _text, keywait, keymodwait)
 
     def EIOS_HoldKey(self, target: c_void_p, key: int) -> None:
         """
         void EIOS_HoldKey(EIOS* eios, std::int32_t key) noexcept;
         """
-        self.ri.EIOS_HoldKey.argtypes = [c_void_p, c_int32]
-        self.ri.EIOS_HoldKey.restype = None
-        self.ri.EIOS_HoldKey(target, key)
+        self._EIOS_HoldKey(target, key)
 
     def EIOS_ReleaseKey(self, target: c_void_p, key: int) -> None:
         """
         void EIOS_ReleaseKey(EIOS* eios, std::int32_t key) noexcept;
         """
-        self.ri.EIOS_ReleaseKey.argtypes = [c_void_p, c_int32]
-        self.ri.EIOS_ReleaseKey.restype = None
-        self.ri.EIOS_ReleaseKey(target, key)
+        self._EIOS_ReleaseKey(target, key)
 
     def EIOS_IsKeyHeld(self, target: c_void_p, key: int) -> bool:
         """
         bool EIOS_IsKeyHeld(EIOS* eios, std::int32_t key) noexcept;
         """
-        self.ri.EIOS_IsKeyHeld.argtypes = [c_void_p, c_int32]
-        self.ri.EIOS_IsKeyHeld.restype = c_bool
-        return self.ri.EIOS_IsKeyHeld(target, key)
+        return self._EIOS_IsKeyHeld(target, key)
 
     def EIOS_GetKeyboardSpeed(self, target: c_void_p) -> int:
         """
         std::int32_t EIOS_GetKeyboardSpeed(EIOS* eios) noexcept;
         """
-        self.ri.EIOS_GetKeyboardSpeed.argtypes = [c_void_p]
-        self.ri.EIOS_GetKeyboardSpeed.restype = c_int32
-        return self.ri.EIOS_GetKeyboardSpeed(target)
+        return self._EIOS_GetKeyboardSpeed(target)
 
     def EIOS_SetKeyboardSpeed(self, target: c_void_p, speed: int) -> None:
         """
         void EIOS_SetKeyboardSpeed(EIOS* eios, std::int32_t speed) noexcept;
         """
-        self.ri.EIOS_SetKeyboardSpeed.argtypes = [c_void_p, c_int32]
-        self.ri.EIOS_SetKeyboardSpeed.restype = None
-        self.ri.EIOS_SetKeyboardSpeed(target, speed)
+        self._EIOS_SetKeyboardSpeed(target, speed)
 
     def EIOS_GetKeyboardRepeatDelay(self, target: c_void_p) -> int:
         """
         std::int32_t EIOS_GetKeyboardRepeatDelay(EIOS* eios) noexcept;
         """
-        self.ri.EIOS_GetKeyboardRepeatDelay.argtypes = [c_void_p]
-        self.ri.EIOS_GetKeyboardRepeatDelay.restype = c_int32
-        return self.ri.EIOS_GetKeyboardRepeatDelay(target)
+        return self._EIOS_GetKeyboardRepeatDelay(target)
 
     def EIOS_SetKeyboardRepeatDelay(self, target: c_void_p, delay: int) -> None:
         """
         void EIOS_SetKeyboardRepeatDelay(EIOS* eios, std::int32_t delay) noexcept;
         """
-        self.ri.EIOS_SetKeyboardRepeatDelay.argtypes = [c_void_p, c_int32]
-        self.ri.EIOS_SetKeyboardRepeatDelay.restype = None
-        self.ri.EIOS_SetKeyboardRepeatDelay(target, delay)
+        self._EIOS_SetKeyboardRepeatDelay(target, delay)
 
     def EIOS_PairClient(self, pid: int) -> c_void_p:
         """
         EIOS* EIOS_PairClient(pid_t pid) noexcept;
         """
-        self.ri.EIOS_PairClient.argtypes = [c_int32]
-        self.ri.EIOS_PairClient.restype = c_void_p
-        return self.ri.EIOS_PairClient(pid)
+        return self._EIOS_PairClient(pid)
 
     def EIOS_KillClientPID(self, pid: int) -> None:
         """
         void EIOS_KillClientPID(pid_t pid) noexcept;
         """
-        pass
+        self._EIOS_KillClientPID(pid)
 
     def EIOS_KillClient(self, target: c_void_p) -> None:
         """
         void EIOS_KillClient(EIOS* eios) noexcept;
         """
-        pass
+        self._EIOS_KillClient(target)
 
     def EIOS_KillZombieClients(self) -> None:
         """
         void EIOS_KillZombieClients() noexcept;
         """
-        pass
+        self._EIOS_KillZombieClients()
 
     def EIOS_GetClients(self, unpaired_only: bool = False) -> int:
         """
@@ -393,17 +556,13 @@ class RemoteInput:
         :return: injectedtargets
         :rtype: Int
         """
-        self.ri.EIOS_GetClients.argtypes = [c_bool]
-        self.ri.EIOS_GetClients.restype = int
-        return self.ri.EIOS_GetClients(unpaired_only)
+        return self._EIOS_GetClients(unpaired_only)
 
     def EIOS_GetClientPID(self, index: int) -> int:
         """
         pid_t EIOS_GetClientPID(std::size_t index) noexcept;
         """
-        self.ri.EIOS_GetClientPID.argtypes = [c_int]
-        self.ri.EIOS_GetClientPID.restype = int
-        return self.ri.EIOS_GetClientPID(index)
+        return self._EIOS_GetClientPID(index)
 
     ## Reflection
 
@@ -414,157 +573,274 @@ class RemoteInput:
         TODO: ask brandon if theres a better around the "ValueError:" exception when calling EIOS_Inject, other than loading the dll with CDLL('./libremoteinput.dll') for that one call.
               ERROR is...."ValueError: Procedure probably called with too many arguments (4 bytes in excess)"
         """
-        self.cri.EIOS_Inject.argtypes = [c_char_p]
-        self.cri.EIOS_Inject.restype = None
-        self.cri.EIOS_Inject(process_name.encode("utf-8"))
+        self._EIOS_Inject(process_name.encode("utf-8"))
 
     def EIOS_Inject_PID(self, pid: int) -> None:
         """
         void EIOS_Inject_PID(std::int32_t pid) noexcept;
         """
-        self.cri.EIOS_Inject_PID.argtypes = [c_int]
-        self.cri.EIOS_Inject_PID.restype = None
-        self.cri.EIOS_Inject_PID(pid)
+        self._EIOS_Inject_PID(pid)
 
     def Reflect_GetEIOS(self, pid: int) -> c_void_p:
         """
         EIOS* Reflect_GetEIOS(std::int32_t pid) noexcept;
         """
-        self.cri.Reflect_GetEIOS.argtypes = [c_int]
-        self.ri.Reflect_GetEIOS.restype = c_void_p
-        return self.ri.Reflect_GetEIOS(pid)
-
-    # def Reflect_Object(self, ):
-    #     """
-    #     jobject Reflect_Object(EIOS* eios, jobject object, const char* cls, const char* field, const char* desc) noexcept;
-    #     """
-    #     pass
-
-    # def Reflect_IsSame_Object(self, ):
-    #     """
-    #     jboolean Reflect_IsSame_Object(EIOS* eios, jobject first, jobject second) noexcept;
-    #     """
-    #     pass
-
-    # def Reflect_InstanceOf(self, ):
-    #     """
-    #     jboolean Reflect_InstanceOf(EIOS* eios, jobject object, const char* cls) noexcept;
-    #     """
-    #     pass
-
-    # def Reflect_Release_Object(self, ):
-    #     """
-    #     void Reflect_Release_Object(EIOS* eios, jobject object) noexcept;
-    #     """
-    #     pass
-
-    # def Reflect_Release_Objects(self, ):
-    #     """
-    #     void Reflect_Release_Objects(EIOS* eios, jobject* objects, std::size_t amount) noexcept;
-    #     """
-    #     pass
-
-    # def Reflect_Bool(self, ):
-    #     """
-    #     bool Reflect_Bool(EIOS* eios, jobject object, const char* cls, const char* field, const char* desc) noexcept;
-    #     """
-    #     pass
-
-    # def Reflect_Char(self, ):
-    #     """
-    #     char Reflect_Char(EIOS* eios, jobject object, const char* cls, const char* field, const char* desc) noexcept;
-    #     """
-    #     pass
-
-    # def Reflect_Byte(self, ):
-    #     """
-    #     std::uint8_t Reflect_Byte(EIOS* eios, jobject object, const char* cls, const char* field, const char* desc) noexcept;
-    #     """
-    #     pass
-
-    # def Reflect_Short(self, ):
-    #     """
-    #     std::int16_t Reflect_Short(EIOS* eios, jobject object, const char* cls, const char* field, const char* desc) noexcept;
-    #     """
-    #     pass
-
-    # def Reflect_Int(self, ):
-    #     """
-    #     std::int32_t Reflect_Int(EIOS* eios, jobject object, const char* cls, const char* field, const char* desc) noexcept;
-    #     """
-    #     pass
-
-    # def Reflect_Long(self, ):
-    #     """
-    #     std::int64_t Reflect_Long(EIOS* eios, jobject object, const char* cls, const char* field, const char* desc) noexcept;
-    #     """
-    #     pass
-
-    # def Reflect_Float(self, ):
-    #     """
-    #     float Reflect_Float(EIOS* eios, jobject object, const char* cls, const char* field, const char* desc) noexcept;
-    #     """
-    #     pass
-
-    # def Reflect_Double(self, ):
-    #     """
-    #     double Reflect_Double(EIOS* eios, jobject object, const char* cls, const char* field, const char* desc) noexcept;
-    #     """
-    #     pass
-
-    # def Reflect_String(self, ):
-    #     """
-    #     void Reflect_String(EIOS* eios, jobject object, const char* cls, const char* field, const char* desc, char* output, std::size_t output_size) noexcept;
-    #     """
-    #     pass
-
-    # def Reflect_Array(self, ):
-    #     """
-    #     jarray Reflect_Array(EIOS* eios, jobject object, const char* cls, const char* field, const char* desc) noexcept;
-    #     """
-    #     pass
-
-    # def Reflect_Array_With_Size(self, ):
-    #     """
-    #     jarray Reflect_Array_With_Size(EIOS* eios, jobject object, std::size_t* output_size, const char* cls, const char* field, const char* desc) noexcept;
-    #     """
-    #     pass
-
-    # def Reflect_Array_Size(self, ):
-    #     """
-    #     std::size_t Reflect_Array_Size(EIOS* eios, jarray array) noexcept;
-    #     """
-    #     pass
-
-    # def Reflect_Array_Index(self, ):
-    #     """
-    #     void* Reflect_Array_Index(EIOS* eios, jarray array, ReflectionArrayType type, std::size_t index, std::size_t length) noexcept;
-    #     """
-    #     pass
-
-    # def Reflect_Array_Index2D(self, ):
-    #     """
-    #     void* Reflect_Array_Index2D(EIOS* eios, jarray array, ReflectionArrayType type, std::size_t length, std::int32_t x, std::int32_t y) noexcept;
-    #     """
-    #     pass
-
-    # def Reflect_Array_Index3D(self, ):
-    #     """
-    #     void* Reflect_Array_Index3D(EIOS* eios, jarray array, ReflectionArrayType type, std::size_t length, std::int32_t x, std::int32_t y, std::int32_t z) noexcept;
-    #     """
-    #     pass
-
-    # def Reflect_Array_Index4D(self, ):
-    #     """
-    #     void* Reflect_Array_Index4D(EIOS* eios, jarray array, ReflectionArrayType type, std::size_t length, std::int32_t x, std::int32_t y, std::int32_t z, std::int32_t w) noexcept;
-    #     """
-    #     pass
-
-    # def Reflect_Array_Indices(self, ):
-    #     """
-    #     void* Reflect_Array_Indices(EIOS* eios, jarray array, ReflectionArrayType type, std::int32_t* indices, std::size_t length) noexcept;
-    #     """
-    #     pass
+        return self._Reflect_GetEIOS(pid)
+
+    def Reflect_Object(
+        self, eios: c_void_p, obj: c_void_p, cls: str, field: str, desc: str
+    ) -> c_void_p:
+        """
+        jobject Reflect_Object(EIOS* eios, jobject object, const char* cls, const char* field, const char* desc) noexcept;
+
+        NULL is returned as None. Use reflection.Hook to avoid encoding cls, field and desc
+        on every read.
+        """
+        return self._Reflect_Object(
+            eios, obj, cls.encode("utf-8"), field.encode("utf-8"), desc.encode("utf-8")
+        )
+
+    def Reflect_IsSame_Object(self, eios: c_void_p, first: c_void_p, second: c_void_p) -> bool:
+        """
+        jboolean Reflect_IsSame_Object(EIOS* eios, jobject first, jobject second) noexcept;
+        """
+        return self._Reflect_IsSame_Object(eios, first, second)
+
+    def Reflect_InstanceOf(self, eios: c_void_p, obj: c_void_p, cls: str) -> bool:
+        """
+        jboolean Reflect_InstanceOf(EIOS* eios, jobject object, const char* cls) noexcept;
+        """
+        return self._Reflect_InstanceOf(eios, obj, cls.encode("utf-8"))
+
+    def Reflect_Release_Object(self, eios: c_void_p, obj: c_void_p) -> None:
+        """
+        void Reflect_Release_Object(EIOS* eios, jobject object) noexcept;
+        """
+        self._Reflect_Release_Object(eios, obj)
+
+    def Reflect_Release_Objects(self, eios: c_void_p, objects: List[c_void_p]) -> None:
+        """
+        void Reflect_Release_Objects(EIOS* eios, jobject* objects, std::size_t amount) noexcept;
+        """
+        amount = len(objects)
+        self._Reflect_Release_Objects(eios, (c_void_p * amount)(*objects), amount)
+
+    def Reflect_Bool(
+        self, eios: c_void_p, obj: c_void_p, cls: str, field: str, desc: str
+    ) -> bool:
+        """
+        bool Reflect_Bool(EIOS* eios, jobject object, const char* cls, const char* field, const char* desc) noexcept;
+        """
+        return self._Reflect_Bool(
+            eios, obj, cls.encode("utf-8"), field.encode("utf-8"), desc.encode("utf-8")
+        )
+
+    def Reflect_Char(
+        self, eios: c_void_p, obj: c_void_p, cls: str, field: str, desc: str
+    ) -> bytes:
+        """
+        char Reflect_Char(EIOS* eios, jobject object, const char* cls, const char* field, const char* desc) noexcept;
+        """
+        return self._Reflect_Char(
+            eios, obj, cls.encode("utf-8"), field.encode("utf-8"), desc.encode("utf-8")
+        )
+
+    def Reflect_Byte(
+        self, eios: c_void_p, obj: c_void_p, cls: str, field: str, desc: str
+    ) -> int:
+        """
+        std::uint8_t Reflect_Byte(EIOS* eios, jobject object, const char* cls, const char* field, const char* desc) noexcept;
+        """
+        return self._Reflect_Byte(
+            eios, obj, cls.encode("utf-8"), field.encode("utf-8"), desc.encode("utf-8")
+        )
+
+    def Reflect_Short(
+        self, eios: c_void_p, obj: c_void_p, cls: str, field: str, desc: str
+    ) -> int:
+        """
+        std::int16_t Reflect_Short(EIOS* eios, jobject object, const char* cls, const char* field, const char* desc) noexcept;
+        """
+        return self._Reflect_Short(
+            eios, obj, cls.encode("utf-8"), field.encode("utf-8"), desc.encode("utf-8")
+        )
+
+    def Reflect_Int(
+        self, eios: c_void_p, obj: c_void_p, cls: str, field: str, desc: str
+    ) -> int:
+        """
+        std::int32_t Reflect_Int(EIOS* eios, jobject object, const char* cls, const char* field, const char* desc) noexcept;
+        """
+        return self._Reflect_Int(
+            eios, obj, cls.encode("utf-8"), field.encode("utf-8"), desc.encode("utf-8")
+        )
+
+    def Reflect_Long(
+        self, eios: c_void_p, obj: c_void_p, cls: str, field: str, desc: str
+    ) -> int:
+        """
+        std::int64_t Reflect_Long(EIOS* eios, jobject object, const char* cls, const char* field, const char* desc) noexcept;
+        """
+        return self._Reflect_Long(
+            eios, obj, cls.encode("utf-8"), field.encode("utf-8"), desc.encode("utf-8")
+        )
+
+    def Reflect_Float(
+        self, eios: c_void_p, obj: c_void_p, cls: str, field: str, desc: str
+    ) -> float:
+        """
+        float Reflect_Float(EIOS* eios, jobject object, const char* cls, const char* field, const char* desc) noexcept;
+        """
+        return self._Reflect_Float(
+            eios, obj, cls.encode("utf-8"), field.encode("utf-8"), desc.encode("utf-8")
+        )
+
+    def Reflect_Double(
+        self, eios: c_void_p, obj: c_void_p, cls: str, field: str, desc: str
+    ) -> float:
+        """
+        double Reflect_Double(EIOS* eios, jobject object, const char* cls, const char* field, const char* desc) noexcept;
+        """
+        return self._Reflect_Double(
+            eios, obj, cls.encode("utf-8"), field.encode("utf-8"), desc.encode("utf-8")
+        )
+
+    def Reflect_String(
+        self, eios: c_void_p, obj: c_void_p, cls: str, field: str, desc: str, size: int = 1024
+    ) -> str:
+        """
+        void Reflect_String(EIOS* eios, jobject object, const char* cls, const char* field, const char* desc, char* output, std::size_t output_size) noexcept;
+
+        Strings longer than `size` - 1 bytes are cut short. reflection.Reflector.read_string
+        reuses its buffers and grows them to fit.
+        """
+        output = create_string_buffer(size)
+        self._Reflect_String(
+            eios,
+            obj,
+            cls.encode("utf-8"),
+            field.encode("utf-8"),
+            desc.encode("utf-8"),
+            output,
+            size,
+        )
+        return output.value.decode("utf-8", "replace")
+
+    def Reflect_Array(
+        self, eios: c_void_p, obj: c_void_p, cls: str, field: str, desc: str
+    ) -> c_void_p:
+        """
+        jarray Reflect_Array(EIOS* eios, jobject object, const char* cls, const char* field, const char* desc) noexcept;
+        """
+        return self._Reflect_Array(
+            eios, obj, cls.encode("utf-8"), field.encode("utf-8"), desc.encode("utf-8")
+        )
+
+    def Reflect_Array_With_Size(
+        self, eios: c_void_p, obj: c_void_p, cls: str, field: str, desc: str
+    ) -> Tuple[c_void_p, int]:
+        """
+        jarray Reflect_Array_With_Size(EIOS* eios, jobject object, std::size_t* output_size, const char* cls, const char* field, const char* desc) noexcept;
+
+        :return: array, size
+        """
+        size = c_size_t()
+        array = self._Reflect_Array_With_Size(
+            eios,
+            obj,
+            byref(size),
+            cls.encode("utf-8"),
+            field.encode("utf-8"),
+            desc.encode("utf-8"),
+        )
+        return (array, size.value)
+
+    def Reflect_Array_Size(self, eios: c_void_p, array: c_void_p) -> int:
+        """
+        std::size_t Reflect_Array_Size(EIOS* eios, jarray array) noexcept;
+        """
+        return self._Reflect_Array_Size(eios, array)
+
+    def Reflect_Array_Index(
+        self,
+        eios: c_void_p,
+        array: c_void_p,
+        type: ReflectionArrayType,
+        index: int,
+        length: int,
+    ) -> c_void_p:
+        """
+        void* Reflect_Array_Index(EIOS* eios, jarray array, ReflectionArrayType type, std::size_t index, std::size_t length) noexcept;
+
+        :return: address of `length` elements starting at `index`, valid until the next Reflect_* call
+        """
+        return self._Reflect_Array_Index(eios, array, type, index, length)
+
+    def Reflect_Array_Index2D(
+        self,
+        eios: c_void_p,
+        array: c_void_p,
+        type: ReflectionArrayType,
+        length: int,
+        x: int,
+        y: int,
+    ) -> c_void_p:
+        """
+        void* Reflect_Array_Index2D(EIOS* eios, jarray array, ReflectionArrayType type, std::size_t length, std::int32_t x, std::int32_t y) noexcept;
+
+        :return: address of `length` elements starting at array[x][y], valid until the next Reflect_* call
+        """
+        return self._Reflect_Array_Index2D(eios, array, type, length, x, y)
+
+    def Reflect_Array_Index3D(
+        self,
+        eios: c_void_p,
+        array: c_void_p,
+        type: ReflectionArrayType,
+        length: int,
+        x: int,
+        y: int,
+        z: int,
+    ) -> c_void_p:
+        """
+        void* Reflect_Array_Index3D(EIOS* eios, jarray array, ReflectionArrayType type, std::size_t length, std::int32_t x, std::int32_t y, std::int32_t z) noexcept;
+
+        :return: address of `length` elements starting at array[x][y][z], valid until the next Reflect_* call
+        """
+        return self._Reflect_Array_Index3D(eios, array, type, length, x, y, z)
+
+    def Reflect_Array_Index4D(
+        self,
+        eios: c_void_p,
+        array: c_void_p,
+        type: ReflectionArrayType,
+        length: int,
+        x: int,
+        y: int,
+        z: int,
+        w: int,
+    ) -> c_void_p:
+        """
+        void* Reflect_Array_Index4D(EIOS* eios, jarray array, ReflectionArrayType type, std::size_t length, std::int32_t x, std::int32_t y, std::int32_t z, std::int32_t w) noexcept;
+
+        :return: address of `length` elements starting at array[x][y][z][w], valid until the next Reflect_* call
+        """
+        return self._Reflect_Array_Index4D(eios, array, type, length, x, y, z, w)
+
+    def Reflect_Array_Indices(
+        self,
+        eios: c_void_p,
+        array: c_void_p,
+        type: ReflectionArrayType,
+        indices: List[int],
+    ) -> c_void_p:
+        """
+        void* Reflect_Array_Indices(EIOS* eios, jarray array, ReflectionArrayType type, std::int32_t* indices, std::size_t length) noexcept;
+
+        :return: address of the elements at `indices`, in order, valid until the next Reflect_* call
+        """
+        length = len(indices)
+        return self._Reflect_Array_Indices(eios, array, type, (c_int32 * length)(*indices), length)
 
 
 if __name__ == "__main__":
@@ -607,39 +883,26 @@ if __name__ == "__main__":
     print(
         "If you're at the login screen enter password to do a stupidly simple login script with fixed coordinates"
     )
+    import getpass
+
     password = getpass.getpass()
     if password:
-        reflect.EIOS_HoldKey(eios_ptr, VK_ESC)
-        time.sleep(0.3)
-        reflect.EIOS_ReleaseKey(eios_ptr, VK_ESC)
-        reflect.EIOS_HoldKey(eios_ptr, VK_ESC)
-        time.sleep(0.3)
-        reflect.EIOS_ReleaseKey(eios_ptr, VK_ESC)
-        reflect.EIOS_HoldKey(eios_ptr, VK_ESC)
-        time.sleep(0.3)
-        reflect.EIOS_ReleaseKey(eios_ptr, VK_ESC)
-
-        reflect.EIOS_MoveMouse(eios_ptr, 478, 294)
-        mouse_position = reflect.EIOS_GetMousePosition(eios_ptr)
-        print(f"mouse_position = {mouse_position}")
-
-        reflect.EIOS_HoldMouse(eios_ptr, 478, 294, VK_LBUTTON)
-        time.sleep(0.3)
-        reflect.EIOS_ReleaseMouse(eios_ptr, 478, 294, VK_LBUTTON)
-        mouse_position = reflect.EIOS_GetMousePosition(eios_ptr)
-        print(f"mouse_position = {mouse_position}")
-
-        reflect.EIOS_HoldMouse(eios_ptr, 375, 263, VK_LBUTTON)
-        time.sleep(0.3)
-        reflect.EIOS_ReleaseMouse(eios_ptr, 375, 263, VK_LBUTTON)
-        mouse_position = reflect.EIOS_GetMousePosition(eios_ptr)
-        print(f"mouse_position = {mouse_position}")
-
-        reflect.EIOS_SendString(eios_ptr, password, 100, 100)
-
-        reflect.EIOS_HoldMouse(eios_ptr, 329, 319, VK_LBUTTON)
-        time.sleep(0.3)
-        reflect.EIOS_ReleaseMouse(eios_ptr, 329, 319, VK_LBUTTON)
+        from hex_keycodes import VK_ESC, VK_LBUTTON
+        from timeline import InputScheduler, Timeline
+
+        login = (
+            Timeline()
+            .tap_key(VK_ESC, 0.3)
+            .tap_key(VK_ESC, 0.3)
+            .tap_key(VK_ESC, 0.3)
+            .click(478, 294, VK_LBUTTON, 0.3)
+            .click(375, 263, VK_LBUTTON, 0.3)
+            .send_string(password, 100, 100)
+            .click(329, 319, VK_LBUTTON, 0.3)
+        )
+        with InputScheduler(reflect) as scheduler:
+            scheduler.schedule(eios_ptr, login).wait()
+            print(f"input timing = {scheduler.metrics()}")
         mouse_position = reflect.EIOS_GetMousePosition(eios_ptr)
         print(f"mouse_position = {mouse_position}")
 
@@ -0,0 +1,164 @@
+"""
+asyncio front end for RemoteInput.
+
+Every EIOS_* and Reflect_* method of RemoteInput is a coroutine on AsyncRemoteInput,
+taking the same arguments. Calls run on a single thread per EIOS target, so the calls
+to one client run in the order they were made while different clients run in parallel,
+and the event loop never waits on a native call:
+
+    async with AsyncRemoteInput(RemoteInput()) as remote:
+        target = await remote.EIOS_PairClient(pid)
+        typing = asyncio.create_task(remote.EIOS_SendString(target, "hello", 100, 100))
+        await remote.click(other_target, 478, 294, VK_LBUTTON)
+        typing.cancel()     # the characters not typed yet are dropped
+
+A native call that has started can't be interrupted; cancelling it only stops waiting for
+it. Long input is therefore split up: EIOS_SendString types one character per native
+call, and hold_key, hold_mouse and click always release what they held.
+"""
+import asyncio
+import functools
+import inspect
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from RemoteInput import RemoteInput
+
+
+def _key(target):
+    # targets come back from ctypes as ints, but accept c_void_p too
+    return getattr(target, "value", target)
+
+
+class AsyncRemoteInput:
+    """
+    Runs a RemoteInput's calls on one executor thread per target.
+    """
+
+    def __init__(self, reflect: RemoteInput):
+        self.reflect = reflect
+        # target -> its executor, None for calls that aren't about one target
+        self._executors = {}
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def executor(self, target=None) -> ThreadPoolExecutor:
+        """
+        The single thread executor that calls for `target` run on.
+        """
+        key = _key(target)
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("AsyncRemoteInput is closed")
+            executor = self._executors.get(key)
+            if executor is None:
+                name = "eios" if key is None else f"eios-{key:#x}"
+                executor = ThreadPoolExecutor(1, thread_name_prefix=name)
+                self._executors[key] = executor
+            return executor
+
+    def call(self, target, function, /, *args, **kwargs) -> asyncio.Future:
+        """
+        Runs `function(*args, **kwargs)` on `target`'s thread, after every call already
+        queued for it.
+        """
+        loop = asyncio.get_running_loop()
+        return loop.run_in_executor(
+            self.executor(target), functools.partial(function, *args, **kwargs)
+        )
+
+    async def EIOS_ReleaseTarget(self, target) -> None:
+        await self.call(target, self.reflect.EIOS_ReleaseTarget, target)
+        with self._lock:
+            executor = self._executors.pop(_key(target), None)
+        if executor is not None:
+            executor.shutdown(wait=False)
+
+    async def EIOS_SendString(self, target, text: str, keywait: int, keymodwait: int) -> None:
+        """
+        Types `text` one character per native call, all queued at once so nothing else
+        sent to `target` ends up between them. Cancelling drops the characters not typed yet.
+        """
+        send = self.reflect.EIOS_SendString
+        typed = [self.call(target, send, target, char, keywait, keymodwait) for char in text]
+        await asyncio.gather(*typed)
+
+    async def hold_key(self, target, key: int, duration: float) -> None:
+        """
+        Holds `key` for `duration` seconds, releasing it even when cancelled.
+        """
+        # the release is queued behind the hold, so it comes after it even when the wait
+        # for the hold itself is cancelled
+        hold = self.call(target, self.reflect.EIOS_HoldKey, target, key)
+        try:
+            await hold
+            await asyncio.sleep(duration)
+        finally:
+            await asyncio.shield(self.call(target, self.reflect.EIOS_ReleaseKey, target, key))
+
+    async def hold_mouse(self, target, x: int, y: int, button: int, duration: float) -> None:
+        """
+        Holds `button` at (x, y) for `duration` seconds, releasing it even when cancelled.
+        """
+        reflect = self.reflect
+        hold = self.call(target, reflect.EIOS_HoldMouse, target, x, y, button)
+        try:
+            await hold
+            await asyncio.sleep(duration)
+        finally:
+            release = self.call(target, reflect.EIOS_ReleaseMouse, target, x, y, button)
+            await asyncio.shield(release)
+
+    async def click(self, target, x: int, y: int, button: int, duration: float = 0.05) -> None:
+        """
+        Moves to (x, y) and clicks `button`.
+        """
+        await self.call(target, self.reflect.EIOS_MoveMouse, target, x, y)
+        await self.hold_mouse(target, x, y, button, duration)
+
+    def close(self, wait: bool = True) -> None:
+        """
+        Stops every executor, after the calls already queued unless `wait` is False.
+        """
+        with self._lock:
+            self._closed = True
+            executors = list(self._executors.values())
+            self._executors.clear()
+        for executor in executors:
+            executor.shutdown(wait=wait, cancel_futures=not wait)
+
+    async def aclose(self) -> None:
+        await asyncio.get_running_loop().run_in_executor(None, self.close)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.aclose()
+
+
+def _coroutine(name: str, targeted: bool):
+    async def call(self, *args, **kwargs):
+        target = None
+        if targeted:
+            target = args[0] if args else kwargs.get("target", kwargs.get("eios"))
+        return await self.call(target, getattr(self.reflect, name), *args, **kwargs)
+
+    call.__name__ = call.__qualname__ = name
+    call.__doc__ = getattr(RemoteInput, name).__doc__
+    return call
+
+
+def _mirror() -> None:
+    """
+    Adds a coroutine for every RemoteInput method AsyncRemoteInput doesn't define itself.
+    """
+    for name, method in inspect.getmembers(RemoteInput, inspect.isfunction):
+        if not name.startswith(("EIOS_", "Reflect_")) or name in AsyncRemoteInput.__dict__:
+            continue
+        parameters = list(inspect.signature(method).parameters)[1:]
+        targeted = bool(parameters) and parameters[0] in ("target", "eios")
+        setattr(AsyncRemoteInput, name, _coroutine(name, targeted))
+
+
+_mirror()
@@ -0,0 +1,87 @@
+"""
+Startup cost of RemoteInput, held to a time budget.
+
+Times `import RemoteInput` in fresh interpreters, as every worker process pays it, and
+lists the modules that take longest to import (python -X importtime). Also times creating
+a RemoteInput, which doesn't open the library until it is first used. Exits with 1 when
+the median import takes longer than the budget.
+
+    python benchmarks/bench_import.py [--budget seconds] [--runs n]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import timeit
+
+PACKAGE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PACKAGE)
+
+# seconds `import RemoteInput` may add to interpreter startup
+BUDGET = 0.040
+
+
+def import_times(module: str = "RemoteInput") -> dict:
+    """
+    Imports `module` in a new interpreter.
+
+    :return: module -> (self, cumulative) seconds of everything it imported
+    """
+    # time the import from cached bytecode, as it is once installed
+    environment = dict(os.environ)
+    environment.pop("PYTHONDONTWRITEBYTECODE", None)
+    output = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=PACKAGE,
+        env=environment,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stderr
+    times = {}
+    for line in output.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        own, cumulative, name = line[len("import time:") :].split("|")
+        times[name.strip()] = (int(own) / 1e6, int(cumulative) / 1e6)
+    return times
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="startup cost of RemoteInput")
+    parser.add_argument("--budget", type=float, default=BUDGET, help="seconds, %(default)s")
+    parser.add_argument("--runs", type=int, default=15)
+    args = parser.parse_args(argv)
+
+    import_times()  # writes the bytecode cache
+    # what the interpreter imports at startup anyway
+    startup = set(import_times("sys"))
+    runs = [import_times() for _ in range(args.runs)]
+    median = statistics.median(times["RemoteInput"][1] for times in runs)
+    print(f"import RemoteInput      {median * 1e3:8.2f}ms median of {args.runs}")
+    print("slowest imports (self time, median):")
+    slowest = sorted(
+        (
+            (statistics.median(times[name][0] for times in runs), name)
+            for name in runs[0]
+            if name not in startup
+        ),
+        reverse=True,
+    )
+    for seconds, name in slowest[:8]:
+        print(f"    {name:<24}{seconds * 1e3:8.2f}ms")
+
+    from RemoteInput import RemoteInput
+
+    create = min(timeit.repeat(RemoteInput, number=10_000, repeat=5)) / 10_000
+    print(f"RemoteInput()           {create * 1e6:8.2f}us, the library is opened on first use")
+
+    if median > args.budget:
+        print(f"over budget: {median * 1e3:.2f}ms > {args.budget * 1e3:.2f}ms")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,72 @@
+"""
+CPU cost of a mouse path: the classic point by point WindMouse loop against MouseMover.path
+with its cached, vectorized path shapes. Nothing is sent, so no client is needed.
+
+    python benchmarks/bench_mouse.py
+"""
+import math
+import os
+import random
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mouse import MouseMover, PathShapes  # noqa: E402
+
+NUMBER = 500
+MOVES = [((100, 100), (600, 400)), ((700, 50), (40, 480)), ((300, 300), (330, 290))]
+
+
+def wind_mouse(xs, ys, xe, ye, gravity=9.0, wind=3.0, max_step=10.0, target_area=8.0):
+    """
+    The usual WindMouse, one iteration and one point per step.
+    """
+    points = []
+    velocity_x = velocity_y = wind_x = wind_y = 0.0
+    sqrt3, sqrt5 = math.sqrt(3), math.sqrt(5)
+    while True:
+        distance = math.hypot(xe - xs, ye - ys)
+        if distance < 1:
+            break
+        wind = min(wind, distance)
+        if distance >= target_area:
+            wind_x = wind_x / sqrt3 + (random.random() * 2 * wind - wind) / sqrt5
+            wind_y = wind_y / sqrt3 + (random.random() * 2 * wind - wind) / sqrt5
+        else:
+            wind_x /= sqrt3
+            wind_y /= sqrt3
+            if max_step < 3:
+                max_step = random.random() * 3 + 3
+            else:
+                max_step /= sqrt5
+        velocity_x += wind_x + gravity * (xe - xs) / distance
+        velocity_y += wind_y + gravity * (ye - ys) / distance
+        speed = math.hypot(velocity_x, velocity_y)
+        if speed > max_step:
+            clip = max_step / 2 + random.random() * max_step / 2
+            velocity_x = velocity_x / speed * clip
+            velocity_y = velocity_y / speed * clip
+        xs += velocity_x
+        ys += velocity_y
+        point = (round(xs), round(ys))
+        if not points or points[-1] != point:
+            points.append(point)
+    return points
+
+
+def main():
+    mover = MouseMover(None, None, PathShapes(seed=1))
+    cases = [
+        ("WindMouse loop", lambda: [wind_mouse(*start, *end) for start, end in MOVES]),
+        ("MouseMover.path", lambda: [mover.path(start, end) for start, end in MOVES]),
+    ]
+    for name, function in cases:
+        seconds = min(timeit.repeat(function, number=NUMBER, repeat=5)) / NUMBER / len(MOVES)
+        print(f"{name:<20}{seconds * 1e6:>8.1f}us per path")
+    shapes = mover.shapes
+    print(f"shapes generated {shapes.generated}, reused {shapes.reused}")
+
+
+if __name__ == "__main__":
+    main()
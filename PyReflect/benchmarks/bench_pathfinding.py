@@ -0,0 +1,94 @@
+"""
+CPU cost of routing over a 104x104 region: the usual pure Python BFS run on every step
+against CollisionMap's vectorized distance field, and the route read from a cached field.
+The flags are random, so no client is needed.
+
+    python benchmarks/bench_pathfinding.py
+"""
+import os
+import random
+import sys
+import timeit
+from collections import deque
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy  # noqa: E402
+
+from pathfinding import DIRECTIONS, CollisionMap  # noqa: E402
+
+SIZE = 104
+NUMBER = 20
+ROUTES = [((52, 52), (97, 90)), ((5, 8), (60, 71)), ((30, 80), (33, 77))]
+
+
+def random_flags(seed: int = 1):
+    rng = random.Random(seed)
+    walls = (0, 0, 0, 0, 0x02, 0x08, 0x20, 0x80)
+    flags = [
+        [(0x100 if rng.random() < 0.15 else 0) | rng.choice(walls) for _ in range(SIZE)]
+        for _ in range(SIZE)
+    ]
+    for start, end in ROUTES:
+        for x, y in (start, end):
+            flags[x][y] = 0
+    return flags
+
+
+def bfs(flags, start, end):
+    """
+    Breadth first search from `start` until it reaches `end`, one tile at a time.
+    """
+    straight = {(dx, dy): mask for dx, dy, mask in DIRECTIONS[:4]}
+
+    def passable(x, y, mask):
+        return 0 <= x < SIZE and 0 <= y < SIZE and not flags[x][y] & mask
+
+    previous = {start: None}
+    queue = deque([start])
+    while queue:
+        tile = queue.popleft()
+        if tile == end:
+            path = []
+            while tile != start:
+                path.append(tile)
+                tile = previous[tile]
+            return path[::-1]
+        x, y = tile
+        for dx, dy, mask in DIRECTIONS:
+            to = (x + dx, y + dy)
+            if to in previous or not passable(x + dx, y + dy, mask):
+                continue
+            if dx and dy and not (
+                passable(x + dx, y, straight[dx, 0]) and passable(x, y + dy, straight[0, dy])
+            ):
+                continue
+            previous[to] = tile
+            queue.append(to)
+    return None
+
+
+def main():
+    flags = random_flags()
+    collision = CollisionMap(numpy.array(flags, dtype=numpy.int32))
+    fields = {end: collision.distance_field(end) for _, end in ROUTES}
+    for start, end in ROUTES:
+        expected = bfs(flags, start, end)
+        if len(fields[end].route(start)) != len(expected):
+            raise RuntimeError(f"routes from {start} to {end} differ in length")
+
+    cases = [
+        ("Python BFS", lambda: [bfs(flags, start, end) for start, end in ROUTES]),
+        (
+            "distance_field + route",
+            lambda: [collision.distance_field(end).route(start) for start, end in ROUTES],
+        ),
+        ("cached field route", lambda: [fields[end].route(start) for start, end in ROUTES]),
+    ]
+    for name, function in cases:
+        seconds = min(timeit.repeat(function, number=NUMBER, repeat=5)) / NUMBER / len(ROUTES)
+        print(f"{name:<24}{seconds * 1e3:>9.3f}ms per route")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Micro-benchmark for the per-call overhead of the RemoteInput wrappers.
+
+Compares the old style (set argtypes/restype and look the function up on every call)
+against the prototypes bound once at load time. The native library is replaced by
+ctypes callbacks, so the numbers are wrapper overhead only and no client is needed.
+
+    python benchmarks/bench_prototypes.py
+"""
+import os
+import sys
+import timeit
+from ctypes import CFUNCTYPE, POINTER, _SimpleCData, byref, c_bool, c_int32, c_void_p
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from RemoteInput import PROTOTYPES, RemoteInput  # noqa: E402
+
+NUMBER = 100_000
+
+
+class StubLibrary:
+    """
+    Exposes every function in PROTOTYPES as a ctypes callback that does nothing.
+    """
+
+    def __init__(self):
+        for name, (restype, argtypes) in PROTOTYPES.items():
+            if restype is not None and not issubclass(restype, _SimpleCData):
+                restype = c_void_p  # callbacks can only return simple types
+            result = None if restype is None else 0
+            prototype = CFUNCTYPE(restype, *argtypes)
+            setattr(self, name, prototype(lambda *args, _result=result: _result))
+
+
+def legacy_get_mouse_position(ri, target):
+    x = c_int32()
+    y = c_int32()
+    ri.EIOS_GetMousePosition.argtypes = [c_void_p, POINTER(c_int32), POINTER(c_int32)]
+    ri.EIOS_GetMousePosition.restype = None
+    ri.EIOS_GetMousePosition(target, byref(x), byref(y))
+    return (x.value, y.value)
+
+
+def legacy_move_mouse(ri, target, x, y):
+    ri.EIOS_MoveMouse.argtypes = [c_void_p, c_int32, c_int32]
+    ri.EIOS_MoveMouse.restype = None
+    ri.EIOS_MoveMouse(target, x, y)
+
+
+def legacy_has_focus(ri, target):
+    ri.EIOS_HasFocus.argtypes = [c_void_p]
+    ri.EIOS_HasFocus.restype = c_bool
+    return ri.EIOS_HasFocus(target)
+
+
+def main():
+    lib = StubLibrary()
+    reflect = RemoteInput(lib)
+    target = 1
+
+    cases = [
+        (
+            "EIOS_GetMousePosition",
+            lambda: legacy_get_mouse_position(lib, target),
+            lambda: reflect.EIOS_GetMousePosition(target),
+        ),
+        (
+            "EIOS_MoveMouse",
+            lambda: legacy_move_mouse(lib, target, 10, 20),
+            lambda: reflect.EIOS_MoveMouse(target, 10, 20),
+        ),
+        (
+            "EIOS_HasFocus",
+            lambda: legacy_has_focus(lib, target),
+            lambda: reflect.EIOS_HasFocus(target),
+        ),
+    ]
+
+    print(f"{'function':<24}{'per call':>12}{'bound once':>12}{'speedup':>10}")
+    for name, legacy, bound in cases:
+        before = min(timeit.repeat(legacy, number=NUMBER, repeat=5)) / NUMBER
+        after = min(timeit.repeat(bound, number=NUMBER, repeat=5)) / NUMBER
+        print(
+            f"{name:<24}{before * 1e6:>10.2f}us{after * 1e6:>10.2f}us{before / after:>9.2f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Python overhead of a field read, measured against the callback stub from bench_prototypes.
+
+Compares RemoteInput.Reflect_Int (strings encoded per call), Reflector.read with a Hook,
+and calling the bound foreign function directly, which is the floor for any wrapper.
+Then scans a 2048 slot object array for 8 int fields, one element at a time and with
+Reflector.gather, in alternating rounds. Both make the same 8192 foreign calls, which is
+where the time goes. Over five runs on the stub gather's best round took 8.5-9.1ms against
+9.7-14.8ms per element, and the medians moved more than that between runs; a single run
+without alternating has had it either way round.
+
+    python benchmarks/bench_reflect.py
+"""
+import os
+import statistics
+import sys
+import timeit
+from ctypes import CFUNCTYPE, addressof, c_int32, c_size_t, c_void_p
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from bench_prototypes import StubLibrary  # noqa: E402
+from reflection import Hook, Reflector  # noqa: E402
+from RemoteInput import ReflectionArrayType, RemoteInput  # noqa: E402
+
+NUMBER = 200_000
+SLOTS = 2048
+FIELDS = 8
+# alternating rounds of the scans, so a noisy moment hits both
+ROUNDS = 15
+
+
+def main():
+    reflect = RemoteInput(StubLibrary())
+    eios, obj = 1, 2
+    hook = Hook("client", "fx", "I")
+    reflector = Reflector(reflect, eios)
+    native = reflect._Reflect_Int
+    args = hook.args
+
+    cases = [
+        ("RemoteInput.Reflect_Int", lambda: reflect.Reflect_Int(eios, obj, "client", "fx", "I")),
+        ("Reflector.read(obj, hook)", lambda: reflector.read(obj, hook)),
+        ("foreign function", lambda: native(eios, obj, *args)),
+    ]
+    times = [
+        min(timeit.repeat(function, number=NUMBER, repeat=5)) / NUMBER for _, function in cases
+    ]
+    floor = times[-1]
+    for (name, _), seconds in zip(cases, times):
+        print(f"{name:<28}{seconds * 1e6:>8.3f}us  overhead {(seconds - floor) * 1e6:.3f}us")
+    print()
+    scan(reflect)
+
+
+def scan(reflect):
+    # every other slot is null, like a sparse npc array
+    elements = (c_void_p * SLOTS)(*(slot + 1 if slot % 2 else 0 for slot in range(SLOTS)))
+    index = CFUNCTYPE(c_void_p, c_void_p, c_void_p, c_int32, c_size_t, c_size_t)(
+        lambda eios, array, type, start, length: addressof(elements) + start * 8
+    )
+    reflect._Reflect_Array_Index = index
+    reflector = Reflector(reflect, 1)
+    hooks = [Hook("cy", f"field{i}", "I") for i in range(FIELDS)]
+
+    def per_element():
+        objects = reflector.read_array(2, ReflectionArrayType.OBJECT, SLOTS)
+        return [reflector.read_all(obj, hooks) for obj in objects.tolist() if obj]
+
+    cases = [
+        ("read_all per element", per_element),
+        ("Reflector.gather", lambda: reflector.gather(2, hooks, SLOTS)),
+    ]
+    rounds = {name: [] for name, _ in cases}
+    for _ in range(ROUNDS):
+        for name, function in cases:
+            rounds[name].append(min(timeit.repeat(function, number=5, repeat=3)) / 5)
+    for name, times in rounds.items():
+        print(
+            f"{SLOTS}x{FIELDS} {name:<24}min {min(times) * 1e3:>6.2f}ms  "
+            f"median {statistics.median(times) * 1e3:>6.2f}ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Benchmark for search.py on a full 765x503 client sized image of noise, as an array and as
+Frames. Every Frame case wraps the image in a new Frame, so it pays for the views its
+searches are built from; the "3 colors" cases show what further searches on it cost.
+
+    python benchmarks/bench_search.py
+"""
+import os
+import sys
+import timeit
+
+import numpy
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from frame import Frame  # noqa: E402
+from search import (  # noqa: E402
+    CTS_HSL,
+    CTS_RGB,
+    CountColor,
+    FindBitmap,
+    FindColor,
+    FindColorTolerance,
+    FindColors,
+    rgb_to_color,
+)
+
+WIDTH, HEIGHT = 765, 503
+NUMBER = 200
+
+
+def main():
+    rng = numpy.random.default_rng(0)
+    image = rng.integers(0, 256, (HEIGHT, WIDTH, 4), dtype=numpy.uint8)
+    bitmap = image[400:410, 700:712].copy()
+    # a color that isn't in the image, so FindColor has to cover the whole image
+    missing = rgb_to_color(1, 2, 3)
+    image[(image[..., :3] == (3, 2, 1)).all(axis=-1)] = 0
+    color = rgb_to_color(0x30, 0x20, 0x10)
+    colors = (color, rgb_to_color(0xC8, 0x1E, 0x1E), rgb_to_color(0x14, 0x78, 0xC8))
+    buffer = image.tobytes()
+
+    def new_frame():
+        return Frame(buffer, WIDTH, HEIGHT)
+
+    def three_colors(cts):
+        frame = new_frame()
+        return [CountColor(frame, each, tolerance=10, cts=cts) for each in colors]
+
+    cases = [
+        ("FindColor (miss)", lambda: FindColor(image, missing)),
+        ("FindColorTolerance rgb 10", lambda: FindColorTolerance(image, color, 10)),
+        ("FindColorTolerance hsl 10", lambda: FindColorTolerance(image, color, 10, cts=CTS_HSL)),
+        ("FindColors rgb 10", lambda: FindColors(image, color, tolerance=10)),
+        ("CountColor", lambda: CountColor(image, color)),
+        ("CountColor rgb 10", lambda: CountColor(image, color, tolerance=10)),
+        ("CountColor hsl 10", lambda: CountColor(image, color, tolerance=10, cts=CTS_HSL)),
+        ("Frame CountColor rgb 10", lambda: CountColor(new_frame(), color, tolerance=10)),
+        ("Frame CountColor rgb 10, 3 colors", lambda: three_colors(CTS_RGB)),
+        (
+            "Frame CountColor hsl 10",
+            lambda: CountColor(new_frame(), color, tolerance=10, cts=CTS_HSL),
+        ),
+        ("Frame CountColor hsl 10, 3 colors", lambda: three_colors(CTS_HSL)),
+        ("FindBitmap 12x10", lambda: FindBitmap(image, bitmap)),
+        ("FindBitmap 12x10 tolerance 20", lambda: FindBitmap(image, bitmap, tolerance=20)),
+    ]
+    for name, function in cases:
+        seconds = min(timeit.repeat(function, number=NUMBER, repeat=5)) / NUMBER
+        print(f"{name:<34}{seconds * 1e3:>8.3f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Throughput of a vision pass spread over worker processes, with frames handed over through
+a SharedFrameRing (only the sequence number is sent) or pickled through a queue.
+
+    python benchmarks/bench_sharedframes.py [frames]
+"""
+import multiprocessing
+import os
+import sys
+import time
+
+import numpy
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from search import CTS_HSL, CountColor  # noqa: E402
+from sharedframes import SharedFrameRing  # noqa: E402
+
+WIDTH, HEIGHT = 765, 503
+WORKER_COUNTS = (1, 2, 4)
+
+
+def analyse(pixels) -> int:
+    return CountColor(pixels, 0x1F8DFF, tolerance=8, cts=CTS_HSL)
+
+
+def worker(ring_name, frames, results):
+    ring = SharedFrameRing.attach(ring_name) if ring_name else None
+    processed = torn = 0
+    while True:
+        item = frames.get()
+        if item is None:
+            break
+        if ring is None:
+            analyse(item)
+        else:
+            captured = ring.get(item)
+            if captured is None:
+                torn += 1
+                continue
+            analyse(captured.frame.array)
+            if not ring.valid(captured):
+                torn += 1
+            del captured
+        processed += 1
+    if ring is not None:
+        ring.close()
+    results.put((processed, torn))
+
+
+def run(source, workers: int, count: int, shared: bool) -> float:
+    frames = multiprocessing.Queue(maxsize=workers)
+    results = multiprocessing.Queue()
+    # a slow worker can fall several frames behind the others, leave it some slack
+    ring = SharedFrameRing.create(WIDTH, HEIGHT, slots=4 * workers + 4) if shared else None
+    processes = [
+        multiprocessing.Process(
+            target=worker, args=(ring.name if shared else None, frames, results)
+        )
+        for _ in range(workers)
+    ]
+    for process in processes:
+        process.start()
+
+    start = time.perf_counter()
+    for index in range(count):
+        pixels = source[index % len(source)]
+        frames.put(ring.publish(pixels, time.perf_counter()) if shared else pixels)
+    for _ in processes:
+        frames.put(None)
+    torn = sum(results.get()[1] for _ in processes)
+    elapsed = time.perf_counter() - start
+
+    for process in processes:
+        process.join()
+    if ring is not None:
+        ring.close()
+    if torn:
+        print(f"    {torn} of {count} frames were overwritten before a worker finished them")
+    return count / elapsed
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 400
+    rng = numpy.random.default_rng(0)
+    source = [rng.integers(0, 256, (HEIGHT, WIDTH, 4), dtype=numpy.uint8) for _ in range(4)]
+
+    print(f"{'workers':<10}{'shared fps':>12}{'pickled fps':>14}")
+    for workers in WORKER_COUNTS:
+        shared = run(source, workers, count, shared=True)
+        pickled = run(source, workers, count, shared=False)
+        print(f"{workers:<10}{shared:>12.1f}{pickled:>14.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,276 @@
+"""
+Benchmark suite over fakeclient.FakeLibrary, so it runs on any machine without a client.
+
+    python benchmarks/suite.py --save       # record the baseline
+    python benchmarks/suite.py              # compare against it
+    python benchmarks/suite.py -k frame     # only the results with "frame" in their name
+
+It measures the per-call overhead of the wrappers and of cached queries, frame capture,
+field reads, routing and how closely an InputScheduler keeps to a timeline. Every result is
+a time, lower is better. A result regressed when it is more than `--tolerance` slower than
+the baseline and slower by more than its noise floor, and the suite then exits with
+status 1.
+
+The fake library is Python, so each native call costs about a microsecond more than the
+real one; results are comparable with each other, not with a live client. A baseline is
+only meaningful on the machine and Python it was recorded with.
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+import timeit
+from typing import Callable, Dict, List, NamedTuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fakeclient import FakeLibrary  # noqa: E402
+from grabber import FrameGrabber  # noqa: E402
+from pathfinding import Pathfinder  # noqa: E402
+from querycache import QueryCache  # noqa: E402
+from reflection import Hook, ObjectArena, Reflector, numpy  # noqa: E402
+from RemoteInput import ReflectionArrayType, RemoteInput  # noqa: E402
+from timeline import InputScheduler, Timeline  # noqa: E402
+
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+LOCAL_PLAYER = Hook("client", "localPlayer", "LPlayer;")
+PLAYER_X = Hook("Player", "x", "I")
+PLAYER_NAME = Hook("Player", "name", "Ljava/lang/String;")
+SKILL_LEVELS = Hook("client", "skillLevels", "[I")
+NPCS = Hook("client", "npcs", "[LNPC;")
+NPC_FIELDS = [Hook("NPC", field, "I") for field in ("x", "y", "index", "animation", "health")]
+COLLISION_MAPS = Hook("client", "collisionMaps", "[LCollisionMap;")
+COLLISION_FLAGS = Hook("CollisionMap", "flags", "[[I")
+REGION_BASE = (Hook("client", "baseX", "I"), Hook("client", "baseY", "I"))
+PLANE = Hook("client", "plane", "I")
+
+
+class Result(NamedTuple):
+    name: str
+    # seconds
+    value: float
+    # differences below this many seconds are noise, never a regression
+    noise: float
+
+
+class Bench:
+    """
+    A fake client, paired, and what the benchmarks share.
+    """
+
+    def __init__(self):
+        self.lib = FakeLibrary()
+        self.reflect = RemoteInput(self.lib)
+        self.target = self.reflect.EIOS_PairClient(self.reflect.EIOS_GetClientPID(0))
+        self.client = self.lib.clients[0]
+        self.reflector = Reflector(self.reflect, self.target)
+
+
+def _per_call(function: Callable, number: int, repeat: int = 5) -> float:
+    return min(timeit.repeat(function, number=number, repeat=repeat)) / number
+
+
+def per_call_overhead(bench: Bench) -> List[Result]:
+    reflect, target = bench.reflect, bench.target
+    native = reflect._EIOS_HasFocus
+    cases = [
+        ("call.foreign_function", lambda: native(target)),
+        ("call.EIOS_HasFocus", lambda: reflect.EIOS_HasFocus(target)),
+        ("call.EIOS_GetMousePosition", lambda: reflect.EIOS_GetMousePosition(target)),
+        ("call.EIOS_MoveMouse", lambda: reflect.EIOS_MoveMouse(target, 10, 20)),
+        (
+            "call.Reflect_Int",
+            lambda: reflect.Reflect_Int(target, None, "client", "loginState", "I"),
+        ),
+    ]
+    return [Result(name, _per_call(function, 20_000), 0.2e-6) for name, function in cases]
+
+
+def cached_queries(bench: Bench) -> List[Result]:
+    reflect, target = bench.reflect, bench.target
+    with QueryCache(reflect):
+        cases = [
+            ("cache.EIOS_HasFocus", lambda: reflect.EIOS_HasFocus(target)),
+            ("cache.EIOS_GetMousePosition", lambda: reflect.EIOS_GetMousePosition(target)),
+            ("cache.EIOS_GetTargetDimensions", lambda: reflect.EIOS_GetTargetDimensions(target)),
+        ]
+        return [Result(name, _per_call(function, 20_000), 0.2e-6) for name, function in cases]
+
+
+def frame_capture(bench: Bench) -> List[Result]:
+    grabber = FrameGrabber(bench.reflect, bench.target)
+    results = [Result("frame.capture", _per_call(grabber.capture, 200), 50e-6)]
+    if numpy is not None:
+
+        def gray():
+            return grabber.capture().frame.gray
+
+        results.append(Result("frame.capture_gray", _per_call(gray, 50), 200e-6))
+    return results
+
+
+def field_reads(bench: Bench) -> List[Result]:
+    reflector = bench.reflector
+    with ObjectArena(reflector):
+        player = reflector.read(None, LOCAL_PLAYER)
+        read = _per_call(lambda: reflector.read(player, PLAYER_X), 20_000)
+        string = _per_call(lambda: reflector.read_string(player, PLAYER_NAME), 20_000)
+        results = [
+            Result("field.read", read, 0.2e-6),
+            Result("field.read_string", string, 0.5e-6),
+        ]
+    if numpy is None:
+        return results
+
+    results.append(
+        Result(
+            "field.read_array_field",
+            _per_call(lambda: reflector.read_array_field(None, SKILL_LEVELS), 5_000),
+            1e-6,
+        )
+    )
+    # 1024 npcs in 2048 slots, per npc
+    gather = _per_call(lambda: reflector.gather_field(None, NPCS, NPC_FIELDS), 10) / 1024
+    results.append(Result("field.gather_per_npc", gather, 1e-6))
+
+    with ObjectArena(reflector):
+        maps = reflector.read(None, COLLISION_MAPS)
+        plane = reflector.read_array_index(maps, ReflectionArrayType.OBJECT, 0)
+        flags = reflector.read(plane, COLLISION_FLAGS)
+        nd = _per_call(
+            lambda: reflector.read_array_nd(flags, ReflectionArrayType.INT, (104, 104)), 50
+        )
+    results.append(Result("field.read_array_nd_104x104", nd, 100e-6))
+    return results
+
+
+def pathfinding(bench: Bench) -> List[Result]:
+    if numpy is None:
+        return []
+    pathfinder = Pathfinder(bench.reflector, COLLISION_MAPS, COLLISION_FLAGS, REGION_BASE, PLANE)
+    collision = pathfinder.region()
+    start = (52, 52)
+    # the tile furthest from the player
+    distances = collision.distance_field(start).distances
+    destination = tuple(int(i) for i in numpy.unravel_index(distances.argmax(), distances.shape))
+    field = _per_call(lambda: collision.distance_field(destination), 20)
+    pathfinder.route(start, destination)
+    route = _per_call(lambda: pathfinder.route(start, destination), 5_000)
+    return [
+        Result("path.distance_field", field, 500e-6),
+        Result("path.route_cached", route, 5e-6),
+    ]
+
+
+def input_timing(bench: Bench, events: int = 250, spacing: float = 0.002) -> List[Result]:
+    timeline = Timeline()
+    for index in range(events):
+        timeline.move_mouse(index, index).wait(spacing)
+    bench.client.inputs.clear()
+    with InputScheduler(bench.reflect) as scheduler:
+        handle = scheduler.schedule(bench.target, timeline, time.perf_counter() + 0.05)
+        handle.wait()
+        metrics = scheduler.metrics()
+    if len(bench.client.inputs) != events:
+        raise RuntimeError(f"{len(bench.client.inputs)} of {events} events arrived")
+    return [
+        Result("input.mean_error", metrics["mean_error"], 100e-6),
+        Result("input.p50_error", metrics["p50_error"], 100e-6),
+        Result("input.p99_error", metrics["p99_error"], 500e-6),
+    ]
+
+
+BENCHMARKS = (
+    per_call_overhead,
+    cached_queries,
+    frame_capture,
+    field_reads,
+    pathfinding,
+    input_timing,
+)
+
+
+def run(selected: str = "") -> List[Result]:
+    bench = Bench()
+    results = []
+    for benchmark in BENCHMARKS:
+        results += [result for result in benchmark(bench) if selected in result.name]
+    if bench.lib.live:
+        raise RuntimeError(f"the benchmarks leaked {bench.lib.live} object references")
+    return results
+
+
+def _format(seconds: float) -> str:
+    if abs(seconds) >= 1e-3:
+        return f"{seconds * 1e3:.3f}ms"
+    return f"{seconds * 1e6:.3f}us"
+
+
+def compare(results: List[Result], baseline: Dict[str, float], tolerance: float) -> List[str]:
+    """
+    Prints every result next to its baseline.
+
+    :return: names of the results that regressed
+    """
+    regressions = []
+    print(f"{'benchmark':<30}{'result':>12}{'baseline':>12}{'change':>9}")
+    for result in results:
+        line = f"{result.name:<30}{_format(result.value):>12}"
+        before = baseline.get(result.name)
+        if before is None:
+            print(line + f"{'-':>12}")
+            continue
+        change = (result.value - before) / before if before else 0.0
+        line += f"{_format(before):>12}{change:>+8.1%}"
+        if change > tolerance and result.value - before > result.noise:
+            regressions.append(result.name)
+            line += "  REGRESSION"
+        print(line)
+    return regressions
+
+
+def _environment() -> dict:
+    return {"python": platform.python_version(), "machine": platform.platform()}
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--baseline", default=BASELINE, help="baseline file, %(default)s")
+    parser.add_argument("--save", action="store_true", help="record the results as baseline")
+    parser.add_argument(
+        "--tolerance", type=float, default=0.25, help="slowdown that counts, %(default)s"
+    )
+    parser.add_argument("-k", dest="selected", default="", help="only results matching this")
+    args = parser.parse_args(argv)
+
+    results = run(args.selected)
+    if args.save:
+        document = {**_environment(), "results": {result.name: result.value for result in results}}
+        with open(args.baseline, "w", encoding="utf-8") as file:
+            json.dump(document, file, indent=2)
+        compare(results, {}, args.tolerance)
+        print(f"\nsaved to {args.baseline}")
+        return 0
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, encoding="utf-8") as file:
+            document = json.load(file)
+        baseline = document["results"]
+        recorded = {key: document.get(key) for key in _environment()}
+        if recorded != _environment():
+            print(f"baseline recorded on {recorded}, now {_environment()}\n")
+    else:
+        print(f"no baseline at {args.baseline}, run with --save first\n")
+    regressions = compare(results, baseline, args.tolerance)
+    if regressions:
+        print(f"\n{len(regressions)} regression(s): {', '.join(regressions)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
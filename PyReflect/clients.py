@@ -0,0 +1,300 @@
+"""
+Pairing and driving every client on the machine at once.
+
+A ClientPool pairs every client it finds and gives each one a worker, a thread or a
+process of its own, that runs the work submitted for that client in order:
+
+    def logged_in(reflect, target):
+        return reflect.EIOS_GetTargetDimensions(target)
+
+    with ClientPool(RemoteInput()) as pool:
+        pool.refresh()                       # pairs the clients started since last time
+        for pid, future in pool.run(logged_in).items():
+            print(pid, future.result())
+        print(pool.report())
+
+`work(reflect, target, *args)` gets the RemoteInput and EIOS target of one client. With
+`processes=True` it runs in the client's worker process, which pairs the client itself,
+so `work` and its arguments must be picklable and `factory` creates the RemoteInput there.
+
+probe() runs short calls that check on a client without waiting behind its queue: on a
+thread of their own, or on a thread of the worker process that answers them next to the
+work it is running.
+"""
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from multiprocessing import Pipe, util
+from typing import Callable, Dict, List, Optional, Tuple
+
+from RemoteInput import RemoteInput
+
+# the client a process pool worker drives, (reflect, target)
+_worker = None
+
+
+def _start_worker(factory: Callable[[], RemoteInput], pid: int, probes=None) -> None:
+    global _worker
+    reflect = factory()
+    target = reflect.EIOS_PairClient(pid)
+    if not target:
+        raise RuntimeError(f"couldn't pair client {pid}")
+    _worker = (reflect, target)
+    # run when the worker exits normally, atexit handlers don't run in pool workers
+    util.Finalize(None, reflect.EIOS_ReleaseTarget, args=(target,), exitpriority=10)
+    if probes is not None:
+        threading.Thread(target=_answer_probes, args=(probes,), daemon=True).start()
+
+
+def _answer_probes(connection) -> None:
+    """
+    Runs the probes the pool sends to a worker process, next to the work it is running.
+    """
+    reflect, target = _worker
+    while True:
+        try:
+            work, args = connection.recv()
+        except EOFError:
+            return
+        try:
+            connection.send((None, work(reflect, target, *args)))
+        except Exception as error:
+            connection.send((error, None))
+
+
+def _started() -> None:
+    pass
+
+
+def _timed(work, reflect, target, args) -> Tuple[float, object]:
+    start = time.perf_counter()
+    result = work(reflect, target, *args)
+    return time.perf_counter() - start, result
+
+
+def _timed_in_worker(work, args) -> Tuple[float, object]:
+    reflect, target = _worker
+    return _timed(work, reflect, target, args)
+
+
+class ClientStats:
+    """
+    Work done for one client.
+    """
+
+    __slots__ = ("completed", "failed", "busy", "since")
+
+    def __init__(self):
+        self.completed = 0
+        self.failed = 0
+        # seconds spent running work
+        self.busy = 0.0
+        self.since = time.perf_counter()
+
+    def as_dict(self) -> dict:
+        elapsed = time.perf_counter() - self.since
+        return {
+            "completed": self.completed,
+            "failed": self.failed,
+            "busy": self.busy,
+            # work per second since the client was paired, and per second of work
+            "throughput": self.completed / elapsed if elapsed > 0 else 0.0,
+            "rate": self.completed / self.busy if self.busy > 0 else 0.0,
+            "utilization": min(self.busy / elapsed, 1.0) if elapsed > 0 else 0.0,
+        }
+
+
+class ClientPool:
+    """
+    Every paired client by PID, each with a worker of its own.
+    """
+
+    def __init__(
+        self,
+        reflect: RemoteInput,
+        processes: bool = False,
+        factory: Callable[[], RemoteInput] = RemoteInput,
+    ):
+        """
+        :param reflect: finds the clients, and drives them unless `processes`
+        :param processes: run each client's work in a process of its own
+        :param factory: creates the RemoteInput of a worker process
+        """
+        self.reflect = reflect
+        self.processes = processes
+        self.factory = factory
+        # pid -> EIOS target, None for clients paired by their worker process
+        self.targets: Dict[int, Optional[int]] = {}
+        self.stats: Dict[int, ClientStats] = {}
+        self._executors = {}
+        # pid -> (connection to the probe thread of its worker process, held to use it)
+        self._probes = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.targets)
+
+    def __contains__(self, pid: int) -> bool:
+        return pid in self.targets
+
+    @property
+    def pids(self) -> List[int]:
+        return list(self.targets)
+
+    def _client_pids(self, unpaired_only: bool) -> List[int]:
+        reflect = self.reflect
+        count = reflect.EIOS_GetClients(unpaired_only)
+        return [reflect.EIOS_GetClientPID(index) for index in range(count)]
+
+    def refresh(self) -> Tuple[List[int], List[int]]:
+        """
+        Pairs the clients started since the last refresh and drops the ones that exited.
+        Clients already in the pool are left alone.
+
+        :return: the pids added and the pids removed
+        """
+        with self._lock:
+            running = set(self._client_pids(False))
+            removed = [pid for pid in self.targets if pid not in running]
+            for pid in removed:
+                self._remove(pid)
+            added = []
+            for pid in self._client_pids(True):
+                if pid in self.targets or pid not in running:
+                    continue
+                if self.processes:
+                    target = None
+                    probes, worker_probes = Pipe()
+                    executor = ProcessPoolExecutor(
+                        1, initializer=_start_worker, initargs=(self.factory, pid, worker_probes)
+                    )
+                    # starts the worker process, which pairs the client and answers probes
+                    executor.submit(_started)
+                    worker_probes.close()
+                    self._probes[pid] = (probes, threading.Lock())
+                else:
+                    target = self.reflect.EIOS_PairClient(pid)
+                    if not target:
+                        # paired by someone else in between
+                        continue
+                    executor = ThreadPoolExecutor(1, thread_name_prefix=f"client-{pid}")
+                self.targets[pid] = target
+                self.stats[pid] = ClientStats()
+                self._executors[pid] = executor
+                added.append(pid)
+            return added, removed
+
+    def discard(self, pid: int) -> bool:
+        """
+        Drops client `pid` and the work queued for it, and releases its target.
+
+        :return: False if it wasn't in the pool
+        """
+        with self._lock:
+            if pid not in self.targets:
+                return False
+            self._remove(pid)
+            return True
+
+    def _remove(self, pid: int, wait: bool = False) -> None:
+        executor = self._executors.pop(pid)
+        executor.shutdown(wait=wait, cancel_futures=not wait)
+        # not closed, a probe still waiting on it gets EOFError once the worker exits
+        self._probes.pop(pid, None)
+        # work still running keeps its own reference to update
+        self.stats.pop(pid, None)
+        target = self.targets.pop(pid)
+        if target is not None:
+            self.reflect.EIOS_ReleaseTarget(target)
+
+    def submit(self, pid: int, work, *args) -> Future:
+        """
+        Runs `work(reflect, target, *args)` for client `pid` after the work already queued
+        for it.
+        """
+        with self._lock:
+            executor = self._executors[pid]
+            if self.processes:
+                inner = executor.submit(_timed_in_worker, work, args)
+            else:
+                inner = executor.submit(_timed, work, self.reflect, self.targets[pid], args)
+            stats = self.stats[pid]
+        outer = Future()
+
+        def done(inner: Future) -> None:
+            if inner.cancelled():
+                outer.cancel()
+                return
+            error = inner.exception()
+            if error is not None:
+                stats.failed += 1
+                outer.set_exception(error)
+                return
+            elapsed, result = inner.result()
+            stats.completed += 1
+            stats.busy += elapsed
+            outer.set_result(result)
+
+        inner.add_done_callback(done)
+        return outer
+
+    def probe(self, pid: int, work, *args) -> Future:
+        """
+        Runs `work(reflect, target, *args)` for client `pid` at once, next to the work
+        running for it instead of after the work queued. It runs on a thread of its own,
+        or with `processes` on the worker process's probe thread, one probe at a time.
+        Meant for short calls that check on the client; a probe that hangs keeps its
+        thread forever.
+        """
+        with self._lock:
+            target = self.targets[pid]
+            channel = self._probes.get(pid)
+        future = Future()
+
+        def run() -> None:
+            try:
+                if channel is None:
+                    result = work(self.reflect, target, *args)
+                else:
+                    connection, lock = channel
+                    with lock:
+                        connection.send((work, args))
+                        error, result = connection.recv()
+                    if error is not None:
+                        raise error
+            except Exception as error:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
+
+        threading.Thread(target=run, name=f"probe-{pid}", daemon=True).start()
+        return future
+
+    def run(self, work, *args) -> Dict[int, Future]:
+        """
+        Submits `work` for every client.
+
+        :return: pid -> Future of its result
+        """
+        return {pid: self.submit(pid, work, *args) for pid in self.pids}
+
+    def report(self) -> Dict[int, dict]:
+        """
+        Throughput of every client in the pool, see ClientStats.as_dict. A client's stats
+        go with it.
+        """
+        return {pid: stats.as_dict() for pid, stats in self.stats.items()}
+
+    def close(self) -> None:
+        """
+        Waits for the queued work, then releases every target.
+        """
+        with self._lock:
+            for pid in list(self.targets):
+                self._remove(pid, wait=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
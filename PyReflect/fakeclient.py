@@ -0,0 +1,604 @@
+"""
+A stand-in for libremoteinput, to run PyReflect without a game client.
+
+FakeLibrary exposes every function of RemoteInput.PROTOTYPES as a ctypes callback, so
+calls go through the same argument conversion as with the real library:
+
+    lib = FakeLibrary(clients=2)
+    reflect = RemoteInput(lib)
+    target = reflect.EIOS_PairClient(reflect.EIOS_GetClientPID(0))
+    frame = Frame.from_target(reflect, target)
+
+Every FakeClient has a synthetic image, a square moving over a gradient one step per
+EIOS_UpdateImageBuffer, and keeps the mouse and keyboard state input calls leave behind.
+
+Reflect_* calls read a graph of JavaObject and JavaArray, by default the one from
+synthetic_world(). Like a JNI global reference, every object or array read is a new
+handle that has to be released; `live` counts the handles not released yet, and using a
+handle after its release raises in the callback, which ctypes prints.
+"""
+import itertools
+import random
+import threading
+import time
+from collections import deque
+from ctypes import (
+    CFUNCTYPE,
+    _SimpleCData,
+    addressof,
+    c_uint8,
+    c_void_p,
+    memmove,
+    sizeof,
+)
+from typing import Dict, List, Optional
+
+from reflection import ARRAY_ELEMENTS
+from RemoteInput import PROTOTYPES, ReflectionArrayType
+
+WIDTH, HEIGHT = 765, 503
+BYTES_PER_PIXEL = 4
+
+# side of the moving square, and its BGRA colour
+SQUARE = 24
+SQUARE_COLOUR = bytes((0x1F, 0x8D, 0xFF, 0xFF))
+
+# size of the scene the synthetic world is built on, in tiles
+REGION = 104
+
+# input calls kept per client
+INPUT_LOG = 4096
+
+
+class JavaObject:
+    """
+    An object of the synthetic graph, fields by name.
+
+    Field values are ints, floats, bools, str for Strings and chars, JavaObject, JavaArray
+    or None for null.
+    """
+
+    __slots__ = ("cls", "fields", "supers")
+
+    def __init__(self, cls: str, fields: Optional[dict] = None, supers=()):
+        """
+        :param supers: names of the superclasses, for Reflect_InstanceOf
+        """
+        self.cls = cls
+        self.fields = {} if fields is None else fields
+        self.supers = tuple(supers)
+
+    def __repr__(self):
+        return f"JavaObject({self.cls!r})"
+
+
+class JavaArray:
+    """
+    An array of the synthetic graph.
+
+    Primitive elements are kept in a ctypes array, so Reflect_Array_Index hands out their
+    address as the real library does. Object elements are JavaObject, JavaArray or None,
+    and String elements str.
+    """
+
+    __slots__ = ("type", "elements")
+
+    def __init__(self, type: ReflectionArrayType, elements):
+        self.type = ReflectionArrayType(type)
+        if type in ARRAY_ELEMENTS and type != ReflectionArrayType.OBJECT:
+            elements = list(elements)
+            ctype, _ = ARRAY_ELEMENTS[type]
+            self.elements = (ctype * len(elements))(*elements)
+        else:
+            self.elements = list(elements)
+
+    def __len__(self) -> int:
+        return len(self.elements)
+
+    def __repr__(self):
+        return f"JavaArray({self.type.name}, {len(self)})"
+
+
+def _grid(rows, type: ReflectionArrayType = ReflectionArrayType.INT) -> JavaArray:
+    """
+    A two dimensional Java array, an array of arrays.
+    """
+    return JavaArray(ReflectionArrayType.OBJECT, [JavaArray(type, row) for row in rows])
+
+
+def synthetic_world(npcs: int = 2048, seed: int = 0) -> Dict[str, JavaObject]:
+    """
+    An object graph shaped like a client's, by class for the static fields.
+
+    client.localPlayer  Player         x, y, name, combatLevel
+    client.npcs         [LNPC;         every other slot null, NPC x, y, index, animation,
+                                       health, definition
+    NPC.definition      NPCDefinition  id, name, combatLevel, size
+    client.skillLevels  [I             25 levels
+    client.baseX/baseY  I              origin of the scene in world tiles
+    client.plane        I
+    client.collisionMaps [LCollisionMap;  one per plane, flags [[I of REGION x REGION,
+                                          0 for free tiles and 0x100 for blocked ones
+    """
+    rng = random.Random(seed)
+    definitions = [
+        JavaObject(
+            "NPCDefinition",
+            {"id": i, "name": f"Npc {i}", "combatLevel": rng.randrange(1, 100), "size": 1},
+        )
+        for i in range(64)
+    ]
+    slots = []
+    for index in range(npcs):
+        if index % 2 == 0:
+            slots.append(None)
+            continue
+        fields = {
+            "x": rng.randrange(REGION) * 128 + 64,
+            "y": rng.randrange(REGION) * 128 + 64,
+            "index": index,
+            "animation": rng.choice((-1, -1, -1, 808, 422)),
+            "health": rng.randrange(101),
+            "definition": rng.choice(definitions),
+        }
+        slots.append(JavaObject("NPC", fields, supers=("Actor",)))
+
+    player = JavaObject(
+        "Player",
+        {"x": 52 * 128 + 64, "y": 52 * 128 + 64, "name": "Fake Player", "combatLevel": 3},
+        supers=("Actor",),
+    )
+    collision_maps = []
+    for _ in range(4):
+        rows = [[0x100 if rng.random() < 0.2 else 0 for _ in range(REGION)] for _ in range(REGION)]
+        collision_maps.append(JavaObject("CollisionMap", {"flags": _grid(rows)}))
+
+    client = JavaObject(
+        "client",
+        {
+            "localPlayer": player,
+            "npcs": JavaArray(ReflectionArrayType.OBJECT, slots),
+            "skillLevels": JavaArray(
+                ReflectionArrayType.INT, [rng.randrange(1, 100) for _ in range(25)]
+            ),
+            "baseX": 3200,
+            "baseY": 3200,
+            "plane": 0,
+            "collisionMaps": JavaArray(ReflectionArrayType.OBJECT, collision_maps),
+            "loginState": 30,
+        },
+    )
+    return {"client": client}
+
+
+def _background(width: int, height: int) -> bytes:
+    row = bytearray(width * BYTES_PER_PIXEL)
+    for x in range(width):
+        row[x * 4 : x * 4 + 4] = (x % 256, (x // 3) % 256, 0x40, 0xFF)
+    return bytes(row) * height
+
+
+class FakeClient:
+    """
+    One client the FakeLibrary pretends is running.
+    """
+
+    def __init__(
+        self,
+        pid: int,
+        width: int = WIDTH,
+        height: int = HEIGHT,
+        world: Optional[Dict[str, JavaObject]] = None,
+    ):
+        self.pid = pid
+        self.width = width
+        self.height = height
+        # class -> object holding its static fields
+        self.world = synthetic_world() if world is None else world
+        self.paired = False
+        # seconds every EIOS call on this client takes, to play a client that hangs
+        self.delay = 0.0
+
+        size = width * height * BYTES_PER_PIXEL
+        self.image = (c_uint8 * size)()
+        self.debug_image = (c_uint8 * size)()
+        self.graphics_debugging = False
+        # EIOS_UpdateImageBuffer calls
+        self.updates = 0
+        self._background = _background(width, height)
+        self._square_row = SQUARE_COLOUR * SQUARE
+        self.update_image()
+
+        self.focus = True
+        self.input_enabled = True
+        self.mouse = (-1, -1)
+        self.buttons = set()
+        self.keys = set()
+        self.keyboard_speed = 35
+        self.repeat_delay = 500
+        # (perf_counter(), function, args) of the last INPUT_LOG input calls
+        self.inputs = deque(maxlen=INPUT_LOG)
+
+    @property
+    def square(self):
+        """
+        Top left corner of the moving square.
+        """
+        step = self.updates * 4
+        return step % (self.width - SQUARE), (step // 2) % (self.height - SQUARE)
+
+    def resize(self, width: int, height: int) -> None:
+        """
+        Resizes the client as the player dragging its window does, with new image buffers.
+        """
+        self.width, self.height = width, height
+        size = width * height * BYTES_PER_PIXEL
+        self.image = (c_uint8 * size)()
+        self.debug_image = (c_uint8 * size)()
+        self._background = _background(width, height)
+        self.update_image()
+
+    def update_image(self) -> None:
+        memmove(self.image, self._background, len(self._background))
+        x, y = self.square
+        stride = self.width * BYTES_PER_PIXEL
+        address = addressof(self.image) + y * stride + x * BYTES_PER_PIXEL
+        for _ in range(SQUARE):
+            memmove(address, self._square_row, len(self._square_row))
+            address += stride
+
+    def log(self, function: str, *args) -> None:
+        self.inputs.append((time.perf_counter(), function, args))
+
+
+def _callback_type(name: str):
+    restype, argtypes = PROTOTYPES[name]
+    if restype is not None and not issubclass(restype, _SimpleCData):
+        restype = c_void_p  # callbacks can only return simple types
+    if name == "Reflect_String":
+        # the output buffer, as an address to write to rather than a copy of its bytes
+        argtypes = argtypes[:5] + [c_void_p] + argtypes[6:]
+    return CFUNCTYPE(restype, *argtypes)
+
+
+class FakeLibrary:
+    """
+    Implements the libremoteinput ABI over FakeClients, for RemoteInput(lib=...).
+
+    The methods named after the native functions are the implementations; the instance
+    shadows each with a ctypes callback of it, which is what RemoteInput binds.
+    """
+
+    # what add_client creates
+    client_class = FakeClient
+
+    def __init__(
+        self,
+        clients: int = 1,
+        width: int = WIDTH,
+        height: int = HEIGHT,
+        world: Optional[Dict[str, JavaObject]] = None,
+    ):
+        """
+        :param clients: number of clients running at first, see add_client
+        :param world: object graph shared by every client, a synthetic_world() each by default
+        """
+        self.width = width
+        self.height = height
+        self.world = world
+        self.clients: List[FakeClient] = []
+        self._pids = itertools.count(1000)
+        self._handles = itertools.count(0x1000, 0x10)
+        # target handle -> client
+        self._targets: Dict[int, FakeClient] = {}
+        self._target_of: Dict[int, int] = {}
+        # clients listed by the last EIOS_GetClients, every client until it's first called,
+        # as the plugin lists them when it loads
+        self._listed: List[FakeClient] = []
+        self.injected = 0
+        # reference -> JavaObject or JavaArray
+        self._references = {}
+        self._next_reference = itertools.count(0x100000, 8)
+        self.references = 0
+        # elements Reflect_Array_Index* copied out, valid until the thread's next call
+        self._scratch = threading.local()
+        for _ in range(clients):
+            self.add_client()
+        self._listed = list(self.clients)
+        for name in PROTOTYPES:
+            setattr(self, name, _callback_type(name)(getattr(self, name)))
+
+    def add_client(self, pid: Optional[int] = None) -> FakeClient:
+        """
+        Starts another client.
+        """
+        client = self.client_class(
+            next(self._pids) if pid is None else pid, self.width, self.height, self.world
+        )
+        self.clients.append(client)
+        target = next(self._handles)
+        self._targets[target] = client
+        self._target_of[client.pid] = target
+        return client
+
+    def client(self, pid: int) -> Optional[FakeClient]:
+        return next((client for client in self.clients if client.pid == pid), None)
+
+    @property
+    def live(self) -> int:
+        """
+        References handed out and not released.
+        """
+        return len(self._references)
+
+    def _client(self, target) -> FakeClient:
+        client = self._targets.get(target)
+        if client is None or client not in self.clients:
+            raise ValueError(f"no client with target {target!r}")
+        if client.delay:
+            time.sleep(client.delay)
+        return client
+
+    def _reference(self, value):
+        if value is None:
+            return None
+        reference = next(self._next_reference)
+        self._references[reference] = value
+        self.references += 1
+        return reference
+
+    def _deref(self, reference):
+        try:
+            return self._references[reference]
+        except KeyError:
+            raise ValueError(f"invalid or released reference {reference!r}") from None
+
+    def _field(self, eios, obj, cls: bytes, field: bytes, default):
+        if obj is None:
+            owner = self._client(eios).world.get(cls.decode())
+        else:
+            owner = self._deref(obj)
+        if owner is None:
+            return default
+        return owner.fields.get(field.decode(), default)
+
+    def _keep(self, elements) -> int:
+        self._scratch.elements = elements
+        return addressof(elements)
+
+    def _elements(self, array: JavaArray, type: int, index: int, length: int):
+        """
+        :return: address of `length` elements of `array` from `index`, None if out of bounds
+        """
+        if index < 0 or index + length > len(array) or type == ReflectionArrayType.STRING:
+            return None
+        if type == ReflectionArrayType.OBJECT:
+            elements = array.elements[index : index + length]
+            return self._keep((c_void_p * length)(*map(self._reference, elements)))
+        ctype, _ = ARRAY_ELEMENTS[type]
+        return addressof(array.elements) + index * sizeof(ctype)
+
+    ## EIOS
+
+    def _pair(self, pid: int):
+        client = self.client(pid)
+        if client is None or client.paired:
+            return None
+        client.paired = True
+        return self._target_of[pid]
+
+    def EIOS_RequestTarget(self, initargs):
+        return self._pair(int(initargs))
+
+    def EIOS_ReleaseTarget(self, target):
+        self._targets[target].paired = False
+
+    def EIOS_GetTargetDimensions(self, target, width, height):
+        client = self._client(target)
+        width[0], height[0] = client.width, client.height
+
+    def EIOS_GetImageBuffer(self, target):
+        return addressof(self._client(target).image)
+
+    def EIOS_GetDebugImageBuffer(self, target):
+        return addressof(self._client(target).debug_image)
+
+    def EIOS_SetGraphicsDebugging(self, target, enabled):
+        self._client(target).graphics_debugging = enabled
+
+    def EIOS_UpdateImageBuffer(self, target):
+        client = self._client(target)
+        client.updates += 1
+        client.update_image()
+
+    def EIOS_HasFocus(self, target):
+        return self._client(target).focus
+
+    def EIOS_GainFocus(self, target):
+        self._client(target).focus = True
+
+    def EIOS_LoseFocus(self, target):
+        self._client(target).focus = False
+
+    def EIOS_IsInputEnabled(self, target):
+        return self._client(target).input_enabled
+
+    def EIOS_SetInputEnabled(self, target, enabled):
+        self._client(target).input_enabled = enabled
+
+    def EIOS_GetMousePosition(self, target, x, y):
+        x[0], y[0] = self._client(target).mouse
+
+    EIOS_GetRealMousePosition = EIOS_GetMousePosition
+
+    def EIOS_MoveMouse(self, target, x, y):
+        client = self._client(target)
+        client.mouse = (x, y)
+        client.log("EIOS_MoveMouse", x, y)
+
+    def EIOS_HoldMouse(self, target, x, y, button):
+        client = self._client(target)
+        client.mouse = (x, y)
+        client.buttons.add(button)
+        client.log("EIOS_HoldMouse", x, y, button)
+
+    def EIOS_ReleaseMouse(self, target, x, y, button):
+        client = self._client(target)
+        client.mouse = (x, y)
+        client.buttons.discard(button)
+        client.log("EIOS_ReleaseMouse", x, y, button)
+
+    def EIOS_ScrollMouse(self, target, x, y, lines):
+        client = self._client(target)
+        client.mouse = (x, y)
+        client.log("EIOS_ScrollMouse", x, y, lines)
+
+    def EIOS_IsMouseButtonHeld(self, target, button):
+        return button in self._client(target).buttons
+
+    def EIOS_SendString(self, target, text, keywait, keymodwait):
+        # returns at once, the real one takes about len(text) * keywait ms
+        self._client(target).log("EIOS_SendString", text.decode("utf-8"), keywait, keymodwait)
+
+    def EIOS_HoldKey(self, target, key):
+        client = self._client(target)
+        client.keys.add(key)
+        client.log("EIOS_HoldKey", key)
+
+    def EIOS_ReleaseKey(self, target, key):
+        client = self._client(target)
+        client.keys.discard(key)
+        client.log("EIOS_ReleaseKey", key)
+
+    def EIOS_IsKeyHeld(self, target, key):
+        return key in self._client(target).keys
+
+    def EIOS_GetKeyboardSpeed(self, target):
+        return self._client(target).keyboard_speed
+
+    def EIOS_SetKeyboardSpeed(self, target, speed):
+        self._client(target).keyboard_speed = speed
+
+    def EIOS_GetKeyboardRepeatDelay(self, target):
+        return self._client(target).repeat_delay
+
+    def EIOS_SetKeyboardRepeatDelay(self, target, delay):
+        self._client(target).repeat_delay = delay
+
+    def EIOS_PairClient(self, pid):
+        return self._pair(pid)
+
+    def EIOS_KillClientPID(self, pid):
+        client = self.client(pid)
+        if client is not None:
+            self.clients.remove(client)
+
+    def EIOS_KillClient(self, target):
+        client = self._targets.get(target)
+        if client in self.clients:
+            self.clients.remove(client)
+
+    def EIOS_KillZombieClients(self):
+        pass
+
+    def EIOS_GetClients(self, unpaired_only):
+        self._listed = [client for client in self.clients if not (unpaired_only and client.paired)]
+        return len(self._listed)
+
+    def EIOS_GetClientPID(self, index):
+        return self._listed[index].pid
+
+    ## Reflection
+
+    def EIOS_Inject(self, process_name):
+        self.injected += 1
+
+    def EIOS_Inject_PID(self, pid):
+        self.injected += 1
+
+    def Reflect_GetEIOS(self, pid):
+        return self._target_of.get(pid)
+
+    def Reflect_Object(self, eios, obj, cls, field, desc):
+        return self._reference(self._field(eios, obj, cls, field, None))
+
+    def Reflect_IsSame_Object(self, eios, first, second):
+        return self._deref(first) is self._deref(second)
+
+    def Reflect_InstanceOf(self, eios, obj, cls):
+        value = self._deref(obj)
+        cls = cls.decode()
+        return isinstance(value, JavaObject) and (value.cls == cls or cls in value.supers)
+
+    def _release(self, obj) -> None:
+        if obj is not None:
+            self._deref(obj)
+            del self._references[obj]
+
+    def Reflect_Release_Object(self, eios, obj):
+        self._release(obj)
+
+    def Reflect_Release_Objects(self, eios, objects, amount):
+        for index in range(amount):
+            self._release(objects[index])
+
+    def Reflect_Bool(self, eios, obj, cls, field, desc):
+        return bool(self._field(eios, obj, cls, field, False))
+
+    def Reflect_Char(self, eios, obj, cls, field, desc):
+        value = self._field(eios, obj, cls, field, "\0")
+        return value.encode("latin-1")[:1] if isinstance(value, str) else bytes((value,))
+
+    def Reflect_Byte(self, eios, obj, cls, field, desc):
+        return self._field(eios, obj, cls, field, 0)
+
+    Reflect_Short = Reflect_Int = Reflect_Long = Reflect_Byte
+
+    def Reflect_Float(self, eios, obj, cls, field, desc):
+        return self._field(eios, obj, cls, field, 0.0)
+
+    Reflect_Double = Reflect_Float
+
+    def Reflect_String(self, eios, obj, cls, field, desc, output, output_size):
+        value = (self._field(eios, obj, cls, field, None) or "").encode("utf-8")
+        size = min(len(value), output_size - 1)
+        memmove(output, value, size)
+        memmove(output + size, b"\0", 1)
+
+    def Reflect_Array(self, eios, obj, cls, field, desc):
+        return self._reference(self._field(eios, obj, cls, field, None))
+
+    def Reflect_Array_With_Size(self, eios, obj, output_size, cls, field, desc):
+        array = self._field(eios, obj, cls, field, None)
+        output_size[0] = 0 if array is None else len(array)
+        return self._reference(array)
+
+    def Reflect_Array_Size(self, eios, array):
+        return len(self._deref(array))
+
+    def Reflect_Array_Index(self, eios, array, type, index, length):
+        return self._elements(self._deref(array), type, index, length)
+
+    def _index_nd(self, array, type, length, *position):
+        array = self._deref(array)
+        for index in position[:-1]:
+            array = array.elements[index]
+        return self._elements(array, type, position[-1], length)
+
+    def Reflect_Array_Index2D(self, eios, array, type, length, x, y):
+        return self._index_nd(array, type, length, x, y)
+
+    def Reflect_Array_Index3D(self, eios, array, type, length, x, y, z):
+        return self._index_nd(array, type, length, x, y, z)
+
+    def Reflect_Array_Index4D(self, eios, array, type, length, x, y, z, w):
+        return self._index_nd(array, type, length, x, y, z, w)
+
+    def Reflect_Array_Indices(self, eios, array, type, indices, length):
+        array = self._deref(array)
+        positions = indices[:length]
+        if type == ReflectionArrayType.OBJECT:
+            elements = [self._reference(array.elements[index]) for index in positions]
+            return self._keep((c_void_p * length)(*elements))
+        ctype, _ = ARRAY_ELEMENTS[type]
+        return self._keep((ctype * length)(*[array.elements[index] for index in positions]))
@@ -0,0 +1,214 @@
+"""
+Zero-copy access to the client framebuffer returned by EIOS_GetImageBuffer.
+
+The buffer is `width * height` BGRA pixels (4 bytes each), owned by RemoteInput and
+overwritten in place by EIOS_UpdateImageBuffer. A Frame wraps that memory without
+copying it; call Frame.copy() for a snapshot that won't change underneath you.
+
+    frame = Frame.from_target(reflect, eios_ptr)
+    pixels = frame.array      # numpy (height, width, 4) uint8 view, BGRA
+    raw = frame.memory        # memoryview with the same shape
+    snapshot = frame.copy()   # owns its bytes
+
+Derived images (frame.gray, frame.hsv, frame.plane(i), search masks and the views they are
+built from) are computed once per frame and shared by every caller. A frame from
+Frame.from_target drops them when EIOS_UpdateImageBuffer is next called for its target.
+"""
+from ctypes import c_uint8, c_void_p, cast
+
+try:
+    import numpy
+except ImportError:  # numpy is optional, Frame.memory works without it
+    numpy = None
+
+BYTES_PER_PIXEL = 4
+BLUE, GREEN, RED, ALPHA = range(BYTES_PER_PIXEL)
+
+
+def target_dimensions(reflect, target):
+    """
+    Width and height of the image buffer of `target`, always asked of the client. Memory
+    read from the live buffer must be sized by them: a cached answer, see querycache,
+    would read past the buffer once the client shrinks.
+    """
+    return type(reflect).EIOS_GetTargetDimensions(reflect, target)
+
+
+def image_address(reflect, target, debug: bool = False) -> int:
+    """
+    Address of the (debug) image buffer of `target`. Taken from the raw pointer, as the
+    EIOS_GetImageBuffer wrapper dereferences it and fails on NULL before it can be checked.
+    """
+    function = reflect._EIOS_GetDebugImageBuffer if debug else reflect._EIOS_GetImageBuffer
+    address = cast(function(target), c_void_p).value
+    if not address:
+        raise ValueError("image buffer is NULL, is the target paired?")
+    return address
+
+
+class Frame:
+    """
+    A (height, width, 4) BGRA image over a buffer, native or owned.
+    """
+
+    def __init__(self, buffer, width: int, height: int):
+        """
+        :param buffer: any object exporting the buffer protocol, at least width * height * 4 bytes
+        """
+        self.width = width
+        self.height = height
+        self._buffer = buffer
+        self._memory = None
+        self._array = None
+        self._views = {}
+        # (reflect, target, update count) of the native image this frame wraps
+        self._source = None
+
+    @classmethod
+    def from_address(cls, address: int, width: int, height: int) -> "Frame":
+        """
+        Wraps `width * height` BGRA pixels starting at `address` without copying.
+        """
+        if not address:
+            raise ValueError("image buffer is NULL, is the target paired?")
+        size = width * height * BYTES_PER_PIXEL
+        return cls((c_uint8 * size).from_address(address), width, height)
+
+    @classmethod
+    def from_target(cls, reflect, target, debug: bool = False) -> "Frame":
+        """
+        Wraps the (debug) image buffer of `target`, sized by target_dimensions().
+
+        :param reflect: a RemoteInput instance
+        :param target: the EIOS target
+        :param debug: wrap EIOS_GetDebugImageBuffer instead of EIOS_GetImageBuffer
+        """
+        width, height = target_dimensions(reflect, target)
+        frame = cls.from_address(image_address(reflect, target, debug), width, height)
+        frame._source = (reflect, target, reflect.image_updates.get(target, 0))
+        return frame
+
+    @property
+    def shape(self):
+        return (self.height, self.width, BYTES_PER_PIXEL)
+
+    @property
+    def nbytes(self) -> int:
+        return self.width * self.height * BYTES_PER_PIXEL
+
+    @property
+    def memory(self) -> memoryview:
+        """
+        Unsigned byte memoryview shaped (height, width, 4), sharing the frame's buffer.
+        """
+        if self._memory is None:
+            flat = memoryview(self._buffer).cast("B")[: self.nbytes]
+            self._memory = flat.cast("B", self.shape)
+        return self._memory
+
+    @property
+    def array(self):
+        """
+        numpy uint8 array shaped (height, width, 4) in BGRA order, sharing the frame's buffer.
+        """
+        if self._array is None:
+            if numpy is None:
+                raise ImportError("numpy is required for Frame.array, use Frame.memory instead")
+            self._array = numpy.frombuffer(self._buffer, numpy.uint8, self.nbytes).reshape(
+                self.shape
+            )
+        return self._array
+
+    @property
+    def stale(self) -> bool:
+        """
+        True once the native image this frame wraps has been updated.
+        """
+        if self._source is None:
+            return False
+        reflect, target, updates = self._source
+        return reflect.image_updates.get(target, 0) != updates
+
+    def _check_views(self) -> None:
+        if self._source is None:
+            return
+        reflect, target, updates = self._source
+        current = reflect.image_updates.get(target, 0)
+        if current != updates:
+            self._views.clear()
+            self._source = (reflect, target, current)
+
+    def cached(self, key):
+        """
+        :return: the view memoized under `key` for the current image, or None
+        """
+        self._check_views()
+        return self._views.get(key)
+
+    def view(self, key, compute):
+        """
+        Returns the view memoized under `key`, calling `compute()` to create it the first
+        time it is asked for on the current image.
+        """
+        self._check_views()
+        try:
+            return self._views[key]
+        except KeyError:
+            value = self._views[key] = compute()
+            return value
+
+    def plane(self, channel: int):
+        """
+        Contiguous uint8 (height, width) copy of one channel, BLUE, GREEN, RED or ALPHA.
+        """
+        return self.view(("plane", channel), lambda: self.array[..., channel].copy())
+
+    @property
+    def gray(self):
+        """
+        uint8 (height, width) luma, 0.299 R + 0.587 G + 0.114 B.
+        """
+        return self.view("gray", self._gray)
+
+    def _gray(self):
+        pixels = self.array
+        luma = numpy.multiply(pixels[..., RED], 77, dtype=numpy.uint16)
+        luma += numpy.multiply(pixels[..., GREEN], 150, dtype=numpy.uint16)
+        luma += numpy.multiply(pixels[..., BLUE], 29, dtype=numpy.uint16)
+        luma >>= 8
+        return luma.astype(numpy.uint8)
+
+    @property
+    def hsv(self):
+        """
+        float32 (height, width, 3) of hue in degrees [0, 360), saturation and value in [0, 1].
+        """
+        return self.view("hsv", self._hsv)
+
+    def _hsv(self):
+        bgr = self.array[..., :ALPHA].astype(numpy.float32) * (1.0 / 255.0)
+        blue, green, red = bgr[..., BLUE], bgr[..., GREEN], bgr[..., RED]
+        value = bgr.max(axis=-1)
+        delta = value - bgr.min(axis=-1)
+        with numpy.errstate(divide="ignore", invalid="ignore"):
+            saturation = numpy.where(value > 0, delta / value, 0.0)
+            hue = numpy.select(
+                [value == red, value == green],
+                [(green - blue) / delta, 2.0 + (blue - red) / delta],
+                4.0 + (red - green) / delta,
+            )
+        hue[delta == 0] = 0.0
+        hue = (hue * 60.0) % 360.0
+        return numpy.stack((hue, saturation, value), axis=-1).astype(numpy.float32)
+
+    def tobytes(self) -> bytes:
+        return self.memory.tobytes()
+
+    def copy(self) -> "Frame":
+        """
+        Returns a Frame backed by its own copy of the pixels.
+        """
+        return Frame(bytearray(self.memory), self.width, self.height)
+
+    def __repr__(self):
+        return f"Frame(width={self.width}, height={self.height})"
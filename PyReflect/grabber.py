@@ -0,0 +1,163 @@
+"""
+Background capture of a client's image buffer.
+
+FrameGrabber calls EIOS_UpdateImageBuffer on its own thread at a target rate and copies
+each image into a ring of preallocated buffers, so readers never wait on a capture:
+
+    with FrameGrabber(reflect, eios_ptr, fps=30) as grabber:
+        while running:
+            captured = grabber.latest()
+            if captured is not None:
+                find_things(captured.frame.array)
+"""
+import threading
+import time
+from ctypes import c_uint8, memmove
+from typing import NamedTuple, Optional
+
+from frame import BYTES_PER_PIXEL, Frame, image_address, target_dimensions
+
+
+class CapturedFrame(NamedTuple):
+    frame: Frame
+    # increases by one per captured frame, starting at 1
+    sequence: int
+    # time.perf_counter() when the capture finished
+    timestamp: float
+
+
+class FrameRing:
+    """
+    Preallocated capture buffers, reused in turn. FrameGrabber's default ring.
+
+    A ring hands out the buffer to copy capture `sequence` into with `buffer()` and is
+    told the copy finished with `commit()`; sharedframes.SharedFrameRing is the other one.
+    """
+
+    def __init__(self, buffers: int = 3):
+        if buffers < 2:
+            raise ValueError("a frame ring needs at least 2 buffers")
+        self._buffers = [None] * buffers
+        self._size = (0, 0)
+
+    def buffer(self, sequence: int, width: int, height: int):
+        if (width, height) != self._size:
+            # the client was resized, the old buffers are the wrong size
+            size = width * height * BYTES_PER_PIXEL
+            self._buffers = [(c_uint8 * size)() for _ in self._buffers]
+            self._size = (width, height)
+        return self._buffers[sequence % len(self._buffers)]
+
+    def commit(self, sequence: int, timestamp: float) -> None:
+        pass
+
+
+class FrameGrabber:
+    """
+    Captures frames from one EIOS target on a daemon thread.
+
+    A published frame stays valid until `buffers - 1` newer frames have been captured,
+    so hold on to a CapturedFrame for at most that long or call `frame.copy()`.
+
+    Counters:
+        captured: frames captured
+        dropped: frames replaced by a newer one before anyone called latest()
+        overruns: capture ticks skipped because a capture took longer than 1 / fps
+    """
+
+    def __init__(self, reflect, target, fps: float = 50.0, buffers: int = 3, ring=None):
+        """
+        :param reflect: a RemoteInput instance
+        :param target: the EIOS target
+        :param fps: target capture rate
+        :param buffers: size of the ring, at least 2
+        :param ring: where to copy frames to, a FrameRing(buffers) by default
+        """
+        self.reflect = reflect
+        self.target = target
+        self.fps = fps
+        self.ring = FrameRing(buffers) if ring is None else ring
+        self.captured = 0
+        self.dropped = 0
+        self.overruns = 0
+        self._latest = None
+        self._consumed = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self) -> "FrameGrabber":
+        if self._thread is not None:
+            raise RuntimeError("FrameGrabber is already running")
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="FrameGrabber", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def latest(self) -> Optional[CapturedFrame]:
+        """
+        Returns the newest complete frame, or None before the first capture. Never blocks.
+        """
+        captured = self._latest
+        if captured is not None:
+            self._consumed = captured.sequence
+        return captured
+
+    def stats(self) -> dict:
+        return {
+            "captured": self.captured,
+            "dropped": self.dropped,
+            "overruns": self.overruns,
+        }
+
+    def capture(self) -> CapturedFrame:
+        """
+        Captures and publishes a single frame on the calling thread.
+        """
+        reflect, target = self.reflect, self.target
+        reflect.EIOS_UpdateImageBuffer(target)
+        width, height = target_dimensions(reflect, target)
+        address = image_address(reflect, target)
+
+        sequence = self.captured + 1
+        buffer = self.ring.buffer(sequence, width, height)
+        # ctypes releases the GIL for the copy
+        memmove(buffer, address, width * height * BYTES_PER_PIXEL)
+        timestamp = time.perf_counter()
+        self.ring.commit(sequence, timestamp)
+
+        previous = self._latest
+        if previous is not None and previous.sequence > self._consumed:
+            self.dropped += 1
+        captured = CapturedFrame(Frame(buffer, width, height), sequence, timestamp)
+        self._latest = captured
+        self.captured = sequence
+        return captured
+
+    def _run(self) -> None:
+        period = 1.0 / self.fps
+        deadline = time.perf_counter()
+        while not self._stop.is_set():
+            self.capture()
+            deadline += period
+            now = time.perf_counter()
+            if now > deadline:
+                missed = int((now - deadline) / period) + 1
+                self.overruns += missed
+                deadline += missed * period
+            self._stop.wait(deadline - now)
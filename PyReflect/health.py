@@ -0,0 +1,199 @@
+"""
+Finds clients that stopped responding and kills them.
+
+A HealthSupervisor times a cheap probe, EIOS_HasFocus and EIOS_GetTargetDimensions, for
+every client of a ClientPool. A client whose probe takes longer than `threshold` seconds
+`strikes` times in a row is killed with EIOS_KillClientPID and dropped from the pool,
+then EIOS_KillZombieClients reaps what is left and the pool is refreshed so clients
+started since are picked up:
+
+    with ClientPool(RemoteInput()) as pool, HealthSupervisor(pool, interval=5.0):
+        pool.refresh()
+        ...
+
+Probes go through ClientPool.probe, so they don't wait for the work queued for a client
+and a client busy with a long job isn't taken for a hung one. A probe that never returns
+counts as slow on every check until the client is killed.
+"""
+import threading
+import time
+from concurrent.futures import Future, wait
+from typing import Callable, Dict, List, Optional
+
+from clients import ClientPool
+
+
+def probe(reflect, target) -> None:
+    """
+    The calls timed on every check.
+    """
+    reflect.EIOS_HasFocus(target)
+    reflect.EIOS_GetTargetDimensions(target)
+
+
+class ClientHealth:
+    """
+    Probe results of one client.
+    """
+
+    __slots__ = ("latency", "average", "probes", "slow", "flagged")
+
+    def __init__(self):
+        # seconds taken by the last finished probe, and their moving average
+        self.latency = None
+        self.average = None
+        self.probes = 0
+        # checks in a row the client was slow on
+        self.slow = 0
+        self.flagged = False
+
+    def as_dict(self) -> dict:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+class HealthSupervisor:
+    """
+    Probes every client of a pool on a daemon thread and kills the ones that hang.
+    """
+
+    def __init__(
+        self,
+        pool: ClientPool,
+        interval: float = 5.0,
+        threshold: float = 0.25,
+        strikes: int = 3,
+        kill: bool = True,
+        on_kill: Optional[Callable[[int], None]] = None,
+    ):
+        """
+        :param pool: the clients to watch
+        :param interval: seconds between checks
+        :param threshold: a probe taking longer than this is slow
+        :param strikes: slow checks in a row before a client is killed
+        :param kill: kill slow clients, otherwise only flag them
+        :param on_kill: called with the pid of every client killed
+        """
+        self.pool = pool
+        self.reflect = pool.reflect
+        self.interval = interval
+        self.threshold = threshold
+        self.strikes = strikes
+        self.kill = kill
+        self.on_kill = on_kill
+        self.health: Dict[int, ClientHealth] = {}
+        # pids of the clients killed so far
+        self.killed: List[int] = []
+        # checks on the thread that raised, and the last error
+        self.errors = 0
+        self.error: Optional[BaseException] = None
+        # pid -> (probe still running, when it started)
+        self._running = {}
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _start_probe(self, pid: int):
+        """
+        :return: a Future of the probe's latency in seconds, and when the probe started
+        """
+        started = time.perf_counter()
+        future = Future()
+
+        def finish(probing: Future) -> None:
+            error = probing.exception()
+            if error is None:
+                future.set_result(time.perf_counter() - started)
+            else:
+                future.set_exception(error)
+
+        # next to the client's work rather than behind it, so a long job isn't a hang
+        self.pool.probe(pid, probe).add_done_callback(finish)
+        return future, started
+
+    def check(self) -> List[int]:
+        """
+        Probes every client once, waiting at most `threshold` seconds.
+
+        :return: pids of the clients killed
+        """
+        pids = self.pool.pids
+        for pid in pids:
+            self.health.setdefault(pid, ClientHealth())
+            if pid not in self._running:
+                self._running[pid] = self._start_probe(pid)
+        wait([future for future, _ in self._running.values()], timeout=self.threshold)
+
+        now = time.perf_counter()
+        slow = []
+        for pid in pids:
+            health = self.health[pid]
+            future, started = self._running[pid]
+            if future.done():
+                del self._running[pid]
+                # a probe that failed counts as slow
+                latency = None if future.exception() is not None else future.result()
+                health.probes += 1
+                health.latency = latency
+                if latency is not None and health.average is not None:
+                    health.average = 0.8 * health.average + 0.2 * latency
+                elif latency is not None:
+                    health.average = latency
+                is_slow = latency is None or latency > self.threshold
+            else:
+                is_slow = now - started > self.threshold
+            health.slow = health.slow + 1 if is_slow else 0
+            health.flagged = health.slow >= self.strikes
+            if health.flagged:
+                slow.append(pid)
+
+        killed = []
+        if self.kill and slow:
+            for pid in slow:
+                self.reflect.EIOS_KillClientPID(pid)
+                self.pool.discard(pid)
+                self._forget(pid)
+                killed.append(pid)
+                if self.on_kill is not None:
+                    self.on_kill(pid)
+            self.killed += killed
+            self.reflect.EIOS_KillZombieClients()
+            self.pool.refresh()
+        # clients the pool dropped on its own
+        for pid in [pid for pid in self.health if pid not in self.pool]:
+            self._forget(pid)
+        return killed
+
+    def _forget(self, pid: int) -> None:
+        self.health.pop(pid, None)
+        self._running.pop(pid, None)
+
+    def report(self) -> Dict[int, dict]:
+        return {pid: health.as_dict() for pid, health in self.health.items()}
+
+    def start(self) -> "HealthSupervisor":
+        if self._thread is not None:
+            raise RuntimeError("HealthSupervisor is already running")
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="HealthSupervisor", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                self.check()
+            except Exception as error:
+                # a kill or refresh failing this once mustn't end the supervision
+                self.errors += 1
+                self.error = error
@@ -0,0 +1,213 @@
+"""
+Counts and times every native call a RemoteInput makes.
+
+    instrumentation = Instrumentation(reflect).enable()
+    ...
+    for name, stats in instrumentation.hottest(5):
+        print(name, stats["calls"], stats["total"], stats["p99"])
+    instrumentation.dump("calls.json")
+
+While enabled, the `_<name>` foreign functions RemoteInput binds at load time are replaced
+with timing wrappers; disable() puts the originals back, so it costs nothing while off.
+Objects that copied a foreign function when they were created, such as a Reflector, keep
+the one they copied, so enable instrumentation before creating them.
+"""
+import json
+import time
+from typing import Dict, List, Optional, Tuple
+
+from RemoteInput import PROTOTYPES
+
+# sub-buckets per power of two, latencies are recorded within 1 / 2**SUB_BITS
+SUB_BITS = 4
+_SUB_BUCKETS = 1 << SUB_BITS
+# enough buckets for 2**40 ns, about 18 minutes
+_MAX_EXPONENT = 40
+
+
+def _bucket(value: int) -> int:
+    # values below 2 * _SUB_BUCKETS get a bucket each, above that the top SUB_BITS + 1 bits
+    # pick the bucket and `shift` low bits are dropped
+    if value < 2 * _SUB_BUCKETS:
+        return value
+    shift = value.bit_length() - SUB_BITS - 1
+    return (shift << SUB_BITS) + (value >> shift)
+
+
+def _lowest(bucket: int) -> int:
+    """
+    Smallest value in `bucket`.
+    """
+    if bucket < 2 * _SUB_BUCKETS:
+        return bucket
+    shift, sub = divmod(bucket, _SUB_BUCKETS)
+    return (sub + _SUB_BUCKETS) << (shift - 1)
+
+
+class LatencyHistogram:
+    """
+    Nanosecond latencies in log-linear buckets, like an HDR histogram: every power of two
+    is split into 2**SUB_BITS buckets, so percentiles are within about 6%.
+    """
+
+    __slots__ = ("counts", "count", "total", "min", "max")
+
+    def __init__(self):
+        self.counts = [0] * ((_MAX_EXPONENT + 2) * _SUB_BUCKETS)
+        self.count = 0
+        self.total = 0
+        self.min = None
+        self.max = 0
+
+    def record(self, nanoseconds: int) -> None:
+        bucket = _bucket(nanoseconds)
+        if bucket >= len(self.counts):
+            bucket = len(self.counts) - 1
+        self.counts[bucket] += 1
+        self.count += 1
+        self.total += nanoseconds
+        if self.min is None or nanoseconds < self.min:
+            self.min = nanoseconds
+        if nanoseconds > self.max:
+            self.max = nanoseconds
+
+    def percentile(self, fraction: float) -> int:
+        """
+        :return: nanoseconds that `fraction` of the calls took at most, 0 with no calls
+        """
+        if not self.count:
+            return 0
+        rank = max(int(fraction * self.count + 0.5), 1)
+        seen = 0
+        for bucket, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                return min(_lowest(bucket + 1) - 1, self.max)
+        return self.max
+
+    def buckets(self) -> Dict[int, int]:
+        """
+        :return: lowest value of every non-empty bucket -> its count
+        """
+        return {_lowest(bucket): count for bucket, count in enumerate(self.counts) if count}
+
+    def summary(self) -> dict:
+        """
+        Call count, and times in seconds.
+        """
+        return {
+            "calls": self.count,
+            "total": self.total / 1e9,
+            "mean": self.total / self.count / 1e9 if self.count else 0.0,
+            "min": (self.min or 0) / 1e9,
+            "p50": self.percentile(0.5) / 1e9,
+            "p90": self.percentile(0.9) / 1e9,
+            "p99": self.percentile(0.99) / 1e9,
+            "max": self.max / 1e9,
+        }
+
+
+def _timed(function, histogram: LatencyHistogram):
+    clock = time.perf_counter_ns
+    record = histogram.record
+
+    def timed(*args):
+        start = clock()
+        try:
+            return function(*args)
+        finally:
+            record(clock() - start)
+
+    timed.__wrapped__ = function
+    return timed
+
+
+class Instrumentation:
+    """
+    A LatencyHistogram per native function of one RemoteInput.
+
+    Histograms are updated without a lock; calls made at the same moment from several
+    threads can occasionally miss a count.
+    """
+
+    def __init__(self, reflect, names: Optional[List[str]] = None):
+        """
+        :param names: the functions to time, everything in PROTOTYPES by default
+        """
+        self.reflect = reflect
+        names = list(PROTOTYPES) if names is None else names
+        # only the functions the library exports
+        self.names = [name for name in names if hasattr(reflect, "_" + name)]
+        self.histograms = {name: LatencyHistogram() for name in self.names}
+        self._originals = {}
+        self.started = None
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self._originals)
+
+    def enable(self) -> "Instrumentation":
+        if self.enabled:
+            return self
+        for name in self.names:
+            attribute = "_" + name
+            original = getattr(self.reflect, attribute)
+            self._originals[attribute] = original
+            setattr(self.reflect, attribute, _timed(original, self.histograms[name]))
+        if self.started is None:
+            self.started = time.time()
+        return self
+
+    def disable(self) -> None:
+        for attribute, original in self._originals.items():
+            setattr(self.reflect, attribute, original)
+        self._originals.clear()
+
+    def __enter__(self):
+        return self.enable()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.disable()
+
+    def reset(self) -> None:
+        """
+        Clears every histogram, in place so enabled wrappers keep recording into them.
+        """
+        for histogram in self.histograms.values():
+            histogram.__init__()
+        self.started = time.time() if self.enabled else None
+
+    def snapshot(self, buckets: bool = False) -> Dict[str, dict]:
+        """
+        :param buckets: include the histogram buckets, nanoseconds -> count
+        :return: function name -> LatencyHistogram.summary() for the functions called so far
+        """
+        snapshot = {}
+        for name, histogram in self.histograms.items():
+            if not histogram.count:
+                continue
+            snapshot[name] = histogram.summary()
+            if buckets:
+                snapshot[name]["buckets"] = histogram.buckets()
+        return snapshot
+
+    def hottest(self, count: int = 10) -> List[Tuple[str, dict]]:
+        """
+        :return: the `count` functions with the most total time, as (name, summary)
+        """
+        ranked = sorted(self.snapshot().items(), key=lambda item: item[1]["total"], reverse=True)
+        return ranked[:count]
+
+    def dump(self, path: Optional[str] = None, buckets: bool = True) -> str:
+        """
+        :param path: file to write to, if any
+        :return: the snapshot as JSON
+        """
+        document = json.dumps(
+            {"started": self.started, "taken": time.time(), "functions": self.snapshot(buckets)},
+            indent=2,
+        )
+        if path is not None:
+            with open(path, "w", encoding="utf-8") as file:
+                file.write(document)
+        return document
@@ -0,0 +1,223 @@
+"""
+Human-like mouse movement, streamed to EIOS_MoveMouse by an InputScheduler.
+
+A move is a curved path that speeds up and slows down like a hand does, drawn from a
+cache of path shapes. A shape is generated once with numpy, in a frame where the move
+goes from (0, 0) to (1, 0), and reused for any start and end by rotating and scaling it,
+so a move costs a few small array operations rather than a WindMouse loop per point:
+
+    scheduler = InputScheduler(reflect).start()
+    mouse = MouseMover(reflect, scheduler)
+    mouse.click(eios_ptr, 478, 294, VK_LBUTTON).wait()
+
+    # or as part of a longer timeline
+    login = mouse.timeline((0, 0), (478, 294)).hold_mouse(478, 294, VK_LBUTTON) ...
+
+Moves take longer the further they go, following Fitts' law, and send a point every
+1 / `rate` seconds.
+"""
+import math
+import time
+from typing import Dict, Optional, Tuple
+
+import numpy
+
+from timeline import InputScheduler, ScheduledTimeline, Timeline
+
+# points sent per second, about what a mouse reports
+RATE = 125.0
+
+# path shapes kept per length before they are reused
+VARIANTS = 16
+
+Point = Tuple[int, int]
+
+
+def _min_jerk(t):
+    """
+    Fraction of the way covered at time fraction `t` of a smooth reaching movement.
+    """
+    return t * t * t * (10.0 - 15.0 * t + 6.0 * t * t)
+
+
+def _pinned_walk(random: numpy.random.Generator, points: int):
+    """
+    A random walk from 0 back to 0, scaled to peak at 1.
+    """
+    walk = numpy.zeros(points)
+    numpy.cumsum(random.standard_normal(points - 1), out=walk[1:])
+    walk -= numpy.linspace(0.0, walk[-1], points)
+    peak = numpy.abs(walk).max()
+    return walk / peak if peak > 0 else walk
+
+
+def generate_shape(
+    points: int, random: numpy.random.Generator, wind: float = 0.08, wobble: float = 0.01
+):
+    """
+    A path from (0, 0) to (1, 0) in `points` steps of equal time.
+
+    :param wind: largest sideways drift, as a fraction of the length of the move
+    :param wobble: largest drift along the path
+    :return: float32 (points, 2) array
+    """
+    t = numpy.linspace(0.0, 1.0, points)
+    along = _min_jerk(t) + wobble * random.uniform(0.0, 1.0) * _pinned_walk(random, points)
+    # a smooth bow plus a drifting walk, both zero at the ends
+    bow = random.uniform(-1.0, 1.0) * numpy.sin(numpy.pi * t)
+    side = wind * random.uniform(0.2, 1.0) * (0.6 * bow + 0.4 * _pinned_walk(random, points))
+    return numpy.column_stack((along, side)).astype(numpy.float32)
+
+
+class PathShapes:
+    """
+    Path shapes by number of points, up to `variants` each, generated as they're needed.
+    """
+
+    def __init__(self, variants: int = VARIANTS, wind: float = 0.08, seed: Optional[int] = None):
+        self.variants = variants
+        self.wind = wind
+        self.random = numpy.random.default_rng(seed)
+        self._shapes: Dict[int, list] = {}
+        self.generated = 0
+        self.reused = 0
+
+    def get(self, points: int):
+        """
+        :return: a float32 (points, 2) shape, new until there are `variants` of this length
+        """
+        shapes = self._shapes.setdefault(points, [])
+        if len(shapes) < self.variants:
+            shape = generate_shape(points, self.random, self.wind)
+            shapes.append(shape)
+            self.generated += 1
+            return shape
+        self.reused += 1
+        return shapes[self.random.integers(len(shapes))]
+
+
+def place(shape, start: Point, end: Point, mirror: bool = False):
+    """
+    Rotates and scales `shape` to go from `start` to `end`.
+
+    :param mirror: bend the other way
+    :return: float64 (points, 2) array of x, y
+    """
+    (x0, y0), (x1, y1) = start, end
+    dx, dy = x1 - x0, y1 - y0
+    along, side = shape[:, 0:1], shape[:, 1:2]
+    if mirror:
+        side = -side
+    # `side` runs along the perpendicular (-dy, dx), so it scales with the move too
+    return numpy.array((x0, y0)) + along * numpy.array((dx, dy)) + side * numpy.array((-dy, dx))
+
+
+def movement_time(distance: float, width: float = 10.0, base: float = 0.08, per_bit: float = 0.07):
+    """
+    Fitts' law, seconds to move `distance` pixels onto something `width` pixels wide.
+    """
+    return base + per_bit * math.log2(1.0 + distance / width)
+
+
+class MouseMover:
+    """
+    Sends moves along cached path shapes through an InputScheduler.
+
+    Keeps track of where and when every target's scheduled moves end, so moves scheduled
+    back to back join up instead of overlapping.
+    """
+
+    def __init__(
+        self,
+        reflect,
+        scheduler: InputScheduler,
+        shapes: Optional[PathShapes] = None,
+        rate: float = RATE,
+        width: float = 10.0,
+    ):
+        """
+        :param reflect: a RemoteInput instance
+        :param scheduler: the scheduler that sends the points, one can serve every client
+        :param rate: points per second
+        :param width: target size for movement_time, smaller makes moves slower
+        """
+        self.reflect = reflect
+        self.scheduler = scheduler
+        self.shapes = PathShapes() if shapes is None else shapes
+        self.rate = rate
+        self.width = width
+        # target -> (where its last move ends, perf_counter() time it does)
+        self._positions: Dict[object, Tuple[Point, float]] = {}
+
+    def path(self, start: Point, end: Point):
+        """
+        :return: int32 (n, 2) points after `start` ending at `end`, and the seconds after
+                 the start of the move each is due
+        """
+        distance = math.hypot(end[0] - start[0], end[1] - start[1])
+        if distance < 1.0:
+            return numpy.array([end], dtype=numpy.int32), numpy.zeros(1)
+        random = self.shapes.random
+        duration = movement_time(distance, self.width) * random.uniform(0.9, 1.1)
+        points = max(int(duration * self.rate), 2)
+        shape = self.shapes.get(points)
+        placed = numpy.rint(place(shape, start, end, bool(random.integers(2)))).astype(numpy.int32)
+        placed[-1] = end
+        times = numpy.arange(points) / self.rate
+        # drop the points that don't move the cursor, and the start itself
+        moved = numpy.any(numpy.diff(placed, axis=0, prepend=[start]) != 0, axis=1)
+        return placed[moved], times[moved]
+
+    def timeline(self, start: Point, end: Point, timeline: Optional[Timeline] = None) -> Timeline:
+        """
+        Adds the move from `start` to `end` at the cursor of `timeline`, a new one by default,
+        and moves its cursor to the end of the move.
+        """
+        if timeline is None:
+            timeline = Timeline()
+        points, times = self.path(start, end)
+        for (x, y), at in zip(points.tolist(), times.tolist()):
+            timeline.add("EIOS_MoveMouse", x, y, delay=at)
+        return timeline.wait(float(times[-1]) if len(times) else 0.0)
+
+    def _schedule(self, target, end: Point, timeline: Timeline) -> ScheduledTimeline:
+        now = time.perf_counter()
+        _, free = self._positions.get(target, (None, now))
+        begin = max(now, free)
+        self._positions[target] = (end, begin + timeline.cursor)
+        return self.scheduler.schedule(target, timeline, begin)
+
+    def _start(self, target, start: Optional[Point]) -> Point:
+        if start is not None:
+            return start
+        if target in self._positions:
+            return self._positions[target][0]
+        return tuple(self.reflect.EIOS_GetMousePosition(target))
+
+    def move(self, target, x: int, y: int, start: Optional[Point] = None) -> ScheduledTimeline:
+        """
+        Moves `target`'s cursor to (x, y), from `start` or wherever the last move ends.
+        """
+        start = self._start(target, start)
+        return self._schedule(target, (x, y), self.timeline(start, (x, y)))
+
+    def click(
+        self, target, x: int, y: int, button: int, hold: float = 0.06, start: Optional[Point] = None
+    ) -> ScheduledTimeline:
+        """
+        Moves to (x, y), then holds `button` for `hold` seconds.
+        """
+        start = self._start(target, start)
+        timeline = self.timeline(start, (x, y))
+        timeline.wait(0.5 / self.rate).hold_mouse(x, y, button).wait(hold)
+        timeline.release_mouse(x, y, button)
+        return self._schedule(target, (x, y), timeline)
+
+    def forget(self, target=None) -> None:
+        """
+        Reads the cursor position again before the next move of `target`, or of every target.
+        """
+        if target is None:
+            self._positions.clear()
+        else:
+            self._positions.pop(target, None)
@@ -0,0 +1,326 @@
+"""
+Shortest walking routes over the loaded map region, from the client's collision flags.
+
+A Pathfinder reads the collision flags of the plane the player is on (`int[104][104]`,
+indexed [x][y]) and computes a DistanceField per destination: the number of steps from
+every tile of the region to it. Both are kept until the region's base coordinates or the
+plane change, so a script asking for its route on every step does a table lookup:
+
+    BASE_X = Hook("client", "baseX", "I")
+    BASE_Y = Hook("client", "baseY", "I")
+    PLANE = Hook("client", "plane", "I")
+    COLLISION_MAPS = Hook("client", "collisionMaps", "[LCollisionMap;")
+    FLAGS = Hook("CollisionMap", "flags", "[[I")
+
+    pathfinder = Pathfinder(reflector, COLLISION_MAPS, FLAGS, (BASE_X, BASE_Y), PLANE)
+    route = pathfinder.route((52, 52), (60, 71))   # tiles to walk, None when unreachable
+    steps = pathfinder.distance((52, 52), (60, 71))
+
+Tiles are region coordinates, 0 to 103, `world x = base x + x`. Moves go to the 8
+neighbouring tiles and are checked like the client's route finder does: the tile moved to
+must not be blocked or have a wall on the side moved in from, and a diagonal move also
+needs both tiles it cuts past to be passable. A blocked destination, such as the tile of
+an object, can't be reached; route to a free tile next to it.
+
+Doors opening or closing change the flags without changing the region, call invalidate()
+when the script knows they did.
+"""
+from collections import OrderedDict
+from typing import List, Optional, Sequence, Tuple
+
+import numpy
+
+from reflection import Hook, Reflector
+from RemoteInput import ReflectionArrayType
+
+Tile = Tuple[int, int]
+
+# flags of a tile nothing can walk onto: an object, a floor decoration or blocked floor
+BLOCKED = 0x1240100
+# flags that stop a move onto a tile by the side or corner the move comes in from
+WALL_WEST, WALL_EAST, WALL_SOUTH, WALL_NORTH = 0x80, 0x08, 0x20, 0x02
+
+# (dx, dy, flags the tile moved to mustn't have), in the order the client tries them.
+# Diagonals also check the tiles at (dx, 0) and (0, dy) against the straight moves' flags.
+DIRECTIONS = (
+    (-1, 0, BLOCKED | WALL_EAST),
+    (1, 0, BLOCKED | WALL_WEST),
+    (0, -1, BLOCKED | WALL_NORTH),
+    (0, 1, BLOCKED | WALL_SOUTH),
+    (-1, -1, BLOCKED | 0x0E),
+    (1, -1, BLOCKED | 0x83),
+    (-1, 1, BLOCKED | 0x38),
+    (1, 1, BLOCKED | 0xE0),
+)
+_STRAIGHT = {(dx, dy): flags for dx, dy, flags in DIRECTIONS[:4]}
+
+
+class CollisionMap:
+    """
+    The moves possible from every tile of one plane, worked out from its collision flags.
+
+    Tiles are stored with a border of blocked tiles around them, so a tile's neighbours are
+    at fixed offsets in the flat arrays and moves off the map need no bounds checks.
+    """
+
+    def __init__(self, flags):
+        """
+        :param flags: (width, height) array of collision flags, indexed [x][y]
+        """
+        flags = numpy.asarray(flags)
+        self.width, self.height = flags.shape
+        self._stride = self.height + 2
+        padded = numpy.full((self.width + 2, self._stride), -1, dtype=numpy.int64)
+        padded[1:-1, 1:-1] = flags
+        self.offsets = numpy.array([dx * self._stride + dy for dx, dy, _ in DIRECTIONS])
+        # direction -> flat tile -> can move that way from it
+        self._moves = numpy.zeros((len(DIRECTIONS),) + padded.shape, dtype=bool)
+        width, height = self.width, self.height
+
+        def free(dx, dy, flags):
+            # tiles at (dx, dy) from every tile of the map don't have `flags`
+            return padded[1 + dx : 1 + dx + width, 1 + dy : 1 + dy + height] & flags == 0
+
+        for direction, (dx, dy, flags) in enumerate(DIRECTIONS):
+            possible = free(dx, dy, flags)
+            if dx and dy:
+                possible &= free(dx, 0, _STRAIGHT[dx, 0]) & free(0, dy, _STRAIGHT[0, dy])
+            self._moves[direction, 1:-1, 1:-1] = possible
+        self._moves = self._moves.reshape(len(DIRECTIONS), -1)
+
+    def index(self, tile: Tile) -> int:
+        x, y = tile
+        if not (0 <= x < self.width and 0 <= y < self.height):
+            raise ValueError(f"{tile} is outside the {self.width}x{self.height} region")
+        return (x + 1) * self._stride + y + 1
+
+    def tile(self, index: int) -> Tile:
+        x, y = divmod(index, self._stride)
+        return (x - 1, y - 1)
+
+    def can_move(self, tile: Tile, dx: int, dy: int) -> bool:
+        """
+        :return: whether a step by (dx, dy), each -1, 0 or 1, from `tile` is possible
+        """
+        direction = [(x, y) for x, y, _ in DIRECTIONS].index((dx, dy))
+        return bool(self._moves[direction, self.index(tile)])
+
+    def distance_field(self, destination: Tile) -> "DistanceField":
+        """
+        Breadth first search outwards from `destination`, a frontier at a time: the tiles
+        one step further are those that can move onto a frontier tile and weren't reached.
+        """
+        moves, offsets = self._moves, self.offsets
+        size = moves.shape[1]
+        distances = numpy.full(size, -1, dtype=numpy.int32)
+        start = self.index(destination)
+        distances[start] = 0
+        frontier = numpy.array([start])
+        # the tile `offsets[direction]` before each frontier tile, per direction, and where
+        # the move from it onto the frontier tile is in the flattened moves
+        before = -offsets[:, None]
+        move = numpy.arange(len(offsets))[:, None] * size + before
+        flat_moves = moves.ravel()
+        # tile -> position in the candidates that last claimed it, to drop duplicates
+        # without sorting
+        claims = numpy.zeros(size, dtype=numpy.intp)
+        steps = 0
+        while frontier.size:
+            steps += 1
+            tiles = (frontier + before)[flat_moves.take(frontier + move)]
+            tiles = tiles[distances.take(tiles) < 0]
+            positions = numpy.arange(tiles.size)
+            claims[tiles] = positions
+            frontier = tiles[claims.take(tiles) == positions]
+            distances[frontier] = steps
+
+        # the tile one step closer from every tile, in the first direction that gets there.
+        # Neighbours of the tiles from `low` to `high`, the map without its first and last
+        # rows, are the same slice moved by the direction's offset.
+        low, high = self._stride + 1, size - self._stride - 1
+        here = distances[low:high]
+        wanted = numpy.where(here > 0, here - 1, -2)
+        tiles = numpy.arange(low, high)
+        closer = numpy.full(size, -1, dtype=numpy.int64)
+        for direction in range(len(offsets) - 1, -1, -1):
+            offset = int(offsets[direction])
+            steps_closer = moves[direction, low:high] & (
+                distances[low + offset : high + offset] == wanted
+            )
+            numpy.copyto(closer[low:high], tiles + offset, where=steps_closer)
+        return DistanceField(self, destination, distances, closer)
+
+
+class DistanceField:
+    """
+    Steps from every tile of a CollisionMap to one destination.
+    """
+
+    __slots__ = ("collision", "destination", "_distances", "_next")
+
+    def __init__(self, collision: CollisionMap, destination: Tile, distances, closer):
+        self.collision = collision
+        self.destination = destination
+        # flat, bordered like the map's tiles, -1 where the destination can't be reached
+        self._distances = distances
+        # flat tile -> next tile of its route as a list, followed one tile at a time
+        self._next = closer.tolist()
+
+    @property
+    def distances(self):
+        """
+        (width, height) array of steps, indexed [x][y], -1 where there is no route.
+        """
+        return self._distances.reshape(self.collision.width + 2, -1)[1:-1, 1:-1]
+
+    def distance(self, start: Tile) -> Optional[int]:
+        """
+        :return: steps from `start` to the destination, None if it can't be reached
+        """
+        steps = int(self._distances[self.collision.index(start)])
+        return None if steps < 0 else steps
+
+    def route(self, start: Tile) -> Optional[List[Tile]]:
+        """
+        :return: the tiles to walk after `start`, ending with the destination. Empty when
+                 already there, None when the destination can't be reached.
+        """
+        collision, following = self.collision, self._next
+        index = collision.index(start)
+        if self._distances[index] < 0:
+            return None
+        tiles = []
+        index = following[index]
+        while index >= 0:
+            tiles.append(collision.tile(index))
+            index = following[index]
+        return tiles
+
+
+class Pathfinder:
+    """
+    Routes over the region the client has loaded, reading its collision flags and
+    computing a DistanceField per destination only once per region and plane.
+    """
+
+    def __init__(
+        self,
+        reflector: Reflector,
+        maps: Hook,
+        flags: Hook,
+        base: Sequence[Hook],
+        plane: Hook,
+        size: Tuple[int, int] = (104, 104),
+        capacity: int = 256,
+    ):
+        """
+        :param reflector: Reflector for the client to read from
+        :param maps: static object array field with a collision map per plane
+        :param flags: the collision map's flags field, `int[][]`
+        :param base: static fields whose values key the region, usually its base x and y.
+                     Obfuscated values are fine, they change whenever the real ones do.
+        :param plane: static field with the plane the player is on, used as an index
+        :param size: width and height of the flags array
+        :param capacity: distance fields kept, the least recently used go first
+        """
+        if maps.array_type is not ReflectionArrayType.OBJECT or maps.dimensions != 1:
+            raise ValueError(f"{maps} is not an object array field")
+        if flags.dimensions != len(size):
+            raise ValueError(f"{flags} has {flags.dimensions} dimensions, not {len(size)}")
+        self.reflector = reflector
+        self.maps = maps
+        self.flags = flags
+        self.keys = tuple(base) + (plane,)
+        self.size = tuple(size)
+        self.capacity = capacity
+        self.key = None
+        self.map = None
+        # destination -> DistanceField for the current region
+        self.fields = OrderedDict()
+        # regions read, and distance fields found and computed
+        self.reads = 0
+        self.hits = 0
+        self.misses = 0
+
+    def current_key(self) -> tuple:
+        return tuple(self.reflector.read_all(None, self.keys))
+
+    def region(self, key: Optional[tuple] = None) -> CollisionMap:
+        """
+        :param key: values of `base` and `plane` if the caller already knows them, read from
+                    the client otherwise
+        :return: the collision map of the player's plane, read again when the key changes
+        """
+        if key is None:
+            key = self.current_key()
+        if self.map is None or key != self.key:
+            self.map = CollisionMap(self._read(key[-1]))
+            self.key = key
+            self.fields.clear()
+        return self.map
+
+    def field(self, destination: Tile, key: Optional[tuple] = None) -> DistanceField:
+        """
+        :param key: see region()
+        :return: the distance field to `destination` in the current region
+        """
+        collision = self.region(key)
+        destination = tuple(destination)
+        field = self.fields.get(destination)
+        if field is not None:
+            self.hits += 1
+            self.fields.move_to_end(destination)
+            return field
+        self.misses += 1
+        field = self.fields[destination] = collision.distance_field(destination)
+        if len(self.fields) > self.capacity:
+            self.fields.popitem(last=False)
+        return field
+
+    def route(self, start: Tile, destination: Tile, key=None) -> Optional[List[Tile]]:
+        """
+        :return: see DistanceField.route
+        """
+        return self.field(destination, key).route(start)
+
+    def distance(self, start: Tile, destination: Tile, key=None) -> Optional[int]:
+        """
+        :return: see DistanceField.distance
+        """
+        return self.field(destination, key).distance(start)
+
+    def invalidate(self) -> None:
+        """
+        Reads the flags again on the next query, after the script opened a door.
+        """
+        self.key = self.map = None
+        self.fields.clear()
+
+    def stats(self) -> dict:
+        return {
+            "regions": self.reads,
+            "fields": len(self.fields),
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+    def _read(self, plane: int):
+        reflector = self.reflector
+        maps = reflector.read(None, self.maps)
+        if maps is None:
+            raise ValueError(f"{self.maps} is null")
+        collision = flags = None
+        try:
+            collision = reflector.read_array_index(maps, self.maps.array_type, plane)
+            if collision is None:
+                raise ValueError(f"no collision map for plane {plane}")
+            flags = reflector.read(collision, self.flags)
+            if flags is None:
+                raise ValueError(f"{self.flags} of plane {plane} is null")
+            value = reflector.read_array_nd(flags, self.flags.array_type, self.size)
+        finally:
+            for obj in (flags, collision, maps):
+                if obj is not None:
+                    reflector.release(obj)
+        self.reads += 1
+        return value
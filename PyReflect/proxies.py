@@ -0,0 +1,363 @@
+"""
+Python classes for the client's obfuscated Java classes, generated from a hooks file.
+
+The hooks file has one field per line, the name to give it, the Java field, its
+descriptor and, for obfuscated ints and longs, the multiplier that decodes it:
+
+    # name                 field        descriptor  multiplier
+    Client.localPlayer     client.hc    Lcy;
+    Client.players         client.hp    [Lcy;
+    Player.x               cy.az        I           -1234567
+    Player.name            cy.bn        Ljava/lang/String;
+
+generate() turns it into a module of Proxy subclasses, `python proxies.py hooks.txt -o
+hooks_generated.py`, or load() builds the classes without writing a file:
+
+    Client, Player = load("hooks.txt").values()
+    context = ProxyContext(reflector, tick=GAME_TICK)   # hook of the game's tick counter
+    client = Client(context)
+    with ObjectArena(reflector):
+        context.sync()
+        player = client.localPlayer    # a Player, or None
+        x = player.x                   # Reflect_Int, decoded
+        x = player.x                   # memoized until the next tick
+
+Fields are read on first access and memoized per instance until the context's tick
+changes. Strings come back as str, object fields as proxies of their class when it has
+one and as jobject handles otherwise. The context holds the references of memoized fields,
+whether or not an ObjectArena is open, and releases them on the next tick or release(), so
+a proxy or handle read from a field is only valid during the tick it was read in.
+"""
+import argparse
+import keyword
+import time
+from collections import OrderedDict
+from ctypes import c_void_p
+from typing import Dict, List, NamedTuple, Optional
+
+from reflection import ARRAY_ELEMENTS, OBJECT_READERS, Hook, Reflector
+from RemoteInput import ReflectionArrayType
+from snapshots import TICK
+
+# Java class of static fields
+STATIC_CLASS = "client"
+
+# array types Field.read copies out whole, object arrays come back as a handle
+PRIMITIVE_ARRAYS = frozenset(ARRAY_ELEMENTS) - {ReflectionArrayType.OBJECT}
+
+STRING = "Ljava/lang/String;"
+
+# Proxy subclasses by name, how object fields find the class to wrap their value in
+_registry = {}
+
+
+class HookDefinition(NamedTuple):
+    proxy: str
+    attribute: str
+    cls: str
+    field: str
+    desc: str
+    multiplier: Optional[int]
+
+
+def _decoder(desc: str, multiplier: Optional[int]):
+    """
+    :return: function undoing the int or long multiplier obfuscation, None if there is none
+    """
+    if multiplier is None or multiplier == 1:
+        return None
+    if desc == "I":
+        bits = 32
+    elif desc == "J":
+        bits = 64
+    else:
+        raise ValueError(f"only I and J fields have multipliers, not {desc}")
+    mask, sign = (1 << bits) - 1, 1 << (bits - 1)
+
+    def decode(value: int) -> int:
+        # the client multiplies in wrapping java arithmetic, so do we
+        value = (value * multiplier) & mask
+        return value - (1 << bits) if value & sign else value
+
+    return decode
+
+
+def _primitive_array(hook: Hook) -> bool:
+    return hook.dimensions == 1 and hook.array_type in PRIMITIVE_ARRAYS
+
+
+class ProxyContext:
+    """
+    What proxies read with, and the tick their memoized values belong to.
+    """
+
+    def __init__(self, reflector: Reflector, tick: Optional[Hook] = None, period: float = TICK):
+        """
+        :param tick: static int field that changes every game tick, for sync(). Without it
+                     sync() starts a new tick every `period` seconds.
+        """
+        self.reflector = reflector
+        self.tick_hook = tick
+        self.period = period
+        self.tick = None
+        # bumped on every new tick, proxies compare it against their own
+        self.generation = 0
+        # references memoized fields hold, released on the next tick
+        self._references = []
+
+    def next_tick(self) -> None:
+        """
+        Forgets every memoized value and releases the references they held.
+        """
+        self.generation += 1
+        self.release()
+
+    def hold(self, obj) -> None:
+        """
+        Takes `obj` from the open ObjectArena, if any, to release it on the next tick.
+        """
+        if not obj:
+            return
+        arena = self.reflector.arena
+        if arena is not None:
+            arena.forget(obj)
+        self._references.append(obj)
+
+    def release(self) -> None:
+        """
+        Releases the references memoized fields hold, in one native call. Proxies and
+        handles read from fields can't be used after.
+        """
+        references = self._references
+        if not references:
+            return
+        reflector, amount = self.reflector, len(references)
+        reflector._Reflect_Release_Objects(
+            reflector.eios, (c_void_p * amount)(*references), amount
+        )
+        references.clear()
+
+    def sync(self) -> bool:
+        """
+        Reads the tick hook and starts a new tick if it changed.
+
+        :return: True if it did
+        """
+        if self.tick_hook is None:
+            tick = int(time.monotonic() / self.period)
+        else:
+            tick = self.reflector.read(None, self.tick_hook)
+        if tick == self.tick:
+            return False
+        self.tick = tick
+        self.next_tick()
+        return True
+
+
+class Field:
+    """
+    A memoized hook on a Proxy subclass.
+    """
+
+    __slots__ = ("name", "hook", "decode", "proxy", "reference")
+
+    def __init__(
+        self,
+        cls: str,
+        field: str,
+        desc: str,
+        multiplier: Optional[int] = None,
+        proxy: Optional[str] = None,
+    ):
+        """
+        :param proxy: name of the Proxy subclass to wrap object values in
+        """
+        self.name = field
+        self.hook = Hook(cls, field, desc)
+        self.decode = _decoder(desc, multiplier)
+        self.proxy = proxy
+        # the value holds a jobject, strings and primitive arrays are copied out
+        self.reference = (
+            self.hook.reader in OBJECT_READERS
+            and desc != STRING
+            and not _primitive_array(self.hook)
+        )
+
+    def __set_name__(self, owner, name: str):
+        self.name = name
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self
+        context = instance._context
+        values = instance._values
+        if instance._generation != context.generation:
+            values.clear()
+            instance._generation = context.generation
+        else:
+            try:
+                return values[self.name]
+            except KeyError:
+                pass
+        value = values[self.name] = self.read(context, instance._obj)
+        if self.reference:
+            context.hold(value._obj if isinstance(value, Proxy) else value)
+        return value
+
+    def read(self, context: ProxyContext, obj):
+        """
+        Reads the field from `obj`, bypassing the memo.
+        """
+        hook, reflector = self.hook, context.reflector
+        if _primitive_array(hook):
+            return reflector.read_array_field(obj, hook)
+        if hook.desc == STRING:
+            return reflector.read_string(obj, hook)
+        value = reflector.read(obj, hook)
+        if self.decode is not None:
+            return self.decode(value)
+        if self.proxy is not None:
+            return None if value is None else _registry[self.proxy](context, value)
+        return value
+
+    def __repr__(self):
+        return f"Field({self.hook!r})"
+
+
+class Proxy:
+    """
+    Base of the generated classes, wraps one jobject, None for the static fields.
+    """
+
+    __slots__ = ("_context", "_obj", "_generation", "_values")
+
+    # the Java class it wraps
+    java_class = None
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        _registry[cls.__name__] = cls
+
+    def __init__(self, context: ProxyContext, obj=None):
+        self._context = context
+        self._obj = obj
+        self._generation = context.generation
+        self._values = {}
+
+    @property
+    def obj(self):
+        return self._obj
+
+    def __eq__(self, other):
+        return isinstance(other, Proxy) and self._obj == other._obj
+
+    def __hash__(self):
+        return hash(self._obj)
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self._obj:#x})" if self._obj else f"{type(self).__name__}()"
+
+
+def parse_hooks(text: str, filename: str = "<hooks>") -> List[HookDefinition]:
+    definitions = []
+    for number, line in enumerate(text.splitlines(), 1):
+        line = line.split("#", 1)[0].strip()
+        if not line:
+            continue
+        parts = line.split()
+        try:
+            name, java, desc = parts[:3]
+            proxy, attribute = name.split(".")
+            cls, field = java.rsplit(".", 1)
+            multiplier = int(parts[3], 0) if len(parts) > 3 else None
+            if len(parts) > 4:
+                raise ValueError("too many columns")
+            Hook(cls, field, desc)
+        except ValueError as error:
+            raise ValueError(f"{filename}:{number}: {error}: {line!r}") from None
+        if not proxy.isidentifier() or not attribute.isidentifier() or keyword.iskeyword(attribute):
+            raise ValueError(f"{filename}:{number}: not a valid python name: {name!r}")
+        definitions.append(HookDefinition(proxy, attribute, cls, field, desc, multiplier))
+    return definitions
+
+
+def load_hooks(path: str) -> List[HookDefinition]:
+    with open(path, encoding="utf-8") as file:
+        return parse_hooks(file.read(), path)
+
+
+def _classes(definitions: List[HookDefinition]) -> Dict[str, str]:
+    """
+    :return: proxy name -> the Java class its instance fields belong to
+    """
+    classes = {}
+    for definition in definitions:
+        classes.setdefault(definition.proxy, None)
+        if definition.cls == STATIC_CLASS:
+            continue
+        known = classes[definition.proxy]
+        if known is not None and known != definition.cls:
+            raise ValueError(
+                f"{definition.proxy} has fields of both {known} and {definition.cls}"
+            )
+        classes[definition.proxy] = definition.cls
+    return classes
+
+
+def generate(definitions: List[HookDefinition], source: str = "hooks") -> str:
+    """
+    :return: python source of a module defining a Proxy subclass per proxy name
+    """
+    classes = _classes(definitions)
+    proxy_for = {cls: name for name, cls in classes.items() if cls is not None}
+    fields = OrderedDict((name, []) for name in classes)
+    for definition in definitions:
+        fields[definition.proxy].append(definition)
+
+    lines = [
+        '"""',
+        f"Proxies generated from {source} by proxies.py, don't edit.",
+        '"""',
+        "from proxies import Field, Proxy",
+    ]
+    for name, members in fields.items():
+        lines += ["", "", f"class {name}(Proxy):", "    __slots__ = ()", ""]
+        lines.append(f"    java_class = {classes[name]!r}")
+        for hook in members:
+            arguments = [repr(hook.cls), repr(hook.field), repr(hook.desc)]
+            if hook.multiplier is not None:
+                arguments.append(f"multiplier={hook.multiplier}")
+            if hook.desc.startswith("L") and hook.desc[1:-1] in proxy_for:
+                arguments.append(f"proxy={proxy_for[hook.desc[1:-1]]!r}")
+            lines.append(f"    {hook.attribute} = Field({', '.join(arguments)})")
+    lines.append("")
+    return "\n".join(lines)
+
+
+def load(path: str) -> Dict[str, type]:
+    """
+    Builds the proxies for the hooks file at `path` without writing them out.
+
+    :return: proxy name -> class, in the order the file names them
+    """
+    definitions = load_hooks(path)
+    namespace = {"__name__": "proxies_generated"}
+    exec(compile(generate(definitions, path), path, "exec"), namespace)
+    return {name: namespace[name] for name in _classes(definitions)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate proxy classes from a hooks file.")
+    parser.add_argument("hooks", help="hooks file")
+    parser.add_argument("-o", "--output", help="module to write, stdout by default")
+    args = parser.parse_args()
+    source = generate(load_hooks(args.hooks), args.hooks)
+    if args.output is None:
+        print(source, end="")
+    else:
+        with open(args.output, "w", encoding="utf-8") as file:
+            file.write(source)
+
+
+if __name__ == "__main__":
+    main()
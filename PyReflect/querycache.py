@@ -0,0 +1,220 @@
+"""
+Answers the cheap EIOS queries a script asks over and over from a cache.
+
+    cache = QueryCache(reflect).enable()
+    while running:
+        if reflect.EIOS_HasFocus(target):     # asks the client at most every 0.25s
+            ...
+    print(cache.stats())
+
+While enabled, EIOS_GetTargetDimensions, EIOS_HasFocus, EIOS_IsInputEnabled and
+EIOS_GetMousePosition of the RemoteInput answer from the cache, and ask the client when
+the answer for that target is older than its TTL. Calls made through the same RemoteInput
+that change an answer update or drop it:
+
+    EIOS_MoveMouse, EIOS_HoldMouse,        set the mouse position to where they sent it
+    EIOS_ReleaseMouse, EIOS_ScrollMouse
+    EIOS_SetInputEnabled                   sets whether input is enabled
+    EIOS_GainFocus, EIOS_LoseFocus         drop the focus, the client may not have
+                                           taken or lost it yet when they return
+    EIOS_ReleaseTarget, EIOS_KillClient    drop everything about the target
+
+The TTLs bound how stale an answer changed by anything else can get: the player moving the
+mouse or clicking another window, another process, or the client being resized. Frame,
+FrameGrabber and Recorder size what they read from the image buffer by
+frame.target_dimensions(), which always asks the client, so a stale size never makes them
+read past it. A probe answered from the cache doesn't reach the client, so give a
+HealthSupervisor a RemoteInput without one.
+
+The cached methods are set on the RemoteInput instance, disable() removes them again.
+"""
+import math
+import threading
+import time
+from typing import Dict, Optional
+
+# seconds an answer is used for, None keeps it until a call through the cache changes it
+TTL = {
+    "EIOS_GetTargetDimensions": 1.0,
+    "EIOS_HasFocus": 0.25,
+    "EIOS_IsInputEnabled": 1.0,
+    "EIOS_GetMousePosition": 0.25,
+}
+
+# calls that put the mouse at their x, y arguments
+MOUSE_MOVES = ("EIOS_MoveMouse", "EIOS_HoldMouse", "EIOS_ReleaseMouse", "EIOS_ScrollMouse")
+FOCUS_CHANGES = ("EIOS_GainFocus", "EIOS_LoseFocus")
+TARGET_ENDS = ("EIOS_ReleaseTarget", "EIOS_KillClient")
+
+
+class QueryCache:
+    """
+    Cached answers of one RemoteInput, per query and target.
+
+    Counters are updated without a lock; calls made at the same moment from several
+    threads can occasionally miss a count. A query that was being answered by the client
+    while a call changed its answer isn't cached.
+    """
+
+    def __init__(self, reflect, ttl: Optional[Dict[str, Optional[float]]] = None):
+        """
+        :param ttl: query -> seconds, overrides TTL. 0 always asks the client
+        """
+        self.reflect = reflect
+        self.ttl = dict(TTL)
+        for query, seconds in (ttl or {}).items():
+            if query not in TTL:
+                raise ValueError(f"{query} isn't cached, only {', '.join(TTL)}")
+            self.ttl[query] = seconds
+        # query -> target -> (answer, monotonic time it expires at)
+        self._answers = {query: {} for query in TTL}
+        self.hits = dict.fromkeys(TTL, 0)
+        self.misses = dict.fromkeys(TTL, 0)
+        # calls that changed answers, one asked for while a call changed it isn't cached
+        self._writes = 0
+        # held to change answers, and to cache one unless the calls changed meanwhile
+        self._lock = threading.Lock()
+        # method name -> what the instance had under it, None for the class's method
+        self._originals = {}
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self._originals)
+
+    def enable(self) -> "QueryCache":
+        if self.enabled:
+            return self
+        wrappers = {query: self._query(query) for query in TTL}
+        for name in MOUSE_MOVES:
+            wrappers[name] = self._write(name, self._moved)
+        for name in FOCUS_CHANGES:
+            wrappers[name] = self._write(name, self._focus_changed)
+        wrappers["EIOS_SetInputEnabled"] = self._write("EIOS_SetInputEnabled", self._enabled)
+        for name in TARGET_ENDS:
+            wrappers[name] = self._write(name, self._forget)
+        for name, wrapper in wrappers.items():
+            self._originals[name] = self.reflect.__dict__.get(name)
+            setattr(self.reflect, name, wrapper)
+        return self
+
+    def disable(self) -> None:
+        for name, original in self._originals.items():
+            if original is None:
+                delattr(self.reflect, name)
+            else:
+                setattr(self.reflect, name, original)
+        self._originals.clear()
+        self.invalidate()
+
+    def __enter__(self):
+        return self.enable()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.disable()
+
+    def invalidate(self, target=None, query: Optional[str] = None) -> None:
+        """
+        Drops cached answers, so the next queries ask the client.
+
+        :param target: only the answers about this target
+        :param query: only the answers to this query
+        """
+        with self._lock:
+            for name in TTL if query is None else (query,):
+                if target is None:
+                    self._answers[name].clear()
+                else:
+                    self._answers[name].pop(target, None)
+            self._writes += 1
+
+    def reset(self) -> None:
+        """
+        Zeroes the counters.
+        """
+        for query in TTL:
+            self.hits[query] = self.misses[query] = 0
+
+    def stats(self) -> dict:
+        """
+        :return: query -> its hits, misses and hit rate, and the totals
+        """
+        queries = {}
+        for query in TTL:
+            hits, misses = self.hits[query], self.misses[query]
+            total = hits + misses
+            queries[query] = {
+                "hits": hits,
+                "misses": misses,
+                "hit_rate": hits / total if total else 0.0,
+            }
+        hits, misses = sum(self.hits.values()), sum(self.misses.values())
+        return {
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": hits / (hits + misses) if hits + misses else 0.0,
+            "queries": queries,
+        }
+
+    def _expires(self, query: str) -> float:
+        ttl = self.ttl[query]
+        return math.inf if ttl is None else time.monotonic() + ttl
+
+    def _query(self, query: str):
+        ask = getattr(self.reflect, query)
+        answers = self._answers[query]
+        hits, misses = self.hits, self.misses
+        clock = time.monotonic
+        lock = self._lock
+        # EIOS_GetTargetDimensions returns a list, every caller gets a copy to change
+        copy = list if query == "EIOS_GetTargetDimensions" else None
+
+        def cached(target):
+            answer = answers.get(target)
+            if answer is not None and clock() < answer[1]:
+                hits[query] += 1
+                value = answer[0]
+            else:
+                misses[query] += 1
+                writes = self._writes
+                value = ask(target)
+                with lock:
+                    if writes == self._writes:
+                        answers[target] = (value, self._expires(query))
+            return value if copy is None else copy(value)
+
+        cached.__wrapped__ = ask
+        return cached
+
+    def _write(self, name: str, update):
+        call = getattr(self.reflect, name)
+
+        def write(target, *args):
+            changed, changes = update, args
+            try:
+                return call(target, *args)
+            except BaseException:
+                # what the call changed is unknown
+                changed, changes = self._forget, ()
+                raise
+            finally:
+                with self._lock:
+                    changed(target, *changes)
+                    self._writes += 1
+
+        write.__wrapped__ = call
+        return write
+
+    def _moved(self, target, x: int, y: int, *_) -> None:
+        query = "EIOS_GetMousePosition"
+        self._answers[query][target] = ((x, y), self._expires(query))
+
+    def _focus_changed(self, target) -> None:
+        self._answers["EIOS_HasFocus"].pop(target, None)
+
+    def _enabled(self, target, enabled: bool) -> None:
+        query = "EIOS_IsInputEnabled"
+        self._answers[query][target] = (bool(enabled), self._expires(query))
+
+    def _forget(self, target) -> None:
+        for answers in self._answers.values():
+            answers.pop(target, None)
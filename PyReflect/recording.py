@@ -0,0 +1,480 @@
+"""
+Recording a session to a file, and replaying it without a client.
+
+A Recorder logs the image every EIOS_UpdateImageBuffer fetches and every input call a
+RemoteInput makes, with timestamps, to an append-only memory-mapped file:
+
+    with Recorder(reflect, "session.rec") as recorder:
+        run_script(reflect)          # FrameGrabber, InputScheduler, ... as usual
+    print(recorder.stats())
+
+A frame is stored as the byte spans that changed since the previous frame of its target,
+with a whole keyframe every `keyframe_interval` frames, so a client showing the same
+scene costs kilobytes per frame rather than the 1.5 MB of a 765x503 image.
+
+A ReplayLibrary stands in for libremoteinput with a recording. Each recorded target is a
+client, and each EIOS_UpdateImageBuffer shows its next frame, as fast as the code under
+test asks for them, or at `speed` times the recorded pace:
+
+    library = ReplayLibrary(Recording("session.rec"))
+    reflect = RemoteInput(library)
+    target = reflect.EIOS_PairClient(reflect.EIOS_GetClientPID(0))
+    grabber = FrameGrabber(reflect, target)
+    while not library.finished:
+        detect(grabber.capture().frame)
+
+Input sent during a replay only changes the replayed client's state and is logged in its
+`inputs`; what was recorded is in Recording.inputs.
+"""
+import bisect
+import json
+import mmap
+import struct
+import threading
+import time
+from ctypes import c_uint8, memmove
+from typing import Dict, List, NamedTuple, Optional
+
+import numpy
+
+from fakeclient import FakeClient, FakeLibrary
+from frame import BYTES_PER_PIXEL, target_dimensions
+
+MAGIC = b"PYREFREC"
+VERSION = 1
+# magic, version, time.time() the recording started, end of the last complete record
+_HEADER = struct.Struct("<8sIxxxxdQ")
+_END = struct.Struct("<Q")
+_END_OFFSET = _HEADER.size - _END.size
+# kind, encoding, payload size, seconds since the start, target
+_RECORD = struct.Struct("<BBxxIdQ")
+# frame payload: width, height, then the pixels or the spans
+_FRAME = struct.Struct("<II")
+# span count, then as many uint32 offsets, uint32 lengths, and the changed bytes
+_SPANS = struct.Struct("<I")
+
+# record kinds
+FRAME, INPUT = 1, 2
+# frame encodings
+KEYFRAME, DELTA = 0, 1
+
+# the file grows by this much at a time
+GROWTH = 64 << 20
+
+# RemoteInput functions logged as input, all called with the target first
+INPUT_FUNCTIONS = (
+    "EIOS_GainFocus",
+    "EIOS_LoseFocus",
+    "EIOS_SetInputEnabled",
+    "EIOS_MoveMouse",
+    "EIOS_HoldMouse",
+    "EIOS_ReleaseMouse",
+    "EIOS_ScrollMouse",
+    "EIOS_SendString",
+    "EIOS_HoldKey",
+    "EIOS_ReleaseKey",
+)
+
+
+class RecordLog:
+    """
+    An append-only file of records, written through a memory map.
+
+    A record counts once the end offset in the file header has been moved past it, so a
+    recording read while it is still written never shows half a record.
+    """
+
+    def __init__(self, path: str, growth: int = GROWTH):
+        self.path = path
+        self.growth = growth
+        self.started = time.time()
+        self._origin = time.perf_counter()
+        self.end = _HEADER.size
+        self._file = open(path, "w+b")
+        self._map = None
+        self._lock = threading.Lock()
+        self._reserve(self.end)
+        _HEADER.pack_into(self._map, 0, MAGIC, VERSION, self.started, self.end)
+
+    def now(self) -> float:
+        """
+        Seconds since the log was created.
+        """
+        return time.perf_counter() - self._origin
+
+    def _reserve(self, size: int) -> None:
+        if self._map is not None and size <= len(self._map):
+            return
+        capacity = (size // self.growth + 1) * self.growth
+        if self._map is not None:
+            self._map.close()
+        self._file.truncate(capacity)
+        self._map = mmap.mmap(self._file.fileno(), capacity)
+
+    def append(self, kind: int, encoding: int, target, parts, timestamp: Optional[float] = None):
+        """
+        :param parts: bytes-like objects, written one after the other as the payload
+        :return: payload size
+        """
+        parts = [memoryview(part).cast("B") for part in parts]
+        size = sum(len(part) for part in parts)
+        with self._lock:
+            if timestamp is None:
+                timestamp = self.now()
+            start = self.end
+            end = start + _RECORD.size + size
+            self._reserve(end)
+            _RECORD.pack_into(self._map, start, kind, encoding, size, timestamp, target or 0)
+            offset = start + _RECORD.size
+            for part in parts:
+                self._map[offset : offset + len(part)] = part
+                offset += len(part)
+            self.end = end
+            _END.pack_into(self._map, _END_OFFSET, end)
+        return size
+
+    def close(self) -> None:
+        with self._lock:
+            if self._file.closed:
+                return
+            self._map.flush()
+            self._map.close()
+            # cut the unused growth off again
+            self._file.truncate(self.end)
+            self._file.close()
+
+
+def _spans(previous, current, stride: int):
+    """
+    The bytes of `current` that differ from `previous`, one span per changed row.
+
+    :return: uint32 offsets, uint32 lengths, and the bytes of every span one after another
+    """
+    changed = (previous != current).reshape(-1, stride)
+    rows = numpy.flatnonzero(changed.any(axis=1))
+    changed = changed[rows]
+    first = changed.argmax(axis=1)
+    last = stride - changed[:, ::-1].argmax(axis=1)
+    offsets = (rows * stride + first).astype("<u4")
+    lengths = (last - first).astype("<u4")
+    return offsets, lengths, current[_span_index(offsets, lengths)]
+
+
+def _span_index(offsets, lengths):
+    """
+    Indices of every byte of the spans, in order.
+    """
+    starts = numpy.cumsum(lengths, dtype=numpy.int64) - lengths
+    total = int(lengths.sum(dtype=numpy.int64))
+    return numpy.arange(total) + numpy.repeat(offsets.astype(numpy.int64) - starts, lengths)
+
+
+class Recorder:
+    """
+    Logs the frames and input calls of one RemoteInput to a RecordLog.
+
+    While enabled, the RemoteInput's `_EIOS_UpdateImageBuffer` and input functions are
+    replaced with wrappers that record, like instrument.Instrumentation does. The public
+    methods, and with them FrameGrabber and InputScheduler, go through the wrappers.
+    """
+
+    def __init__(self, reflect, path: str, keyframe_interval: int = 250):
+        """
+        :param reflect: a RemoteInput instance
+        :param path: file to write, replaced if it exists
+        :param keyframe_interval: frames of a target between whole frames, which a replay
+                                  at `speed` skips ahead from
+        """
+        self.reflect = reflect
+        self.log = RecordLog(path)
+        self.keyframe_interval = keyframe_interval
+        self._originals = {}
+        # target -> [previous frame, spare buffer, frames since the last keyframe]
+        self._targets = {}
+        self._lock = threading.Lock()
+        self.frames = 0
+        self.keyframes = 0
+        self.inputs = 0
+        # image bytes captured, and bytes written for them
+        self.raw_bytes = 0
+        self.written = 0
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self._originals)
+
+    def enable(self) -> "Recorder":
+        if self.enabled:
+            return self
+        reflect = self.reflect
+        update = reflect._EIOS_UpdateImageBuffer
+
+        def record_update(target):
+            update(target)
+            self.record_frame(target)
+
+        self._originals["_EIOS_UpdateImageBuffer"] = update
+        reflect._EIOS_UpdateImageBuffer = record_update
+        for name in INPUT_FUNCTIONS:
+            attribute = "_" + name
+            if hasattr(reflect, attribute):
+                original = getattr(reflect, attribute)
+                self._originals[attribute] = original
+                setattr(reflect, attribute, self._recording(name, original))
+        return self
+
+    def _recording(self, name: str, function):
+        record = self.record_input
+
+        def call(target, *args):
+            record(target, name, args)
+            return function(target, *args)
+
+        return call
+
+    def disable(self) -> None:
+        for attribute, original in self._originals.items():
+            setattr(self.reflect, attribute, original)
+        self._originals.clear()
+
+    def close(self) -> None:
+        """
+        Stops recording and finishes the file.
+        """
+        self.disable()
+        self.log.close()
+
+    def __enter__(self):
+        return self.enable()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def record_input(self, target, name: str, args: tuple) -> None:
+        args = [arg.decode("utf-8", "replace") if isinstance(arg, bytes) else arg for arg in args]
+        self.log.append(INPUT, 0, target, [json.dumps([name, args]).encode("utf-8")])
+        self.inputs += 1
+
+    def record_frame(self, target) -> None:
+        """
+        Records the image buffer of `target` as it is now.
+        """
+        timestamp = self.log.now()
+        width, height = target_dimensions(self.reflect, target)
+        size = width * height * BYTES_PER_PIXEL
+        address = self.reflect._EIOS_GetImageBuffer(target)
+        with self._lock:
+            state = self._targets.get(target)
+            if state is None or state[0].size != size:
+                state = self._targets[target] = [None, numpy.empty(size, numpy.uint8), 0]
+            previous, current, since = state
+            memmove(current.ctypes.data, address, size)
+
+            header = _FRAME.pack(width, height)
+            parts = None
+            if previous is not None and since + 1 < self.keyframe_interval:
+                offsets, lengths, changed = _spans(previous, current, width * BYTES_PER_PIXEL)
+                if 8 * len(offsets) + len(changed) < size:
+                    parts = [header, _SPANS.pack(len(offsets)), offsets, lengths, changed]
+            if parts is None:
+                encoding, since = KEYFRAME, 0
+                parts = [header, current]
+                self.keyframes += 1
+            else:
+                encoding, since = DELTA, since + 1
+            self.written += self.log.append(FRAME, encoding, target, parts, timestamp)
+            self.raw_bytes += size
+            self.frames += 1
+            # the spare buffer takes the next frame
+            spare = numpy.empty_like(current) if previous is None else previous
+            state[:] = [current, spare, since]
+
+    def stats(self) -> dict:
+        return {
+            "frames": self.frames,
+            "keyframes": self.keyframes,
+            "inputs": self.inputs,
+            "raw_bytes": self.raw_bytes,
+            "written": self.written,
+            "ratio": self.raw_bytes / self.written if self.written else 0.0,
+        }
+
+
+class FrameRecord(NamedTuple):
+    # seconds since the recording started
+    timestamp: float
+    width: int
+    height: int
+    encoding: int
+    # where the pixels or spans start in the file
+    offset: int
+    size: int
+
+
+class RecordedInput(NamedTuple):
+    timestamp: float
+    target: int
+    # RemoteInput method, called with the target and `args`
+    method: str
+    args: tuple
+
+
+class Recording:
+    """
+    A file written by a Recorder, read through a memory map.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, "rb")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.started, end = _HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} isn't a version {VERSION} recording")
+        # target -> its frames in order
+        self.frames: Dict[int, List[FrameRecord]] = {}
+        self.inputs: List[RecordedInput] = []
+
+        offset = _HEADER.size
+        while offset < end:
+            kind, encoding, size, timestamp, target = _RECORD.unpack_from(self._map, offset)
+            payload = offset + _RECORD.size
+            if kind == FRAME:
+                width, height = _FRAME.unpack_from(self._map, payload)
+                start = payload + _FRAME.size
+                record = FrameRecord(timestamp, width, height, encoding, start, size - _FRAME.size)
+                self.frames.setdefault(target, []).append(record)
+            elif kind == INPUT:
+                method, args = json.loads(self._map[payload : payload + size])
+                self.inputs.append(RecordedInput(timestamp, target, method, tuple(args)))
+            offset = payload + size
+
+    @property
+    def targets(self) -> List[int]:
+        return list(self.frames)
+
+    @property
+    def duration(self) -> float:
+        last = [frames[-1].timestamp for frames in self.frames.values()]
+        last += [self.inputs[-1].timestamp] if self.inputs else []
+        return max(last, default=0.0)
+
+    def decode(self, record: FrameRecord, out) -> None:
+        """
+        Applies `record` to `out`, a uint8 array of width * height * 4 holding the frame
+        before it, or anything for a keyframe.
+        """
+        if record.encoding == KEYFRAME:
+            out[:] = numpy.frombuffer(self._map, numpy.uint8, record.size, record.offset)
+            return
+        (count,) = _SPANS.unpack_from(self._map, record.offset)
+        if not count:
+            return
+        start = record.offset + _SPANS.size
+        offsets = numpy.frombuffer(self._map, "<u4", count, start)
+        lengths = numpy.frombuffer(self._map, "<u4", count, start + 4 * count)
+        changed = numpy.frombuffer(self._map, numpy.uint8, -1, start + 8 * count)
+        index = _span_index(offsets, lengths)
+        out[index] = changed[: len(index)]
+
+    def close(self) -> None:
+        self._map.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class ReplayClient(FakeClient):
+    """
+    A FakeClient showing the frames recorded for one target.
+    """
+
+    # set by ReplayLibrary, the FakeClient constructor draws before they are
+    recording: Optional[Recording] = None
+    frames: List[FrameRecord] = []
+
+    def replay(self, recording: Recording, target: int, speed: Optional[float], loop: bool):
+        self.recording = recording
+        self.recorded_target = target
+        self.frames = recording.frames[target]
+        self.speed = speed
+        self.loop = loop
+        # index of the next frame to show
+        self.position = 0
+        self._timestamps = [frame.timestamp for frame in self.frames]
+        self._keyframes = [i for i, frame in enumerate(self.frames) if frame.encoding == KEYFRAME]
+        # perf_counter() time the first frame was shown, for `speed`
+        self._started = None
+        first = self.frames[0]
+        self._resize(first.width, first.height)
+
+    @property
+    def finished(self) -> bool:
+        return self.position >= len(self.frames) and not self.loop
+
+    def _resize(self, width: int, height: int) -> None:
+        self.width, self.height = width, height
+        self.image = (c_uint8 * (width * height * BYTES_PER_PIXEL))()
+        self._pixels = numpy.frombuffer(self.image, numpy.uint8)
+
+    def update_image(self) -> None:
+        if self.recording is None:
+            return
+        if self.position >= len(self.frames):
+            if not self.loop:
+                return
+            self.position, self._started = 0, None
+        if self.speed is None:
+            due = self.position + 1
+        else:
+            now = time.perf_counter()
+            if self._started is None:
+                self._started = now
+            at = self._timestamps[0] + (now - self._started) * self.speed
+            due = max(bisect.bisect_right(self._timestamps, at), 1)
+        # frames before the last keyframe that is due don't need decoding
+        keyframe = self._keyframes[bisect.bisect_right(self._keyframes, due - 1) - 1]
+        for position in range(max(self.position, keyframe), due):
+            frame = self.frames[position]
+            if (frame.width, frame.height) != (self.width, self.height):
+                self._resize(frame.width, frame.height)
+            self.recording.decode(frame, self._pixels)
+        self.position = max(self.position, due)
+
+
+class ReplayLibrary(FakeLibrary):
+    """
+    A FakeLibrary with a client per target of a Recording, showing its frames.
+    """
+
+    client_class = ReplayClient
+
+    def __init__(
+        self,
+        recording: Recording,
+        speed: Optional[float] = None,
+        loop: bool = False,
+        world=None,
+    ):
+        """
+        :param speed: None to show the next frame on every EIOS_UpdateImageBuffer, otherwise
+                      the frame recorded at this many times the time since the first update
+        :param loop: start over after the last frame
+        :param world: object graph for Reflect_* calls, empty by default
+        """
+        super().__init__(clients=0, world={} if world is None else world)
+        self.recording = recording
+        for target in recording.targets:
+            self.add_client().replay(recording, target, speed, loop)
+        self._listed = list(self.clients)
+
+    @property
+    def finished(self) -> bool:
+        """
+        True once every client showed its last frame.
+        """
+        return all(client.finished for client in self.clients)
@@ -0,0 +1,782 @@
+"""
+Fast field reads on top of RemoteInput's Reflect_* functions.
+
+A Hook names a field once, with its class, field and descriptor already encoded, and
+knows which Reflect_* reader its descriptor needs. A Reflector binds those readers for
+one EIOS target so every read is a single foreign call:
+
+    LOCAL_PLAYER = Hook("client", "localPlayer", "Lcy;")
+    PLAYER_X = Hook("cy", "x", "I")
+
+    reflector = Reflector(reflect, eios_ptr)
+    player = reflector.read(None, LOCAL_PLAYER)
+    x = reflector.read(player, PLAYER_X)
+
+Whole primitive arrays are copied out with one Reflect_Array_Index call:
+
+    SKILL_LEVELS = Hook("client", "skillLevels", "[I")
+    levels = reflector.read_array_field(None, SKILL_LEVELS)   # numpy int32 array
+
+The same fields of every element of an object array come back as one numpy column each:
+
+    NPC_X, NPC_Y = Hook("cy", "x", "I"), Hook("cy", "y", "I")
+    npcs = reflector.gather(reflector.read(None, NPCS), [NPC_X, NPC_Y])
+    x = npcs["x"][npcs.mask]
+
+Strings are read into per thread buffers that are reused, and strings of objects that never
+change, such as item and npc definitions, can be kept in a StringCache:
+
+    NPC_NAME = Hook("ej", "name", "Ljava/lang/String;")
+    name = reflector.read_string(definition, NPC_NAME)
+
+Object references must be released; an ObjectArena releases everything read inside it
+with a single Reflect_Release_Objects call:
+
+    with ObjectArena(reflector):
+        player = reflector.read(None, LOCAL_PLAYER)
+        x = reflector.read(player, PLAYER_X)
+"""
+import array
+import itertools
+import threading
+from collections import OrderedDict
+from ctypes import (
+    byref,
+    create_string_buffer,
+    c_bool,
+    c_char,
+    c_char_p,
+    c_double,
+    c_float,
+    c_int8,
+    c_int16,
+    c_int32,
+    c_int64,
+    c_size_t,
+    c_uint16,
+    c_void_p,
+    memmove,
+    sizeof,
+)
+
+from typing import Optional
+
+try:
+    import numpy
+except ImportError:  # arrays are read into array.array instead
+    numpy = None
+
+from RemoteInput import ReflectionArrayType
+
+# index of each reader in Reflector._readers, picked once per Hook from its descriptor
+READERS = (
+    "Reflect_Object",
+    "Reflect_Bool",
+    "Reflect_Char",
+    "Reflect_Byte",
+    "Reflect_Short",
+    "Reflect_Int",
+    "Reflect_Long",
+    "Reflect_Float",
+    "Reflect_Double",
+    "Reflect_Array",
+)
+
+# readers returning references, which an ObjectArena has to track
+OBJECT_READERS = ("Reflect_Object", "Reflect_Array")
+
+# numpy dtype of each reader's results, as gathered into columns
+COLUMN_TYPES = (
+    c_void_p,
+    "?",
+    "S1",
+    "u1",
+    "i2",
+    "i4",
+    "i8",
+    "f4",
+    "f8",
+    c_void_p,
+)
+
+# JVM field descriptor -> reader, L...; is an object and [... an array
+PRIMITIVE_READERS = {
+    "Z": "Reflect_Bool",
+    "C": "Reflect_Char",
+    "B": "Reflect_Byte",
+    "S": "Reflect_Short",
+    "I": "Reflect_Int",
+    "J": "Reflect_Long",
+    "F": "Reflect_Float",
+    "D": "Reflect_Double",
+}
+
+
+def reader_for(desc: str) -> str:
+    """
+    :return: name of the Reflect_* function that reads a field with descriptor `desc`
+    """
+    if desc in PRIMITIVE_READERS:
+        return PRIMITIVE_READERS[desc]
+    if desc.startswith("L"):
+        return "Reflect_Object"
+    if desc.startswith("["):
+        return "Reflect_Array"
+    raise ValueError(f"not a JVM field descriptor: {desc!r}")
+
+
+# element descriptor of an array -> ReflectionArrayType
+ARRAY_TYPES = {
+    "C": ReflectionArrayType.CHAR,
+    "B": ReflectionArrayType.BYTE,
+    "Z": ReflectionArrayType.BOOL,
+    "S": ReflectionArrayType.SHORT,
+    "I": ReflectionArrayType.INT,
+    "J": ReflectionArrayType.LONG,
+    "F": ReflectionArrayType.FLOAT,
+    "D": ReflectionArrayType.DOUBLE,
+    "Ljava/lang/String;": ReflectionArrayType.STRING,
+}
+
+# ReflectionArrayType -> (ctypes type, array.array typecode) of the elements that
+# Reflect_Array_Index copies out. STRING arrays can only be read element by element.
+ARRAY_ELEMENTS = {
+    ReflectionArrayType.CHAR: (c_uint16, "H"),
+    ReflectionArrayType.BYTE: (c_int8, "b"),
+    ReflectionArrayType.BOOL: (c_bool, "B"),
+    ReflectionArrayType.SHORT: (c_int16, "h"),
+    ReflectionArrayType.INT: (c_int32, "i"),
+    ReflectionArrayType.LONG: (c_int64, "q"),
+    ReflectionArrayType.FLOAT: (c_float, "f"),
+    ReflectionArrayType.DOUBLE: (c_double, "d"),
+    ReflectionArrayType.OBJECT: (c_void_p, "Q" if sizeof(c_void_p) == 8 else "I"),
+}
+
+
+def array_type_for(desc: str) -> ReflectionArrayType:
+    """
+    :return: the ReflectionArrayType of the innermost elements of an array with descriptor
+             `desc`, INT for `[I` and for `[[[I` alike
+    """
+    if not desc.startswith("["):
+        raise ValueError(f"not an array descriptor: {desc!r}")
+    element = desc.lstrip("[")
+    if element in ARRAY_TYPES:
+        return ARRAY_TYPES[element]
+    # other objects are jobject references
+    return ReflectionArrayType.OBJECT
+
+
+def _elements(type: ReflectionArrayType):
+    try:
+        return ARRAY_ELEMENTS[type]
+    except KeyError:
+        raise ValueError(f"can't copy out {ReflectionArrayType(type).name} arrays") from None
+
+
+def new_array(type: ReflectionArrayType, length: int):
+    """
+    :return: a zeroed numpy array, or array.array without numpy, for `length` elements of `type`
+    """
+    ctype, typecode = _elements(type)
+    if numpy is not None:
+        return numpy.zeros(length, dtype=ctype)
+    return array.array(typecode, bytes(length * sizeof(ctype)))
+
+
+class Hook:
+    """
+    A Java field, `cls.field` with descriptor `desc`, ready to be read.
+    """
+
+    __slots__ = ("cls", "field", "desc", "reader", "kind", "args", "array_type", "dimensions")
+
+    def __init__(self, cls: str, field: str, desc: str):
+        """
+        :param cls: class holding the field, "client" for statics on the client class
+        :param field: field name
+        :param desc: JVM field descriptor, "I", "J", "Lcy;", "[I" ...
+        """
+        self.cls = cls
+        self.field = field
+        self.desc = desc
+        self.reader = reader_for(desc)
+        self.kind = READERS.index(self.reader)
+        # type of the innermost elements of an array field, whose outer dimensions are
+        # arrays of array references
+        self.array_type = array_type_for(desc) if desc.startswith("[") else None
+        self.dimensions = len(desc) - len(desc.lstrip("["))
+        # handed to the reader as is, ctypes takes c_char_p arguments without converting
+        self.args = (
+            c_char_p(cls.encode("utf-8")),
+            c_char_p(field.encode("utf-8")),
+            c_char_p(desc.encode("utf-8")),
+        )
+
+    def __repr__(self):
+        return f"Hook({self.cls!r}, {self.field!r}, {self.desc!r})"
+
+
+class StringBuffers:
+    """
+    Output buffers for Reflect_String, one per thread, grown when a string fills one.
+    """
+
+    def __init__(self, initial: int = 256, maximum: int = 1 << 20):
+        """
+        :param initial: size of a thread's first buffer in bytes
+        :param maximum: largest buffer, longer strings are cut short
+        """
+        self.initial = initial
+        self.maximum = maximum
+        self._local = threading.local()
+        # buffers allocated, first ones and grown ones
+        self.allocations = 0
+
+    def get(self):
+        """
+        :return: the calling thread's buffer, a ctypes char array
+        """
+        try:
+            return self._local.buffer
+        except AttributeError:
+            return self._allocate(self.initial)
+
+    def grow(self, buffer):
+        """
+        Replaces the calling thread's buffer with one twice the size of `buffer`.
+
+        :return: the new buffer, or None if `buffer` is already the largest allowed
+        """
+        size = len(buffer)
+        if size >= self.maximum:
+            return None
+        return self._allocate(min(size * 2, self.maximum))
+
+    def _allocate(self, size: int):
+        buffer = self._local.buffer = create_string_buffer(size)
+        self.allocations += 1
+        return buffer
+
+
+# shared by every Reflector
+STRING_BUFFERS = StringBuffers()
+
+
+class Gathered:
+    """
+    Fields read from every element of an object array, a numpy column per field.
+
+    Rows of null elements are zero in every column and False in `mask`.
+    """
+
+    __slots__ = ("objects", "mask", "columns")
+
+    def __init__(self, objects, mask, columns: dict):
+        # element references, already released unless gathered inside an ObjectArena
+        self.objects = objects
+        self.mask = mask
+        self.columns = columns
+
+    def __len__(self) -> int:
+        return len(self.objects)
+
+    def __getitem__(self, name: str):
+        return self.columns[name]
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.columns
+
+    @property
+    def indices(self):
+        """
+        Indices of the non-null elements.
+        """
+        return numpy.flatnonzero(self.mask)
+
+    def masked(self, name: str):
+        """
+        Column `name` as a numpy.ma array with the null elements masked out.
+        """
+        return numpy.ma.masked_array(self.columns[name], ~self.mask)
+
+    def __repr__(self):
+        return f"Gathered({len(self)} elements, {int(self.mask.sum())} set, {list(self.columns)})"
+
+
+class ArenaStats:
+    """
+    Object reference counters of one Reflector's arenas.
+    """
+
+    __slots__ = ("live", "tracked", "released", "batches", "largest_batch")
+
+    def __init__(self):
+        # tracked by an open arena and not released yet
+        self.live = 0
+        self.tracked = 0
+        self.released = 0
+        # Reflect_Release_Objects calls
+        self.batches = 0
+        self.largest_batch = 0
+
+    @property
+    def average_batch(self) -> float:
+        return self.released / self.batches if self.batches else 0.0
+
+    def as_dict(self) -> dict:
+        stats = {name: getattr(self, name) for name in self.__slots__}
+        stats["average_batch"] = self.average_batch
+        return stats
+
+
+class Reflector:
+    """
+    Reads Hooks from one EIOS target.
+
+    Not thread safe, use one Reflector per thread.
+    """
+
+    def __init__(self, reflect, eios):
+        """
+        :param reflect: a RemoteInput instance
+        :param eios: the EIOS target, from EIOS_PairClient or Reflect_GetEIOS
+        """
+        self.reflect = reflect
+        self.eios = eios
+        self._plain_readers = tuple(getattr(reflect, "_" + name) for name in READERS)
+        # the same, but object readers report their result to the open arena
+        self._tracking_readers = tuple(
+            self._tracking(reader) if name in OBJECT_READERS else reader
+            for name, reader in zip(READERS, self._plain_readers)
+        )
+        self._readers = self._plain_readers
+        self._Reflect_Array_Size = reflect._Reflect_Array_Size
+        self._Reflect_Array_With_Size = reflect._Reflect_Array_With_Size
+        self._Reflect_Array_Index = reflect._Reflect_Array_Index
+        # Reflect_Array_IndexND by number of dimensions
+        self._index_nd = (
+            None,
+            None,
+            reflect._Reflect_Array_Index2D,
+            reflect._Reflect_Array_Index3D,
+            reflect._Reflect_Array_Index4D,
+        )
+        self._Reflect_Array_Indices = reflect._Reflect_Array_Indices
+        self._Reflect_Release_Object = reflect._Reflect_Release_Object
+        self._Reflect_Release_Objects = reflect._Reflect_Release_Objects
+        self._Reflect_String = reflect._Reflect_String
+        self._Reflect_IsSame_Object = reflect._Reflect_IsSame_Object
+        self.strings = STRING_BUFFERS
+        # innermost open ObjectArena
+        self.arena = None
+        self.arena_stats = ArenaStats()
+
+    def _tracking(self, reader):
+        def read(eios, obj, cls, field, desc):
+            reference = reader(eios, obj, cls, field, desc)
+            if reference:
+                self.arena.track(reference)
+            return reference
+
+        return read
+
+    def release(self, obj) -> None:
+        """
+        Releases one object reference now, whether or not an arena tracks it.
+        """
+        if self.arena is not None:
+            self.arena.forget(obj)
+        self._Reflect_Release_Object(self.eios, obj)
+
+    def read(self, obj, hook: Hook):
+        """
+        Reads `hook` from `obj`, None for static fields.
+
+        Object and array fields come back as jobject handles, None when the field is null.
+        """
+        return self._readers[hook.kind](self.eios, obj, *hook.args)
+
+    def read_all(self, obj, hooks):
+        """
+        :return: list with the value of every hook in `hooks` read from `obj`
+        """
+        readers, eios = self._readers, self.eios
+        return [readers[hook.kind](eios, obj, *hook.args) for hook in hooks]
+
+    def read_string(self, obj, hook: Hook) -> str:
+        """
+        Reads String field `hook` of `obj`, "" when it is null.
+
+        The string is written into the thread's buffer from `strings`. If it fills the
+        buffer the buffer grows and the field is read again.
+        """
+        buffer = self.strings.get()
+        while True:
+            size = len(buffer)
+            self._Reflect_String(self.eios, obj, *hook.args, buffer, size)
+            value = buffer.value
+            if len(value) < size - 1:
+                break
+            buffer = self.strings.grow(buffer)
+            if buffer is None:
+                break
+        return value.decode("utf-8", "replace")
+
+    def is_same(self, first, second) -> bool:
+        """
+        True if two references are to the same Java object; equal references always are.
+        """
+        return first == second or self._Reflect_IsSame_Object(self.eios, first, second)
+
+    def array_size(self, array) -> int:
+        return self._Reflect_Array_Size(self.eios, array)
+
+    def read_array(
+        self,
+        array,
+        type: ReflectionArrayType,
+        length: int = None,
+        index: int = 0,
+        out=None,
+    ):
+        """
+        Copies `length` elements of a primitive or object array, starting at `index`, with one
+        Reflect_Array_Index call.
+
+        :param length: defaults to the rest of the array, which costs a Reflect_Array_Size call
+        :param out: numpy array or array.array to copy into, at least `length` elements of the
+                    right type; a new one from new_array() by default
+        :return: `out`
+        """
+        ctype, _ = _elements(type)
+        size = sizeof(ctype)
+        if length is None:
+            length = self._Reflect_Array_Size(self.eios, array) - index
+        if out is None:
+            out = new_array(type, length)
+        if length <= 0:
+            return out
+        address = self._Reflect_Array_Index(self.eios, array, type, index, length)
+        if not address:
+            raise ValueError(f"Reflect_Array_Index returned NULL for {length} elements at {index}")
+        memmove((c_char * (length * size)).from_buffer(out), address, length * size)
+        if type == ReflectionArrayType.OBJECT and self.arena is not None:
+            self.arena.track_all(out[:length])
+        return out
+
+    def read_array_index(self, array, type: ReflectionArrayType, index: int):
+        """
+        Reads the single element at `index`, for sparse reads of large arrays.
+        """
+        ctype, _ = _elements(type)
+        address = self._Reflect_Array_Index(self.eios, array, type, index, 1)
+        if not address:
+            raise ValueError(f"Reflect_Array_Index returned NULL for element {index}")
+        value = ctype.from_address(address).value
+        if type == ReflectionArrayType.OBJECT and value and self.arena is not None:
+            self.arena.track(value)
+        return value
+
+    def read_array_indices(self, array, type: ReflectionArrayType, indices, out=None):
+        """
+        Reads the elements at `indices` of a one dimensional array with one
+        Reflect_Array_Indices call.
+
+        :param out: as for read_array, at least len(indices) elements
+        """
+        ctype, _ = _elements(type)
+        length = len(indices)
+        if out is None:
+            out = new_array(type, length)
+        if length == 0:
+            return out
+        positions = (c_int32 * length)(*indices)
+        address = self._Reflect_Array_Indices(self.eios, array, type, positions, length)
+        if not address:
+            raise ValueError(f"Reflect_Array_Indices returned NULL for {length} indices")
+        size = length * sizeof(ctype)
+        memmove((c_char * size).from_buffer(out), address, size)
+        if type == ReflectionArrayType.OBJECT and self.arena is not None:
+            self.arena.track_all(out[:length])
+        return out
+
+    def read_array_nd(self, array, type: ReflectionArrayType, shape, out=None):
+        """
+        Reads a rectangular array of up to 4 dimensions, such as `int[4][104][104]`, into a
+        numpy array of `shape`. Every innermost row is one Reflect_Array_IndexND call, so
+        (4, 104, 104) costs 416 calls rather than one per element.
+
+        :param out: C contiguous numpy array of `shape` and the element type, a new one by default
+        """
+        ctype, _ = _elements(type)
+        dimensions = len(shape)
+        if dimensions == 1:
+            return self.read_array(array, type, shape[0], 0, out)
+        if not 1 < dimensions <= 4:
+            raise ValueError(f"can't read a {dimensions} dimensional array")
+        if out is None:
+            if numpy is None:
+                raise ImportError("numpy is required for read_array_nd")
+            out = numpy.zeros(shape, dtype=ctype)
+        elif not out.flags.c_contiguous or out.shape != tuple(shape):
+            raise ValueError(f"out must be a C contiguous array of shape {tuple(shape)}")
+
+        index, eios = self._index_nd[dimensions], self.eios
+        length = shape[-1]
+        row_size = length * sizeof(ctype)
+        address = out.ctypes.data
+        for position in itertools.product(*map(range, shape[:-1])):
+            row = index(eios, array, type, length, *position, 0)
+            if not row:
+                raise ValueError(f"Reflect_Array_Index{dimensions}D returned NULL at {position}")
+            memmove(address, row, row_size)
+            address += row_size
+        return out
+
+    def read_array_field(self, obj, hook: Hook, out=None):
+        """
+        Reads the whole array in field `hook` of `obj` with two native calls, and releases
+        the array reference. The elements of a nested array are references to its rows.
+
+        :return: see read_array, None when the field is null
+        """
+        size = c_size_t()
+        array = self._Reflect_Array_With_Size(self.eios, obj, byref(size), *hook.args)
+        if not array:
+            return None
+        type = hook.array_type if hook.dimensions == 1 else ReflectionArrayType.OBJECT
+        try:
+            return self.read_array(array, type, size.value, 0, out)
+        finally:
+            self._Reflect_Release_Object(self.eios, array)
+
+    def gather(self, array, hooks, length: int = None, index: int = 0, names=None) -> Gathered:
+        """
+        Reads every hook in `hooks` from each element of the object array `array`.
+
+        The elements are copied out with one Reflect_Array_Index call, then every hook is
+        read from every element, one foreign call each. That is the same work as calling
+        read_all() per element and the calls are most of the time: all it saves is the
+        Python per element, about a tenth of a scan in benchmarks/bench_reflect.py, less
+        than the noise between runs. Use it for the columns, not for speed.
+
+        Outside an ObjectArena the element references are released before returning, and
+        object or array columns hold references the caller has to release.
+
+        :param length, index: the elements to read, see read_array
+        :param names: column names, the hooks' field names by default
+        """
+        if numpy is None:
+            raise ImportError("numpy is required for gather")
+        if names is None:
+            names = [hook.field for hook in hooks]
+        objects = self.read_array(array, ReflectionArrayType.OBJECT, length, index)
+        mask = objects != 0
+        present = objects[mask].tolist()
+        count = len(present)
+        arena, eios = self.arena, self.eios
+
+        columns = {}
+        for name, hook in zip(names, hooks):
+            reader = self._plain_readers[hook.kind]
+            column = numpy.zeros(len(objects), dtype=COLUMN_TYPES[hook.kind])
+            if count:
+                arguments = map(itertools.repeat, hook.args)
+                values = map(reader, itertools.repeat(eios, count), present, *arguments)
+                if hook.reader in OBJECT_READERS:
+                    # null references come back as None
+                    values = [value or 0 for value in values]
+                    if arena is not None:
+                        arena.track_all(values)
+                column[mask] = numpy.fromiter(values, column.dtype, count)
+            columns[name] = column
+
+        if arena is None and count:
+            self._Reflect_Release_Objects(eios, (c_void_p * count)(*present), count)
+        return Gathered(objects, mask, columns)
+
+    def gather_field(self, obj, hook: Hook, hooks, names=None) -> Optional[Gathered]:
+        """
+        gather() over the object array in field `hook` of `obj`, releasing the array.
+
+        :return: None when the field is null
+        """
+        size = c_size_t()
+        array = self._Reflect_Array_With_Size(self.eios, obj, byref(size), *hook.args)
+        if not array:
+            return None
+        try:
+            return self.gather(array, hooks, size.value, 0, names)
+        finally:
+            self._Reflect_Release_Object(self.eios, array)
+
+
+class StringCache:
+    """
+    Strings read from objects that never change, such as item and npc definitions,
+    least recently used first out.
+
+    An entry is found by a hashable `key` the caller already has, usually the definition's
+    id. It only counts as a hit when Reflect_IsSame_Object confirms the object is the one
+    the string was read from, so definitions the client reloads are read again.
+
+    To compare against later, the cache has to hold a reference to every object it has a
+    string of. It takes the one passed to read() over from the open ObjectArena, which
+    stops tracking it, and releases it when the entry is evicted. Outside an arena strings
+    are read but not cached.
+    """
+
+    def __init__(self, reflector: Reflector, capacity: int = 4096):
+        """
+        :param capacity: most objects to keep strings of
+        """
+        self.reflector = reflector
+        self.capacity = capacity
+        # key -> (reference, {hook: string})
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def read(self, obj, hook: Hook, key) -> str:
+        """
+        Reads String field `hook` of `obj`, from the cache if `obj` is the object cached
+        under `key`.
+        """
+        reflector, entries = self.reflector, self._entries
+        entry = entries.get(key)
+        if entry is not None:
+            reference, strings = entry
+            if reflector.is_same(obj, reference):
+                entries.move_to_end(key)
+                value = strings.get(hook)
+                if value is None:
+                    self.misses += 1
+                    value = strings[hook] = reflector.read_string(obj, hook)
+                else:
+                    self.hits += 1
+                return value
+            # a different object under the same key, the client reloaded it
+            del entries[key]
+            reflector.release(reference)
+
+        self.misses += 1
+        value = reflector.read_string(obj, hook)
+        arena = reflector.arena
+        if arena is not None and arena.forget(obj):
+            entries[key] = (obj, {hook: value})
+            if len(entries) > self.capacity:
+                _, (reference, _) = entries.popitem(last=False)
+                reflector.release(reference)
+                self.evictions += 1
+        return value
+
+    def clear(self) -> None:
+        """
+        Drops every entry and releases their references in one call.
+        """
+        references = [reference for reference, _ in self._entries.values()]
+        self._entries.clear()
+        if references:
+            amount = len(references)
+            self.reflector._Reflect_Release_Objects(
+                self.reflector.eios, (c_void_p * amount)(*references), amount
+            )
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+
+class ObjectArena:
+    """
+    Tracks the object references a Reflector reads while the arena is open, and releases
+    them all with one Reflect_Release_Objects call when it closes.
+
+    Arenas nest; a reference belongs to the innermost open arena. Use `keep()` for one that
+    has to outlive the arena, it must then be released by hand.
+    """
+
+    def __init__(self, reflector: Reflector):
+        self.reflector = reflector
+        self.stats = reflector.arena_stats
+        # dict for ordered, O(1) removal by keep() and forget()
+        self._objects = {}
+        self._outer = None
+
+    def __enter__(self) -> "ObjectArena":
+        reflector = self.reflector
+        self._outer = reflector.arena
+        reflector.arena = self
+        reflector._readers = reflector._tracking_readers
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        reflector = self.reflector
+        reflector.arena = self._outer
+        if self._outer is None:
+            reflector._readers = reflector._plain_readers
+        self._outer = None
+        self.release()
+
+    def __len__(self) -> int:
+        return len(self._objects)
+
+    def __contains__(self, obj) -> bool:
+        return obj in self._objects
+
+    def track(self, obj) -> None:
+        if obj and obj not in self._objects:
+            self._objects[obj] = None
+            self.stats.live += 1
+            self.stats.tracked += 1
+
+    def track_all(self, objects) -> None:
+        for obj in objects:
+            self.track(int(obj))
+
+    def forget(self, obj) -> bool:
+        """
+        Stops tracking `obj` without releasing it.
+
+        :return: True if the arena was tracking it
+        """
+        if self._objects.pop(obj, 0) is None:
+            self.stats.live -= 1
+            return True
+        return False
+
+    def keep(self, obj):
+        """
+        Lets `obj` outlive the arena.
+
+        :return: `obj`
+        """
+        self.forget(obj)
+        return obj
+
+    def release(self) -> None:
+        """
+        Releases every tracked reference now, in one native call.
+        """
+        objects = self._objects
+        amount = len(objects)
+        if not amount:
+            return
+        self.reflector._Reflect_Release_Objects(
+            self.reflector.eios, (c_void_p * amount)(*objects), amount
+        )
+        objects.clear()
+        stats = self.stats
+        stats.live -= amount
+        stats.released += amount
+        stats.batches += 1
+        stats.largest_batch = max(stats.largest_batch, amount)
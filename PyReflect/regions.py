@@ -0,0 +1,82 @@
+"""
+Cached reads of the multi dimensional arrays that describe the loaded map region, such as
+tile heights (`int[4][104][104]`) or tile settings (`byte[4][104][104]`).
+
+They only change when the client loads a new region, so a RegionArray re-reads its array
+only when the region's base coordinates change:
+
+    BASE_X = Hook("client", "baseX", "I")
+    BASE_Y = Hook("client", "baseY", "I")
+    TILE_HEIGHTS = Hook("client", "tileHeights", "[[[I")
+
+    heights = RegionArray(reflector, TILE_HEIGHTS, (4, 105, 105), base=(BASE_X, BASE_Y))
+    heights.read()   # reads the array
+    heights.read()   # two Reflect_Int calls, same ndarray
+"""
+from typing import Optional, Sequence
+
+from reflection import Hook, Reflector
+
+
+class RegionArray:
+    """
+    The value of a multi dimensional array field, read again only when its key changes.
+    """
+
+    def __init__(
+        self,
+        reflector: Reflector,
+        hook: Hook,
+        shape: Sequence[int],
+        base: Sequence[Hook] = (),
+    ):
+        """
+        :param reflector: Reflector for the client to read from
+        :param hook: the array field, its element type comes from the descriptor
+        :param shape: size of every dimension, the array must be rectangular
+        :param base: static fields whose values key the cache, usually the region's base x and y.
+                     Obfuscated values are fine, they change whenever the real ones do.
+        """
+        if hook.array_type is None:
+            raise ValueError(f"{hook} is not an array field")
+        if len(shape) != hook.dimensions:
+            raise ValueError(f"{hook} has {hook.dimensions} dimensions, not {len(shape)}")
+        self.reflector = reflector
+        self.hook = hook
+        self.shape = tuple(shape)
+        self.base = tuple(base)
+        self.key = None
+        self.value = None
+        # number of times the array was read from the client
+        self.reads = 0
+
+    def current_key(self) -> tuple:
+        return tuple(self.reflector.read_all(None, self.base))
+
+    def read(self, obj=None, key: Optional[tuple] = None):
+        """
+        :param obj: object holding the field, None for static fields
+        :param key: region key if the caller already knows it, read from `base` otherwise
+        :return: numpy array of `shape`, shared between calls until the key changes
+        """
+        if key is None:
+            key = self.current_key()
+        if self.value is None or key != self.key:
+            self.value = self._read(obj)
+            self.key = key
+        return self.value
+
+    def invalidate(self) -> None:
+        self.key = self.value = None
+
+    def _read(self, obj):
+        reflector = self.reflector
+        array = reflector.read(obj, self.hook)
+        if array is None:
+            raise ValueError(f"{self.hook} is null")
+        try:
+            value = reflector.read_array_nd(array, self.hook.array_type, self.shape)
+        finally:
+            reflector.release(array)
+        self.reads += 1
+        return value
@@ -0,0 +1,490 @@
+"""
+Color and bitmap finding over client images, vectorized with numpy.
+
+Functions follow Simba's names and conventions:
+    * colors are Simba TColor integers, `R | G << 8 | B << 16`
+    * boxes are inclusive `(x1, y1, x2, y2)` and are clipped to the image, None means the whole image
+    * points are `(x, y)` in image coordinates
+
+`image` is a frame.Frame or a (height, width, 4) BGRA uint8 array such as Frame.array.
+
+    box = (0, 0, 515, 337)
+    point = FindColorTolerance(frame, 0x1F8DFF, 12, box)
+    points = FindColors(frame, 0x00FFFF, box)
+
+Full image masks of a 765x503 image, measured with benchmarks/bench_search.py:
+    * exact colors take about 0.25ms, RGB tolerance about 0.5ms on an array. A new Frame
+      takes 0.8ms for the first color, which includes the channel planes later colors
+      reuse, and about 0.25ms for each further color
+    * HSL tolerance takes 2.5 to 3.5ms on an array. A Frame spends about 2ms once on its
+      "hsl pairs" view, then 1.5 to 3ms per color. It can't get under a millisecond with
+      numpy: looking up every pixel in the color's table takes about 0.6ms, finding the
+      pixels that pass about 0.5ms, and converting those to HSL about 0.8ms at tolerance
+      10. A table that also decided hue would be indexed by the whole 24 bit color, 16MB
+      to fill for every search.
+    * first-match finds stop at the first band of rows with a match
+"""
+from typing import Optional, Tuple
+
+import numpy
+
+from frame import BLUE, BYTES_PER_PIXEL, GREEN, RED, Frame
+
+CTS_RGB = "rgb"
+CTS_HSL = "hsl"
+
+Box = Tuple[int, int, int, int]
+Point = Tuple[int, int]
+
+# rows converted at a time, small enough for a band's temporaries to stay in cache
+BAND_ROWS = 64
+# bitmap candidates left before the remaining pixels are checked all at once
+GATHER_CANDIDATES = 64
+# Simba scale units the HSL lookup table is widened by, so float rounding in it never
+# drops a pixel that the exact check would keep
+HSL_SLACK = 0.01
+
+
+def color_to_rgb(color: int) -> Tuple[int, int, int]:
+    return (color & 0xFF, (color >> 8) & 0xFF, (color >> 16) & 0xFF)
+
+
+def rgb_to_color(r: int, g: int, b: int) -> int:
+    return r | (g << 8) | (b << 16)
+
+
+def _pixels(image):
+    if isinstance(image, Frame):
+        return image.array
+    return image
+
+
+def _clip(pixels, box: Optional[Box]):
+    """
+    :return: the pixels inside `box` and the box's top left corner
+    """
+    height, width = pixels.shape[:2]
+    if box is None:
+        return pixels, 0, 0
+    x1, y1, x2, y2 = box
+    x1, y1 = max(x1, 0), max(y1, 0)
+    x2, y2 = min(x2, width - 1), min(y2, height - 1)
+    return pixels[y1 : y2 + 1, x1 : x2 + 1], x1, y1
+
+
+def _clip_all(arrays, box: Optional[Box]):
+    """
+    :return: _clip of every array, which must be the same size, and the box's top left corner
+    """
+    clipped = [_clip(array, box) for array in arrays]
+    return [array for array, _, _ in clipped], clipped[0][1], clipped[0][2]
+
+
+def rgb_to_hsl(pixels):
+    """
+    Converts BGR(A) pixels to HSL planes scaled 0..100 like Simba.
+
+    :return: float32 array shaped (..., 3) holding hue, saturation, lightness
+    """
+    return numpy.stack(_hsl(pixels[..., 0], pixels[..., 1], pixels[..., 2]), axis=-1)
+
+
+def _hsl(blue, green, red):
+    """
+    :return: hue, saturation and lightness float32 arrays of the pixels with these channels
+    """
+    # reducing the three channels pairwise beats max/min over a last axis of length 3
+    b, g, r = (channel.astype(numpy.float32) * (1.0 / 255.0) for channel in (blue, green, red))
+    high = numpy.maximum(numpy.maximum(b, g), r)
+    low = numpy.minimum(numpy.minimum(b, g), r)
+    delta = high - low
+    lightness = (high + low) * 0.5
+
+    with numpy.errstate(divide="ignore", invalid="ignore"):
+        saturation = numpy.where(
+            lightness < 0.5, delta / (high + low), delta / (2.0 - high - low)
+        )
+        hue = numpy.select(
+            [high == r, high == g],
+            [(g - b) / delta, 2.0 + (b - r) / delta],
+            4.0 + (r - g) / delta,
+        )
+    grey = delta == 0
+    saturation[grey] = 0.0
+    hue[grey] = 0.0
+    hue = (hue * (100.0 / 6.0)) % 100.0
+    return hue, saturation * 100.0, lightness * 100.0
+
+
+def _in_range(plane, low: int, high: int):
+    kind = plane.dtype.type
+    return _in_range_of(plane, kind(low), kind(high - low))
+
+
+def _in_range_of(values, low, span):
+    # one unsigned compare instead of two: (values - low) wraps around below low
+    return (values - low) <= span
+
+
+def _channel_mask(channels, color: int, tolerance: int):
+    """
+    :param channels: blue, green and red (height, width) planes
+    """
+    r, g, b = color_to_rgb(color)
+    mask = None
+    for plane, value in zip(channels, (b, g, r)):
+        low = max(value - tolerance, 0)
+        high = min(value + tolerance, 255)
+        if low == 0 and high == 255:
+            continue
+        hit = _in_range(plane, low, high)
+        if mask is None:
+            mask = hit
+        else:
+            numpy.bitwise_and(mask, hit, out=mask)
+    if mask is None:
+        return numpy.ones(channels[0].shape, dtype=bool)
+    return mask
+
+
+def _byte_ranges(color: int, tolerance: int, width: int):
+    """
+    :return: uint8 rows of `width` BGRA pixels holding the lowest value of every byte within
+             `tolerance` of `color`, and how far above it the byte may be. Alpha matches
+             anything.
+    """
+    r, g, b = color_to_rgb(color)
+    lows = [max(value - tolerance, 0) for value in (b, g, r)]
+    spans = [min(value + tolerance, 255) - low for value, low in zip((b, g, r), lows)]
+    low = numpy.array(lows + [0], dtype=numpy.uint8)
+    span = numpy.array(spans + [255], dtype=numpy.uint8)
+    return (
+        numpy.broadcast_to(low, (width, BYTES_PER_PIXEL)).ravel(),
+        numpy.broadcast_to(span, (width, BYTES_PER_PIXEL)).ravel(),
+    )
+
+
+def _byte_mask(pixels, low, span):
+    """
+    :param pixels: BGRA pixels whose rows are contiguous
+    :param low: _byte_ranges for rows at least as wide as `pixels`
+    """
+    # every byte compared at once over the contiguous rows, strided channels are much
+    # slower. A pixel matches when its four bools, read as one uint32, are all 1.
+    height, width = pixels.shape[:2]
+    row = width * BYTES_PER_PIXEL
+    hit = _in_range_of(pixels.reshape(height, row), low[:row], span[:row])
+    return hit.view(numpy.uint32).reshape(height, width) == 0x01010101
+
+
+def _rgb_mask(pixels, color: int, tolerance: int):
+    if pixels.shape[-1] == 4 and pixels.strides[1:] == (4, 1):
+        if tolerance > 0:
+            return _byte_mask(pixels, *_byte_ranges(color, tolerance, pixels.shape[1]))
+        # compare whole pixels as one uint32, ignoring alpha
+        r, g, b = color_to_rgb(color)
+        packed = pixels.view(numpy.uint32)[..., 0]
+        return (packed & 0x00FFFFFF) == (b | (g << 8) | (r << 16))
+    return _channel_mask((pixels[..., 0], pixels[..., 1], pixels[..., 2]), color, tolerance)
+
+
+def _hsl_pairs(pixels):
+    """
+    :return: int32 (height, width) of `(max + min) << 8 | max - min` of each pixel's blue,
+             green and red. A pixel's lightness and saturation only depend on these two, so
+             this indexes them in an _hsl_table.
+    """
+    blue, green, red = pixels[..., 0], pixels[..., 1], pixels[..., 2]
+    high = numpy.maximum(numpy.maximum(blue, green), red)
+    low = numpy.minimum(numpy.minimum(blue, green), red)
+    pairs = numpy.add(high, low, dtype=numpy.int32)
+    pairs <<= 8
+    pairs += high - low
+    return pairs
+
+
+def _hsl_table(lightness: float, saturation: float, tolerance: int, sat_mod: float):
+    """
+    :return: bool table over _hsl_pairs, True where lightness is within `tolerance` and
+             saturation within `tolerance * sat_mod`, widened by HSL_SLACK
+    """
+    table = numpy.zeros((511, 256), dtype=bool)
+    # only sums of max and min near 5.1 * lightness can pass
+    low = max(int((lightness - tolerance) * 5.1) - 1, 0)
+    high = min(int((lightness + tolerance) * 5.1) + 1, 510)
+    if low > high:
+        return table.ravel()
+    total = numpy.arange(low, high + 1, dtype=numpy.float32)[:, None]
+    chroma = numpy.arange(256, dtype=numpy.float32)
+    # saturation is (max - min) / (max + min) below half lightness, / (2 - max - min) above
+    denominator = numpy.minimum(total, 510.0 - total)
+    with numpy.errstate(divide="ignore", invalid="ignore"):
+        saturations = numpy.where(denominator > 0, chroma * 100.0 / denominator, 0.0)
+    table[low : high + 1] = (numpy.abs(total / 5.1 - lightness) <= tolerance + HSL_SLACK) & (
+        numpy.abs(saturations - saturation) <= tolerance * sat_mod + HSL_SLACK
+    )
+    return table.ravel()
+
+
+def _hsl_mask(pixels, pairs, wanted, table, tolerance: int, hue_mod: float, sat_mod: float):
+    """
+    :param pairs: _hsl_pairs of `pixels`
+    :param wanted: hue, saturation and lightness of the color looked for
+    :param table: _hsl_table for it
+    """
+    hue, saturation, lightness = wanted
+    # the table leaves the few pixels with about the right lightness and saturation,
+    # only those are converted and checked exactly
+    mask = table.take(pairs)
+    rows, columns = _nonzero(mask)
+    found = pixels[rows, columns]
+    hues, saturations, lightnesses = _hsl(found[:, 0], found[:, 1], found[:, 2])
+    hue_delta = numpy.abs(hues - hue)
+    hue_delta = numpy.minimum(hue_delta, 100.0 - hue_delta)
+    mask[rows, columns] = (
+        (hue_delta <= tolerance * hue_mod)
+        & (numpy.abs(saturations - saturation) <= tolerance * sat_mod)
+        & (numpy.abs(lightnesses - lightness) <= tolerance)
+    )
+    return mask
+
+
+def _source(image, color: int, tolerance: int, cts: str, hue_mod=0.2, sat_mod=0.2):
+    """
+    :return: the arrays a mask of `image` is computed from, all indexed [y][x], the
+             function computing the mask from them, or from bands of their rows, and the
+             rows per band worth using. For a Frame they are its views, converted once per
+             image and shared by every search.
+    """
+    frame = isinstance(image, Frame)
+    pixels = image.array if frame else image
+    if cts == CTS_RGB:
+        if frame and tolerance > 0:
+            # contiguous planes need no bands
+            channels = (image.plane(BLUE), image.plane(GREEN), image.plane(RED))
+            return channels, lambda *planes: _channel_mask(planes, color, tolerance), None
+        if tolerance > 0 and pixels.shape[-1] == 4 and pixels.strides[1:] == (4, 1):
+            ranges = _byte_ranges(color, tolerance, pixels.shape[1])
+            return (pixels,), lambda pixels: _byte_mask(pixels, *ranges), BAND_ROWS
+        return (pixels,), lambda pixels: _rgb_mask(pixels, color, tolerance), BAND_ROWS
+    if cts == CTS_HSL:
+        r, g, b = color_to_rgb(color)
+        wanted = rgb_to_hsl(numpy.array([b, g, r], dtype=numpy.uint8))
+        table = _hsl_table(wanted[2], wanted[1], tolerance, sat_mod)
+        mods = (wanted, table, tolerance, hue_mod, sat_mod)
+        # the lookup's temporaries are small, bands would only add calls
+        if frame:
+            pairs = image.view("hsl pairs", lambda: _bands((pixels,), _hsl_pairs, numpy.int32))
+            return (pixels, pairs), lambda pixels, pairs: _hsl_mask(pixels, pairs, *mods), None
+        return (pixels,), lambda pixels: _hsl_mask(pixels, _hsl_pairs(pixels), *mods), None
+    raise ValueError(f"unknown color tolerance mode {cts!r}")
+
+
+def _mask_key(color: int, tolerance: int, cts: str, hue_mod: float = 0.2, sat_mod: float = 0.2):
+    if cts == CTS_HSL:
+        return ("mask", color, tolerance, cts, hue_mod, sat_mod)
+    return ("mask", color, tolerance, cts)
+
+
+def _bands(arrays, function, dtype=bool, rows: Optional[int] = BAND_ROWS):
+    """
+    Calls `function` with bands of `rows` rows of `arrays` and stacks the results. None
+    calls it once with the whole arrays.
+    """
+    height, width = arrays[0].shape[:2]
+    if rows is None or height <= rows:
+        return function(*arrays)
+    # a band's temporaries stay in cache, which beats one pass over the whole image
+    result = numpy.empty((height, width), dtype=dtype)
+    for top in range(0, height, rows):
+        result[top : top + rows] = function(*(a[top : top + rows] for a in arrays))
+    return result
+
+
+def ColorMask(
+    image,
+    color: int,
+    tolerance: int = 0,
+    box: Optional[Box] = None,
+    cts: str = CTS_RGB,
+    hue_mod: float = 0.2,
+    sat_mod: float = 0.2,
+):
+    """
+    :param cts: CTS_RGB, every channel within `tolerance`
+                CTS_HSL, hue within `tolerance * hue_mod`, saturation within `tolerance * sat_mod`
+                and lightness within `tolerance`, on Simba's 0..100 scales
+    :return: bool mask of the matching pixels inside `box`, and the box's top left corner
+
+    For a Frame the mask is built for the whole image once and shared by every search
+    on that frame, whatever its box. Masks of other colors reuse what it was built from:
+    the frame's channel planes for CTS_RGB, its "hsl pairs" view for CTS_HSL.
+    """
+    arrays, masker, rows = _source(image, color, tolerance, cts, hue_mod, sat_mod)
+    if isinstance(image, Frame):
+        key = _mask_key(color, tolerance, cts, hue_mod, sat_mod)
+        mask = image.view(key, lambda: _bands(arrays, masker, rows=rows))
+        return _clip(mask, box)
+    arrays, x, y = _clip_all(arrays, box)
+    return _bands(arrays, masker, rows=rows), x, y
+
+
+def _nonzero(mask):
+    # numpy.nonzero on a 2D mask is much slower than on a flat one
+    return numpy.divmod(numpy.flatnonzero(mask), mask.shape[1])
+
+
+def _first(mask, x: int, y: int) -> Optional[Point]:
+    flat = mask.ravel()
+    if flat.size == 0:
+        return None
+    index = int(flat.argmax())
+    if not flat[index]:
+        return None
+    row, column = divmod(index, mask.shape[1])
+    return (x + column, y + row)
+
+
+def _first_in_bands(arrays, x: int, y: int, masker) -> Optional[Point]:
+    # a match near the top skips the rest of the image
+    for top in range(0, arrays[0].shape[0], BAND_ROWS):
+        point = _first(masker(*(a[top : top + BAND_ROWS] for a in arrays)), x, y + top)
+        if point is not None:
+            return point
+    return None
+
+
+def _points(mask, x: int, y: int):
+    rows, columns = _nonzero(mask)
+    points = numpy.empty((len(rows), 2), dtype=numpy.int32)
+    points[:, 0] = columns + x
+    points[:, 1] = rows + y
+    return points
+
+
+def _find_first(image, color: int, tolerance: int, box: Optional[Box], cts: str, mods):
+    if isinstance(image, Frame):
+        mask = image.cached(_mask_key(color, tolerance, cts, **mods))
+        if mask is not None:
+            return _first(*_clip(mask, box))
+    arrays, masker, _ = _source(image, color, tolerance, cts, **mods)
+    return _first_in_bands(*_clip_all(arrays, box), masker)
+
+
+def FindColor(image, color: int, box: Optional[Box] = None) -> Optional[Point]:
+    """
+    :return: the first pixel (row by row) exactly matching `color`, or None
+    """
+    return _find_first(image, color, 0, box, CTS_RGB, {})
+
+
+def FindColorTolerance(
+    image, color: int, tolerance: int, box: Optional[Box] = None, cts: str = CTS_RGB, **mods
+) -> Optional[Point]:
+    """
+    :return: the first pixel (row by row) within `tolerance` of `color`, or None
+    """
+    return _find_first(image, color, tolerance, box, cts, mods)
+
+
+def FindColors(
+    image,
+    color: int,
+    box: Optional[Box] = None,
+    tolerance: int = 0,
+    cts: str = CTS_RGB,
+    **mods,
+):
+    """
+    :return: int32 array of (x, y) points shaped (n, 2), row by row
+    """
+    return _points(*ColorMask(image, color, tolerance, box, cts, **mods))
+
+
+def CountColor(
+    image,
+    color: int,
+    box: Optional[Box] = None,
+    tolerance: int = 0,
+    cts: str = CTS_RGB,
+    **mods,
+) -> int:
+    mask = ColorMask(image, color, tolerance, box, cts, **mods)[0]
+    return int(numpy.count_nonzero(mask))
+
+
+def _match_bitmap(pixels, bitmap, tolerance: int, transparent: Optional[int]):
+    """
+    :return: bool mask over every possible top left corner of `bitmap` inside `pixels`
+    """
+    bitmap = _pixels(bitmap)[..., :3]
+    bitmap_height, bitmap_width = bitmap.shape[:2]
+    height = pixels.shape[0] - bitmap_height + 1
+    width = pixels.shape[1] - bitmap_width + 1
+    if height <= 0 or width <= 0:
+        return numpy.zeros((max(height, 0), max(width, 0)), dtype=bool)
+
+    if transparent is None:
+        rows, columns = numpy.indices((bitmap_height, bitmap_width)).reshape(2, -1)
+    else:
+        r, g, b = color_to_rgb(transparent)
+        opaque = numpy.any(bitmap != numpy.array([b, g, r], dtype=numpy.uint8), axis=-1)
+        rows, columns = numpy.nonzero(opaque)
+        if len(rows) == 0:
+            return numpy.ones((height, width), dtype=bool)
+
+    # seed candidates from the first opaque pixel, then reject them pixel by pixel,
+    # only ever touching the candidates that are still alive
+    first_b, first_g, first_r = (int(v) for v in bitmap[rows[0], columns[0]])
+    window = pixels[rows[0] : rows[0] + height, columns[0] : columns[0] + width]
+    seed = _rgb_mask(window, rgb_to_color(first_r, first_g, first_b), tolerance)
+    ys, xs = _nonzero(seed)
+
+    pixels = pixels[..., :3]
+    wanted = bitmap[rows, columns].astype(numpy.int16)
+    for index in range(1, len(rows)):
+        if len(ys) <= GATHER_CANDIDATES:
+            # few enough left to check all their remaining pixels in one go
+            found = pixels[
+                ys[:, None] + rows[None, index:], xs[:, None] + columns[None, index:]
+            ].astype(numpy.int16)
+            alive = (numpy.abs(found - wanted[index:]) <= tolerance).all(axis=(1, 2))
+            ys, xs = ys[alive], xs[alive]
+            break
+        found = pixels[ys + rows[index], xs + columns[index]].astype(numpy.int16)
+        alive = (numpy.abs(found - wanted[index]) <= tolerance).all(axis=-1)
+        ys, xs = ys[alive], xs[alive]
+
+    mask = numpy.zeros((height, width), dtype=bool)
+    mask[ys, xs] = True
+    return mask
+
+
+def FindBitmap(
+    image,
+    bitmap,
+    box: Optional[Box] = None,
+    tolerance: int = 0,
+    transparent: Optional[int] = None,
+) -> Optional[Point]:
+    """
+    :param bitmap: Frame or (height, width, 3|4) BGR(A) array to look for
+    :param transparent: color of bitmap pixels that match anything
+    :return: top left corner of the first match (row by row), or None
+    """
+    pixels, x, y = _clip(_pixels(image), box)
+    return _first(_match_bitmap(pixels, bitmap, tolerance, transparent), x, y)
+
+
+def FindBitmaps(
+    image,
+    bitmap,
+    box: Optional[Box] = None,
+    tolerance: int = 0,
+    transparent: Optional[int] = None,
+):
+    """
+    :return: int32 array of the (x, y) top left corners of every match, shaped (n, 2)
+    """
+    pixels, x, y = _clip(_pixels(image), box)
+    return _points(_match_bitmap(pixels, bitmap, tolerance, transparent), x, y)
@@ -0,0 +1,215 @@
+"""
+Frames in shared memory, so worker processes can read captures without pickling them.
+
+The capturing process owns a SharedFrameRing and fills it, usually through a FrameGrabber,
+then hands sequence numbers to the workers, which attach read-only numpy views:
+
+    ring = SharedFrameRing.create(765, 503, slots=8)
+    grabber = FrameGrabber(reflect, eios_ptr, fps=50, ring=ring).start()
+    queue.put(grabber.latest().sequence)
+
+    # in a worker process
+    ring = SharedFrameRing.attach(name)
+    captured = ring.get(queue.get())
+    if captured is not None:
+        process(captured.frame.array)
+        if not ring.valid(captured):
+            ...  # the slot was reused while we read it, throw the result away
+
+A frame stays in the ring until `slots` newer frames have been published, whether or not
+a worker is still reading it. Size the ring so the slowest worker stays that close to the
+newest frame, and check `valid()` before trusting a result.
+
+Frames read from a ring are views of its shared memory, so a process's mapping lives as
+long as any of them does, even after close().
+"""
+import multiprocessing
+from ctypes import c_uint8
+from multiprocessing import shared_memory
+from typing import Optional
+
+import numpy
+
+from frame import BYTES_PER_PIXEL, Frame
+from grabber import CapturedFrame
+
+# int64 header: latest sequence, slot count, slot capacity in bytes
+_HEADER = 3
+# int64 per slot: sequence (0 while being written), width, height, then a float64 timestamp
+_SLOT_FIELDS = 4
+_ALIGN = 64
+
+# names of the rings created by this process
+_created = set()
+
+
+def _aligned(size: int) -> int:
+    return (size + _ALIGN - 1) // _ALIGN * _ALIGN
+
+
+def _open(name: str) -> shared_memory.SharedMemory:
+    try:
+        return shared_memory.SharedMemory(name, track=False)
+    except TypeError:
+        pass
+    memory = shared_memory.SharedMemory(name)
+    if multiprocessing.parent_process() is None and name not in _created:
+        # before python 3.13 attaching registers the block with this process's resource
+        # tracker, which would unlink it from under the owner when we exit. The owner and
+        # processes started by multiprocessing share one tracker and must leave it alone.
+        from multiprocessing import resource_tracker
+
+        resource_tracker.unregister(memory._name, "shared_memory")
+    return memory
+
+
+class SharedFrameRing:
+    """
+    A ring of frame slots in one multiprocessing.shared_memory block.
+
+    Only the process that created the ring may publish to it, any number may read.
+    """
+
+    def __init__(self, memory: shared_memory.SharedMemory, owner: bool):
+        self.memory = memory
+        self.owner = owner
+        header = numpy.ndarray((_HEADER,), numpy.int64, memory.buf)
+        self.slots = int(header[1])
+        self.capacity = int(header[2])
+        self._header = header
+        self._slot_info = numpy.ndarray(
+            (self.slots, _SLOT_FIELDS), numpy.int64, memory.buf, _ALIGN
+        )
+        # the timestamp shares the slot's last int64
+        self._stamps = self._slot_info.view(numpy.float64)[:, _SLOT_FIELDS - 1]
+        self._data = _aligned(_ALIGN + self.slots * _SLOT_FIELDS * 8)
+        self._buffers = {}
+
+    @classmethod
+    def create(cls, width: int, height: int, slots: int = 4, name: Optional[str] = None):
+        """
+        :param width, height: largest frame the ring has to hold
+        :param slots: number of frames kept, at least 2
+        """
+        if slots < 2:
+            raise ValueError("a frame ring needs at least 2 slots")
+        capacity = _aligned(width * height * BYTES_PER_PIXEL)
+        data = _aligned(_ALIGN + slots * _SLOT_FIELDS * 8)
+        memory = shared_memory.SharedMemory(name, create=True, size=data + slots * capacity)
+        header = numpy.ndarray((_HEADER,), numpy.int64, memory.buf)
+        header[:] = (0, slots, capacity)
+        numpy.ndarray((slots, _SLOT_FIELDS), numpy.int64, memory.buf, _ALIGN)[:] = 0
+        del header
+        _created.add(memory.name)
+        return cls(memory, owner=True)
+
+    @classmethod
+    def attach(cls, name: str) -> "SharedFrameRing":
+        return cls(_open(name), owner=False)
+
+    @property
+    def name(self) -> str:
+        return self.memory.name
+
+    @property
+    def latest_sequence(self) -> int:
+        return int(self._header[0])
+
+    def _offset(self, sequence: int) -> int:
+        return self._data + (sequence % self.slots) * self.capacity
+
+    ## writing, the FrameGrabber ring interface
+
+    def buffer(self, sequence: int, width: int, height: int):
+        """
+        Returns the slot for `sequence` as a ctypes array and marks it as being written.
+        """
+        if width * height * BYTES_PER_PIXEL > self.capacity:
+            raise ValueError(f"{width}x{height} frame doesn't fit in this ring")
+        slot = sequence % self.slots
+        self._slot_info[slot, 0] = 0
+        self._slot_info[slot, 1:3] = (width, height)
+        buffer = self._buffers.get(slot)
+        if buffer is None:
+            buffer = (c_uint8 * self.capacity).from_buffer(self.memory.buf, self._offset(slot))
+            self._buffers[slot] = buffer
+        return buffer
+
+    def commit(self, sequence: int, timestamp: float) -> None:
+        slot = sequence % self.slots
+        self._stamps[slot] = timestamp
+        self._slot_info[slot, 0] = sequence
+        self._header[0] = sequence
+
+    def publish(self, pixels, timestamp: float) -> int:
+        """
+        Copies a (height, width, 4) BGRA array or Frame in as the next frame.
+
+        :return: the frame's sequence number
+        """
+        if isinstance(pixels, Frame):
+            pixels = pixels.array
+        height, width = pixels.shape[:2]
+        sequence = self.latest_sequence + 1
+        buffer = self.buffer(sequence, width, height)
+        size = width * height * BYTES_PER_PIXEL
+        numpy.frombuffer(buffer, numpy.uint8, size).reshape(pixels.shape)[:] = pixels
+        self.commit(sequence, timestamp)
+        return sequence
+
+    ## reading
+
+    def get(self, sequence: int) -> Optional[CapturedFrame]:
+        """
+        Returns a read-only view of frame `sequence`, or None if it isn't in the ring.
+        """
+        slot = sequence % self.slots
+        if sequence <= 0 or self._slot_info[slot, 0] != sequence:
+            return None
+        width, height = (int(value) for value in self._slot_info[slot, 1:3])
+        timestamp = float(self._stamps[slot])
+        offset = self._offset(slot)
+        view = self.memory.buf[offset : offset + width * height * BYTES_PER_PIXEL].toreadonly()
+        return CapturedFrame(Frame(view, width, height), sequence, timestamp)
+
+    def latest(self) -> Optional[CapturedFrame]:
+        return self.get(self.latest_sequence)
+
+    def valid(self, captured: CapturedFrame) -> bool:
+        """
+        True if `captured` hasn't been overwritten since it was read from the ring.
+        """
+        return self._slot_info[captured.sequence % self.slots, 0] == captured.sequence
+
+    def close(self) -> None:
+        """
+        Detaches from the ring, the owner also frees it.
+
+        The owner unlinks the block first: nothing can attach to it any more, and the
+        memory is freed once every process has let go of it. Frames and buffers this ring
+        handed out that are still referenced keep its mapping in this process alive until
+        they are gone; they stay readable but nothing updates them any more.
+        """
+        self._header = self._slot_info = self._stamps = None
+        self._buffers.clear()
+        if self.owner:
+            self.memory.unlink()
+            _created.discard(self.memory.name)
+        try:
+            self.memory.close()
+        except BufferError:
+            # CPython's SharedMemory.close() closes its mmap, which raises BufferError while
+            # views of it are exported, here the frames and buffers still referenced, and
+            # SharedMemory.__del__ would raise it again as an unraisable error. There's no
+            # public way to let go of the mapping, so drop the block's references to it:
+            # it's unmapped with the last view, and close() closes the file descriptor.
+            if not (hasattr(self.memory, "_buf") and hasattr(self.memory, "_mmap")):
+                raise
+            self.memory._buf = self.memory._mmap = None
+            self.memory.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
@@ -0,0 +1,309 @@
+"""
+Game state read once per game tick and shared by everything that asks for it during
+that tick.
+
+A TickSnapshots declares what to read: static values, and tables of fields read from
+every element of an object array such as the npc array. current() costs one native call
+while the tick hasn't changed, and a full read through Reflector.gather when it has:
+
+    NPCS = Table("npcs", Hook("client", "npcs", "[Ldv;"),
+                 [Hook("dv", "x", "I"), Hook("dv", "y", "I"), Hook("dv", "animation", "I")])
+    state = TickSnapshots(reflector, values=[Hook("client", "plane", "I")], tables=[NPCS],
+                          tick=GAME_TICK)     # hook of the game's tick counter
+
+    snapshot = state.current()
+    for npc in snapshot.records("npcs"):
+        print(npc.index, npc.x, npc.y)
+    diff = snapshot.diff("npcs")   # against the previous tick
+    for index in diff.spawned:
+        ...
+
+Snapshots hold values only, so object and array fields can't be declared.
+"""
+import threading
+import time
+from ctypes import c_void_p
+from typing import Dict, NamedTuple, Optional, Sequence
+
+import numpy
+
+from reflection import COLUMN_TYPES, OBJECT_READERS, Gathered, Hook, Reflector
+
+# length of a game tick in seconds
+TICK = 0.6
+
+
+def _check_values(hooks: Sequence[Hook]) -> None:
+    for hook in hooks:
+        if hook.reader in OBJECT_READERS:
+            raise ValueError(f"{hook} is a reference, snapshots only hold values")
+
+
+class Table:
+    """
+    Fields read from every element of an object array.
+    """
+
+    __slots__ = ("name", "array", "hooks", "names", "key", "position")
+
+    def __init__(
+        self,
+        name: str,
+        array: Hook,
+        hooks: Sequence[Hook],
+        names: Optional[Sequence[str]] = None,
+        key: Optional[str] = None,
+        position: Sequence[str] = ("x", "y"),
+    ):
+        """
+        :param name: name of the table in a Snapshot
+        :param array: static object array field holding the elements
+        :param hooks: fields to read from every element
+        :param names: column names, the hooks' field names by default
+        :param key: column that identifies what is in a slot, such as an npc's id. A slot
+                    whose key changed between ticks counts as a despawn and a spawn.
+        :param position: columns whose changes count as a move
+        """
+        if array.array_type is None:
+            raise ValueError(f"{array} is not an array field")
+        _check_values(hooks)
+        self.name = name
+        self.array = array
+        self.hooks = tuple(hooks)
+        self.names = tuple(hook.field for hook in hooks) if names is None else tuple(names)
+        if len(self.names) != len(self.hooks):
+            raise ValueError("need one name per hook")
+        for column in ((key,) if key else ()) + tuple(position):
+            if column not in self.names:
+                raise ValueError(f"{column!r} is not a column of table {name!r}")
+        self.key = key
+        self.position = tuple(position)
+
+
+class Record:
+    """
+    One row of a table, its columns read as attributes.
+    """
+
+    __slots__ = ("_columns", "index")
+
+    def __init__(self, columns: dict, index: int):
+        self._columns = columns
+        self.index = index
+
+    def __getattr__(self, name: str):
+        try:
+            return self._columns[name][self.index].item()
+        except KeyError:
+            raise AttributeError(name) from None
+
+    def __repr__(self):
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in self._columns)
+        return f"Record(index={self.index}, {fields})"
+
+
+class TableDiff(NamedTuple):
+    # slot indices, numpy int arrays
+    spawned: numpy.ndarray
+    despawned: numpy.ndarray
+    # present in both ticks with a different position
+    moved: numpy.ndarray
+    # column -> slots present in both ticks whose value changed, only columns that did
+    changed: Dict[str, numpy.ndarray]
+
+
+def _pad(column, length: int):
+    if len(column) == length:
+        return column
+    padded = numpy.zeros(length, dtype=column.dtype)
+    padded[: len(column)] = column
+    return padded
+
+
+def diff_tables(
+    previous: Optional[Gathered],
+    current: Gathered,
+    key: Optional[str] = None,
+    position: Sequence[str] = (),
+) -> TableDiff:
+    """
+    Compares two reads of the same table slot by slot, everything in `current` has
+    spawned when there is no `previous`.
+    """
+    if previous is None:
+        empty = numpy.zeros(0, dtype=numpy.intp)
+        return TableDiff(numpy.flatnonzero(current.mask), empty, empty, {})
+    length = max(len(previous), len(current))
+    before = _pad(previous.mask, length)
+    after = _pad(current.mask, length)
+    same = before & after
+    if key is not None:
+        same &= _pad(previous[key], length) == _pad(current[key], length)
+
+    changed = {}
+    for name, column in current.columns.items():
+        if name not in previous:
+            continue
+        differs = same & (_pad(previous[name], length) != _pad(column, length))
+        if differs.any():
+            changed[name] = numpy.flatnonzero(differs)
+    moved = [changed[name] for name in position if name in changed]
+    moved = numpy.unique(numpy.concatenate(moved)) if moved else numpy.zeros(0, numpy.intp)
+    return TableDiff(
+        numpy.flatnonzero(after & ~same), numpy.flatnonzero(before & ~same), moved, changed
+    )
+
+
+class Snapshot:
+    """
+    The declared game state as it was at one tick. Never changes once taken.
+    """
+
+    __slots__ = ("tick", "timestamp", "values", "tables", "previous", "_tables", "_diffs")
+
+    def __init__(self, tick, timestamp: float, values: dict, tables: dict, declared: dict):
+        self.tick = tick
+        # time.perf_counter() when the read finished
+        self.timestamp = timestamp
+        self.values = values
+        # table name -> Gathered
+        self.tables = tables
+        # the snapshot of the tick before, without a previous of its own, so a snapshot
+        # keeps one tick of history however long it is held
+        self.previous = None
+        self._tables = declared
+        self._diffs = {}
+
+    def __getitem__(self, name: str):
+        """
+        A value, or a table's Gathered columns.
+        """
+        if name in self.values:
+            return self.values[name]
+        return self.tables[name]
+
+    def records(self, table: str):
+        """
+        Yields a Record for every non-null element of `table`.
+        """
+        columns = self.tables[table].columns
+        for index in self.tables[table].indices.tolist():
+            yield Record(columns, index)
+
+    def diff(self, table: str) -> TableDiff:
+        """
+        What changed in `table` since the previous tick, computed once.
+        """
+        diff = self._diffs.get(table)
+        if diff is None:
+            declared = self._tables[table]
+            previous = None if self.previous is None else self.previous.tables[table]
+            diff = diff_tables(previous, self.tables[table], declared.key, declared.position)
+            self._diffs[table] = diff
+        return diff
+
+    def changed(self, name: str) -> bool:
+        """
+        True if value `name` differs from the previous tick's.
+        """
+        return self.previous is None or self.previous.values[name] != self.values[name]
+
+    def __repr__(self):
+        return f"Snapshot(tick={self.tick}, values={len(self.values)}, tables={list(self.tables)})"
+
+
+class TickSnapshots:
+    """
+    Reads the declared state at most once per tick, thread safe.
+
+    Every native call goes through `reflector`, which must not be used by other threads
+    while a snapshot is being taken.
+    """
+
+    def __init__(
+        self,
+        reflector: Reflector,
+        values: Sequence[Hook] = (),
+        tables: Sequence[Table] = (),
+        tick: Optional[Hook] = None,
+        period: float = TICK,
+        names: Optional[Sequence[str]] = None,
+    ):
+        """
+        :param values: static fields to read
+        :param tables: tables to read
+        :param tick: static int field that changes every game tick, the game's tick
+                     counter; client.cycle won't do, it advances every 20 ms client cycle.
+                     Without it a new tick starts every `period` seconds.
+        :param names: names of `values`, their field names by default
+        """
+        _check_values(values)
+        if tick is not None:
+            _check_values((tick,))
+        self.reflector = reflector
+        self.values = tuple(values)
+        self.names = tuple(hook.field for hook in values) if names is None else tuple(names)
+        self.tables = {table.name: table for table in tables}
+        self.tick_hook = tick
+        self.period = period
+        self._snapshot = None
+        self._lock = threading.Lock()
+        # snapshots read, and current() calls answered with an existing one
+        self.taken = 0
+        self.shared = 0
+
+    def tick(self):
+        """
+        The current tick, one native call with a tick hook.
+        """
+        if self.tick_hook is None:
+            return int(time.monotonic() / self.period)
+        return self.reflector.read(None, self.tick_hook)
+
+    def current(self) -> Snapshot:
+        """
+        The snapshot of the current tick, read if this is the first call this tick.
+        """
+        with self._lock:
+            tick = self.tick()
+            snapshot = self._snapshot
+            if snapshot is not None and snapshot.tick == tick:
+                self.shared += 1
+                return snapshot
+            return self._take(tick)
+
+    def refresh(self) -> Snapshot:
+        """
+        Reads a new snapshot even if the tick hasn't changed.
+        """
+        with self._lock:
+            return self._take(self.tick())
+
+    def _take(self, tick) -> Snapshot:
+        reflector = self.reflector
+        values = dict(zip(self.names, reflector.read_all(None, self.values)))
+        tables = {}
+        for name, table in self.tables.items():
+            gathered = reflector.gather_field(None, table.array, table.hooks, table.names)
+            if gathered is None:
+                # a null array reads as an empty table
+                columns = {
+                    column: numpy.zeros(0, dtype=COLUMN_TYPES[hook.kind])
+                    for column, hook in zip(table.names, table.hooks)
+                }
+                gathered = Gathered(numpy.zeros(0, c_void_p), numpy.zeros(0, bool), columns)
+            tables[name] = gathered
+        snapshot = Snapshot(tick, time.perf_counter(), values, tables, self.tables)
+        previous = self._snapshot
+        if previous is not None:
+            # the same data without its own previous, so snapshots don't chain back forever
+            previous = Snapshot(
+                previous.tick, previous.timestamp, previous.values, previous.tables, self.tables
+            )
+        snapshot.previous = previous
+        self._snapshot = snapshot
+        self.taken += 1
+        return snapshot
+
+    def stats(self) -> dict:
+        return {"taken": self.taken, "shared": self.shared}
@@ -0,0 +1,45 @@
+"""
+Fixtures over fakeclient.FakeLibrary, so the tests run without a game client.
+
+An exception raised inside a FakeLibrary callback, such as a released reference being
+used, is only printed by ctypes; it fails the test instead.
+"""
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fakeclient import FakeLibrary  # noqa: E402
+from reflection import Reflector  # noqa: E402
+from RemoteInput import RemoteInput  # noqa: E402
+
+
+def pytest_configure(config):
+    config.addinivalue_line("filterwarnings", "error::pytest.PytestUnraisableExceptionWarning")
+
+
+@pytest.fixture
+def lib():
+    return FakeLibrary()
+
+
+@pytest.fixture
+def reflect(lib):
+    return RemoteInput(lib)
+
+
+@pytest.fixture
+def client(lib):
+    return lib.clients[0]
+
+
+@pytest.fixture
+def target(reflect, client):
+    return reflect.EIOS_PairClient(client.pid)
+
+
+@pytest.fixture
+def reflector(reflect, target):
+    return Reflector(reflect, target)
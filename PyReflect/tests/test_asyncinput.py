@@ -0,0 +1,88 @@
+import asyncio
+
+import pytest
+
+from asyncinput import AsyncRemoteInput
+
+VK_SHIFT = 0x10
+
+
+def run(reflect, test):
+    async def main():
+        async with AsyncRemoteInput(reflect) as remote:
+            return await test(remote)
+
+    return asyncio.run(main())
+
+
+def inputs(client):
+    return [(function, args) for _, function, args in client.inputs]
+
+
+def test_calls_for_a_target_run_in_order(reflect, target, client):
+    async def test(remote):
+        await asyncio.gather(
+            remote.EIOS_MoveMouse(target, 1, 2),
+            remote.EIOS_SendString(target, "hi", 10, 10),
+            remote.EIOS_MoveMouse(target, 3, 4),
+        )
+        return await remote.EIOS_GetMousePosition(target)
+
+    assert run(reflect, test) == (3, 4)
+    assert inputs(client) == [
+        ("EIOS_MoveMouse", (1, 2)),
+        ("EIOS_SendString", ("h", 10, 10)),
+        ("EIOS_SendString", ("i", 10, 10)),
+        ("EIOS_MoveMouse", (3, 4)),
+    ]
+
+
+@pytest.mark.parametrize("after", [0.01, 0.15])
+def test_cancelled_holds_are_released(reflect, target, client, after):
+    # cancelled while the hold is being sent, or while it's held
+    client.delay = 0.05
+
+    async def test(remote):
+        for hold in (
+            remote.hold_key(target, VK_SHIFT, 10),
+            remote.hold_mouse(target, 5, 6, 1, 10),
+        ):
+            task = asyncio.create_task(hold)
+            await asyncio.sleep(after)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+        return await remote.EIOS_IsKeyHeld(target, VK_SHIFT)
+
+    assert run(reflect, test) is False
+    assert not client.keys and not client.buttons
+    assert inputs(client) == [
+        ("EIOS_HoldKey", (VK_SHIFT,)),
+        ("EIOS_ReleaseKey", (VK_SHIFT,)),
+        ("EIOS_HoldMouse", (5, 6, 1)),
+        ("EIOS_ReleaseMouse", (5, 6, 1)),
+    ]
+
+
+def test_cancelling_send_string_drops_the_rest(reflect, target, client):
+    client.delay = 0.02
+
+    async def test(remote):
+        typing = asyncio.create_task(remote.EIOS_SendString(target, "abcdefgh", 10, 10))
+        await asyncio.sleep(0.07)
+        typing.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await typing
+        await remote.EIOS_MoveMouse(target, 0, 0)
+
+    run(reflect, test)
+    typed = [args[0] for function, args in inputs(client) if function == "EIOS_SendString"]
+    assert 0 < len(typed) < 8
+    assert "".join(typed) == "abcdefgh"[: len(typed)]
+
+
+def test_closed_remote_refuses_calls(reflect, target):
+    remote = AsyncRemoteInput(reflect)
+    remote.close()
+    with pytest.raises(RuntimeError):
+        remote.executor(target)
@@ -0,0 +1,90 @@
+import threading
+
+import pytest
+
+from clients import ClientPool
+from RemoteInput import RemoteInput
+
+
+def mouse(reflect, target):
+    return reflect.EIOS_GetMousePosition(target)
+
+
+def move(reflect, target, x, y):
+    reflect.EIOS_MoveMouse(target, x, y)
+    return x, y
+
+
+def fail(reflect, target):
+    raise KeyError("nothing here")
+
+
+def test_every_client_is_paired_and_driven(lib, reflect):
+    lib.add_client()
+    with ClientPool(reflect) as pool:
+        added, removed = pool.refresh()
+        assert added == [client.pid for client in lib.clients] and removed == []
+        assert all(client.paired for client in lib.clients)
+        assert pool.refresh() == ([], [])
+        results = {pid: future.result(5) for pid, future in pool.run(move, 3, 4).items()}
+        assert results == {client.pid: (3, 4) for client in lib.clients}
+        assert all(client.mouse == (3, 4) for client in lib.clients)
+        with pytest.raises(KeyError):
+            pool.submit(added[0], fail).result(5)
+        report = pool.report()
+        assert report[added[0]]["completed"] == 1 and report[added[0]]["failed"] == 1
+    assert not any(client.paired for client in lib.clients)
+
+
+def test_work_for_a_client_runs_in_order(reflect, client):
+    with ClientPool(reflect) as pool:
+        pool.refresh()
+        futures = [pool.submit(client.pid, move, i, i) for i in range(20)]
+        assert [future.result(5) for future in futures] == [(i, i) for i in range(20)]
+    assert [args for _, _, args in client.inputs] == [(i, i) for i in range(20)]
+
+
+def test_clients_come_and_go(lib, reflect, client):
+    with ClientPool(reflect) as pool:
+        pool.refresh()
+        other = lib.add_client()
+        assert pool.refresh() == ([other.pid], [])
+        lib.clients.remove(client)
+        assert pool.refresh() == ([], [client.pid])
+        assert client.pid not in pool and not client.paired
+        assert list(pool.report()) == [other.pid]
+        assert pool.discard(other.pid) and not pool.discard(other.pid)
+        assert len(pool) == 0 and not other.paired
+        assert pool.report() == {}
+
+
+def test_discarding_drops_the_queued_work(reflect, client):
+    started = threading.Event()
+    release = threading.Event()
+
+    def block(reflect, target):
+        started.set()
+        release.wait(5)
+
+    with ClientPool(reflect) as pool:
+        pool.refresh()
+        running = pool.submit(client.pid, block)
+        queued = pool.submit(client.pid, mouse)
+        assert started.wait(5)
+        pool.discard(client.pid)
+        release.set()
+        assert running.result(5) is None
+        assert queued.cancelled()
+
+
+def test_processes_drive_their_client(lib, reflect, client):
+    # the worker forks with a copy of the fake library, so its calls don't show up here
+    with ClientPool(reflect, processes=True, factory=lambda: RemoteInput(lib)) as pool:
+        pool.refresh()
+        assert pool.targets == {client.pid: None}
+        assert pool.submit(client.pid, move, 7, 8).result(10) == (7, 8)
+        assert pool.submit(client.pid, mouse).result(10) == (7, 8)
+        assert pool.probe(client.pid, mouse).result(10) == (7, 8)
+        with pytest.raises(KeyError):
+            pool.submit(client.pid, fail).result(10)
+        assert pool.report()[client.pid]["completed"] == 2
@@ -0,0 +1,68 @@
+import colorsys
+from ctypes import POINTER, c_uint8
+
+import numpy
+import pytest
+
+from fakeclient import SQUARE, SQUARE_COLOUR
+from frame import BLUE, GREEN, RED, Frame, target_dimensions
+from querycache import QueryCache
+
+
+def square_at(frame, client):
+    x, y = client.square
+    return frame.array[y : y + SQUARE, x : x + SQUARE]
+
+
+def test_frames_wrap_the_image_without_copying(reflect, target, client):
+    frame = Frame.from_target(reflect, target)
+    assert frame.shape == (client.height, client.width, 4)
+    assert frame.memory.shape == frame.array.shape
+    assert frame.nbytes == len(frame.tobytes()) == client.width * client.height * 4
+    assert (square_at(frame, client) == numpy.frombuffer(SQUARE_COLOUR, numpy.uint8)).all()
+
+    snapshot = frame.copy()
+    reflect.EIOS_UpdateImageBuffer(target)
+    assert (square_at(frame, client) == numpy.frombuffer(SQUARE_COLOUR, numpy.uint8)).all()
+    assert not (square_at(snapshot, client) == numpy.frombuffer(SQUARE_COLOUR, numpy.uint8)).all()
+    assert frame.stale and not snapshot.stale
+
+
+def test_a_null_buffer_raises(reflect, target, monkeypatch):
+    with pytest.raises(ValueError):
+        Frame.from_address(0, 10, 10)
+    monkeypatch.setattr(reflect, "_EIOS_GetImageBuffer", lambda target: POINTER(c_uint8)())
+    with pytest.raises(ValueError, match="paired"):
+        Frame.from_target(reflect, target)
+
+
+def test_dimensions_always_come_from_the_client(reflect, target, client):
+    with QueryCache(reflect):
+        assert reflect.EIOS_GetTargetDimensions(target) == [client.width, client.height]
+        client.resize(200, 100)
+        assert reflect.EIOS_GetTargetDimensions(target) != [200, 100]
+        assert target_dimensions(reflect, target) == [200, 100]
+        assert Frame.from_target(reflect, target).shape == (100, 200, 4)
+
+
+def test_derived_images(reflect, target):
+    rng = numpy.random.default_rng(3)
+    pixels = rng.integers(0, 256, (20, 30, 4), dtype=numpy.uint8)
+    pixels[0, :4, :3] = [(0, 0, 0), (255, 255, 255), (0, 0, 255), (40, 40, 40)]
+    frame = Frame(bytearray(pixels.tobytes()), 30, 20)
+
+    for channel in (BLUE, GREEN, RED):
+        assert numpy.array_equal(frame.plane(channel), pixels[..., channel])
+    assert frame.plane(RED).flags.c_contiguous
+    assert frame.plane(RED) is frame.plane(RED)
+
+    luma = 0.299 * pixels[..., RED] + 0.587 * pixels[..., GREEN] + 0.114 * pixels[..., BLUE]
+    # weights in 256ths, truncated
+    assert numpy.abs(frame.gray.astype(int) - luma).max() < 2
+
+    hsv = frame.hsv
+    for y, x in ((0, 0), (0, 1), (0, 2), (0, 3), (5, 7), (19, 29)):
+        blue, green, red = pixels[y, x, :3] / 255.0
+        hue, saturation, value = colorsys.rgb_to_hsv(red, green, blue)
+        assert hsv[y, x] == pytest.approx((hue * 360.0, saturation, value), abs=1e-4)
+    assert frame.hsv is hsv
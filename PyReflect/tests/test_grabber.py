@@ -0,0 +1,79 @@
+import time
+from ctypes import POINTER, c_uint8
+
+import numpy
+import pytest
+
+from frame import Frame
+from grabber import FrameGrabber, FrameRing
+from sharedframes import SharedFrameRing
+
+
+def image(client):
+    return numpy.frombuffer(client.image, numpy.uint8).reshape(client.height, client.width, 4)
+
+
+def test_captures_are_copies_of_the_image(reflect, target, client):
+    grabber = FrameGrabber(reflect, target, buffers=2)
+    assert grabber.latest() is None
+    first = grabber.capture()
+    assert first.sequence == 1 and client.updates == 1
+    assert numpy.array_equal(first.frame.array, image(client))
+    pixels = first.frame.copy()
+
+    second = grabber.capture()
+    assert numpy.array_equal(first.frame.array, pixels.array)
+    assert not numpy.array_equal(second.frame.array, pixels.array)
+    # the ring comes back round to the first buffer
+    grabber.capture()
+    assert not numpy.array_equal(first.frame.array, pixels.array)
+    assert grabber.latest().sequence == 3
+    assert grabber.stats() == {"captured": 3, "dropped": 2, "overruns": 0}
+    grabber.capture()
+    assert grabber.stats()["dropped"] == 2
+
+
+def test_a_resized_client_gets_new_buffers(reflect, target, client):
+    grabber = FrameGrabber(reflect, target)
+    grabber.capture()
+    client.resize(100, 50)
+    captured = grabber.capture()
+    assert captured.frame.shape == (50, 100, 4)
+    assert numpy.array_equal(captured.frame.array, image(client))
+    with pytest.raises(ValueError):
+        FrameRing(1)
+
+
+def test_an_unpaired_target_is_refused(reflect, target, monkeypatch):
+    monkeypatch.setattr(reflect, "_EIOS_GetImageBuffer", lambda target: POINTER(c_uint8)())
+    grabber = FrameGrabber(reflect, target)
+    with pytest.raises(ValueError, match="paired"):
+        grabber.capture()
+    assert grabber.latest() is None
+
+
+def test_the_thread_captures_until_stopped(reflect, target):
+    with FrameGrabber(reflect, target, fps=100) as grabber:
+        assert grabber.running
+        with pytest.raises(RuntimeError):
+            grabber.start()
+        deadline = time.monotonic() + 5
+        while grabber.captured < 5 and time.monotonic() < deadline:
+            time.sleep(0.01)
+    assert not grabber.running
+    captured = grabber.captured
+    assert captured >= 5
+    time.sleep(0.05)
+    assert grabber.captured == captured
+    assert grabber.latest().sequence == captured
+
+
+def test_frames_go_to_a_shared_ring(reflect, target, client):
+    with SharedFrameRing.create(client.width, client.height, slots=2) as ring:
+        grabber = FrameGrabber(reflect, target, ring=ring)
+        captured = grabber.capture()
+        assert ring.latest_sequence == captured.sequence
+        shared = ring.get(captured.sequence)
+        assert shared.timestamp == captured.timestamp
+        assert numpy.array_equal(shared.frame.array, image(client))
+        assert isinstance(shared.frame, Frame)
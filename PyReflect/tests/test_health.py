@@ -0,0 +1,93 @@
+import threading
+import time
+
+import pytest
+
+import health
+from clients import ClientPool
+from health import HealthSupervisor
+from RemoteInput import RemoteInput
+
+
+def busy(reflect, target, seconds):
+    time.sleep(seconds)
+    return reflect.EIOS_HasFocus(target)
+
+
+def supervise(pool, checks, **options):
+    supervisor = HealthSupervisor(pool, threshold=0.1, strikes=2, **options)
+    killed = [supervisor.check() for _ in range(checks)]
+    return supervisor, killed
+
+
+@pytest.mark.parametrize("processes", [False, True])
+def test_a_client_busy_with_a_long_job_is_healthy(lib, reflect, processes):
+    # a worker process gets a copy of the fake library, forked with the pool's workers
+    with ClientPool(reflect, processes=processes, factory=lambda: RemoteInput(lib)) as pool:
+        pool.refresh()
+        pid = pool.pids[0]
+        job = pool.submit(pid, busy, 1.0)
+        supervisor, killed = supervise(pool, 4)
+        assert killed == [[]] * 4
+        assert supervisor.report()[pid]["probes"] == 4
+        assert supervisor.report()[pid]["latency"] < 0.1
+        assert job.result() is True
+
+
+def test_a_hung_client_is_killed(lib, reflect, monkeypatch):
+    lib.add_client()
+    hang = threading.Event()
+    hung = lib.clients[0].pid
+
+    def hanging(reflect, target):
+        if target == pool.targets.get(hung):
+            hang.wait()
+
+    monkeypatch.setattr(health, "probe", hanging)
+    pids = []
+    with ClientPool(reflect) as pool:
+        pool.refresh()
+        healthy = lib.clients[1].pid
+        supervisor, killed = supervise(pool, 3, on_kill=pids.append)
+        hang.set()
+        assert killed == [[], [hung], []]
+        assert pids == supervisor.killed == [hung]
+        assert hung not in pool and lib.client(hung) is None
+        assert healthy in pool and supervisor.report()[healthy]["slow"] == 0
+
+
+def test_flag_without_killing(reflect, monkeypatch):
+    monkeypatch.setattr(health, "probe", lambda reflect, target: time.sleep(0.15))
+    with ClientPool(reflect) as pool:
+        pool.refresh()
+        supervisor, killed = supervise(pool, 3, kill=False)
+        assert killed == [[], [], []]
+        assert all(report["flagged"] for report in supervisor.report().values())
+        assert len(pool) == len(supervisor.report())
+
+
+def test_probe_errors_reach_the_future(reflect):
+    def broken(reflect, target):
+        raise OSError("no answer")
+
+    with ClientPool(reflect) as pool:
+        pool.refresh()
+        with pytest.raises(OSError):
+            pool.probe(pool.pids[0], broken).result(1)
+
+
+def test_the_thread_outlives_a_failed_check(reflect):
+    checked = threading.Semaphore(0)
+
+    def check():
+        checked.release()
+        if supervisor.errors == 0:
+            raise OSError("kill failed")
+        return []
+
+    with ClientPool(reflect) as pool:
+        supervisor = HealthSupervisor(pool, interval=0.01)
+        supervisor.check = check
+        with supervisor:
+            assert all(checked.acquire(timeout=5) for _ in range(3))
+        assert supervisor.errors == 1 and isinstance(supervisor.error, OSError)
@@ -0,0 +1,63 @@
+import json
+
+import numpy
+import pytest
+
+from instrument import Instrumentation, LatencyHistogram, _bucket, _lowest
+
+
+def test_buckets_cover_every_value_once():
+    for value in list(range(200)) + [1000, 4095, 4096, 123_456_789, 2**40]:
+        bucket = _bucket(value)
+        assert _lowest(bucket) <= value < _lowest(bucket + 1)
+        # within 1 / 16 of the value
+        assert _lowest(bucket + 1) - _lowest(bucket) <= max(value / 16, 1)
+
+
+def test_percentiles_are_close_to_the_exact_ones():
+    values = numpy.random.default_rng(0).lognormal(10, 1.5, 5000).astype(int)
+    histogram = LatencyHistogram()
+    for value in values.tolist():
+        histogram.record(value)
+    for fraction in (0.5, 0.9, 0.99):
+        exact = numpy.quantile(values, fraction, method="inverted_cdf")
+        assert histogram.percentile(fraction) == pytest.approx(exact, rel=1 / 16)
+    assert histogram.percentile(1.0) == values.max()
+    assert (histogram.min, histogram.max, histogram.count) == (values.min(), values.max(), 5000)
+    assert sum(histogram.buckets().values()) == 5000
+    summary = histogram.summary()
+    assert summary["calls"] == 5000 and summary["total"] == pytest.approx(values.sum() / 1e9)
+    assert LatencyHistogram().summary()["p99"] == 0
+
+
+def test_calls_are_counted_while_enabled(reflect, target, tmp_path):
+    native = reflect._EIOS_HasFocus
+    with Instrumentation(reflect) as instrumentation:
+        assert reflect._EIOS_HasFocus is not native
+        for _ in range(3):
+            reflect.EIOS_HasFocus(target)
+        reflect.EIOS_MoveMouse(target, 1, 2)
+    assert reflect._EIOS_HasFocus is native
+    reflect.EIOS_HasFocus(target)
+
+    snapshot = instrumentation.snapshot()
+    assert snapshot["EIOS_HasFocus"]["calls"] == 3
+    assert snapshot["EIOS_MoveMouse"]["calls"] == 1
+    assert "EIOS_GetImageBuffer" not in snapshot
+    assert {name for name, _ in instrumentation.hottest(2)} <= set(snapshot)
+    path = tmp_path / "calls.json"
+    instrumentation.dump(str(path))
+    dumped = json.loads(path.read_text())
+    assert dumped["functions"]["EIOS_HasFocus"]["calls"] == 3
+    assert sum(dumped["functions"]["EIOS_HasFocus"]["buckets"].values()) == 3
+    instrumentation.reset()
+    assert instrumentation.snapshot() == {}
+
+
+def test_only_the_named_functions_are_timed(reflect, target):
+    instrumentation = Instrumentation(reflect, ["EIOS_HasFocus", "EIOS_NotAFunction"]).enable()
+    assert instrumentation.names == ["EIOS_HasFocus"]
+    reflect.EIOS_MoveMouse(target, 1, 2)
+    reflect.EIOS_HasFocus(target)
+    instrumentation.disable()
+    assert list(instrumentation.snapshot()) == ["EIOS_HasFocus"]
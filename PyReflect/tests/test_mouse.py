@@ -0,0 +1,76 @@
+import math
+
+import numpy
+import pytest
+
+from mouse import MouseMover, PathShapes, generate_shape, movement_time, place
+from timeline import InputScheduler
+
+LEFT = 1
+
+
+@pytest.fixture
+def shapes():
+    return PathShapes(variants=2, seed=5)
+
+
+def test_shapes_go_from_the_origin_to_one():
+    random = numpy.random.default_rng(1)
+    for points in (2, 10, 60):
+        shape = generate_shape(points, random)
+        assert shape.shape == (points, 2) and shape.dtype == numpy.float32
+        assert shape[0] == pytest.approx((0, 0), abs=1e-6)
+        assert shape[-1] == pytest.approx((1, 0), abs=1e-6)
+        assert numpy.abs(shape[:, 1]).max() <= 0.08 + 1e-6
+
+
+def test_shapes_are_placed_between_any_two_points():
+    shape = generate_shape(30, numpy.random.default_rng(2))
+    for start, end in (((10, 20), (300, 40)), ((500, 500), (20, 480)), ((0, 0), (0, -90))):
+        for mirror in (False, True):
+            placed = place(shape, start, end, mirror)
+            assert placed[0] == pytest.approx(start) and placed[-1] == pytest.approx(end)
+    assert numpy.allclose(place(shape, (0, 0), (10, 0), True)[:, 1], -10 * shape[:, 1])
+
+
+def test_paths_end_on_the_target(shapes):
+    mover = MouseMover(None, None, shapes)
+    for start, end in (((0, 0), (400, 300)), ((700, 20), (690, 25)), ((3, 900), (4, 2))):
+        points, times = mover.path(start, end)
+        assert tuple(points[-1]) == end
+        assert (numpy.diff(times) > 0).all()
+        # every point moves the cursor, a small step at a time
+        steps = numpy.diff(numpy.vstack((start, points)), axis=0)
+        assert numpy.abs(steps).sum(axis=1).min() > 0
+        assert numpy.abs(steps).max() < math.dist(start, end) / 4
+    points, times = mover.path((5, 5), (5, 5))
+    assert points.tolist() == [[5, 5]] and times.tolist() == [0.0]
+    assert movement_time(10) < movement_time(100) < movement_time(1000)
+
+
+def test_shapes_are_reused_once_there_are_enough(shapes):
+    for _ in range(5):
+        shapes.get(20)
+    assert (shapes.generated, shapes.reused) == (2, 3)
+    shapes.get(21)
+    assert shapes.generated == 3
+
+
+def test_moves_join_up_and_land(reflect, target, client, shapes):
+    reflect.EIOS_MoveMouse(target, 100, 100)
+    client.inputs.clear()
+    with InputScheduler(reflect) as scheduler:
+        mover = MouseMover(reflect, scheduler, shapes, rate=500)
+        first = mover.move(target, 300, 200)
+        second = mover.click(target, 50, 60, LEFT)
+        assert second.start >= first.start
+        assert first.wait(5) and second.wait(5)
+    sent = [(function, args) for _, function, args in client.inputs]
+    moves = [args for function, args in sent if function == "EIOS_MoveMouse"]
+    assert (300, 200) in moves and moves[-1] == (50, 60)
+    assert moves.index((300, 200)) < len(moves) - 1
+    assert sent[-2:] == [("EIOS_HoldMouse", (50, 60, LEFT)), ("EIOS_ReleaseMouse", (50, 60, LEFT))]
+    # steps are small, the cursor doesn't jump
+    path = numpy.array([(100, 100)] + moves)
+    assert max(math.hypot(*step) for step in numpy.diff(path, axis=0)) < 60
+    assert client.mouse == (50, 60) and not client.buttons
@@ -0,0 +1,135 @@
+from collections import deque
+
+import numpy
+import pytest
+
+from pathfinding import BLOCKED, DIRECTIONS, WALL_EAST, CollisionMap, Pathfinder
+from reflection import Hook
+
+BASE = (Hook("client", "baseX", "I"), Hook("client", "baseY", "I"))
+PLANE = Hook("client", "plane", "I")
+COLLISION_MAPS = Hook("client", "collisionMaps", "[LCollisionMap;")
+FLAGS = Hook("CollisionMap", "flags", "[[I")
+STRAIGHT = {(dx, dy): flags for dx, dy, flags in DIRECTIONS[:4]}
+
+
+def can_move(flags, tile, dx, dy):
+    # the rules, one tile at a time
+    width, height = flags.shape
+
+    def free(x, y, mask):
+        return 0 <= x < width and 0 <= y < height and not flags[x, y] & mask
+
+    x, y = tile
+    mask = next(mask for ddx, ddy, mask in DIRECTIONS if (ddx, ddy) == (dx, dy))
+    if not free(x + dx, y + dy, mask):
+        return False
+    if dx and dy:
+        return free(x + dx, y, STRAIGHT[dx, 0]) and free(x, y + dy, STRAIGHT[0, dy])
+    return True
+
+
+def distances(flags, destination):
+    width, height = flags.shape
+    steps = numpy.full(flags.shape, -1)
+    steps[destination] = 0
+    queue = deque([destination])
+    while queue:
+        tile = queue.popleft()
+        for dx, dy, _ in DIRECTIONS:
+            start = (tile[0] - dx, tile[1] - dy)
+            if 0 <= start[0] < width and 0 <= start[1] < height and steps[start] < 0:
+                if can_move(flags, start, dx, dy):
+                    steps[start] = steps[tile] + 1
+                    queue.append(start)
+    return steps
+
+
+def random_flags(seed, size=(24, 20)):
+    rng = numpy.random.default_rng(seed)
+    flags = numpy.where(rng.random(size) < 0.2, 0x100, 0)
+    walls = rng.choice([0x02, 0x08, 0x20, 0x80, 0x04, 0x40], size)
+    return flags | numpy.where(rng.random(size) < 0.15, walls, 0)
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_distances_and_routes_follow_the_rules(seed):
+    flags = random_flags(seed)
+    collision = CollisionMap(flags)
+    free = list(zip(*numpy.nonzero(flags & BLOCKED == 0)))
+    rng = numpy.random.default_rng(seed)
+    for destination in [free[i] for i in rng.choice(len(free), 3, replace=False)]:
+        field = collision.distance_field(destination)
+        expected = distances(flags, destination)
+        assert numpy.array_equal(field.distances, expected)
+        for start in free[::7]:
+            route = field.route(start)
+            if expected[start] < 0:
+                assert route is None and field.distance(start) is None
+                continue
+            assert len(route) == field.distance(start) == expected[start]
+            tile = start
+            for step in route:
+                dx, dy = step[0] - tile[0], step[1] - tile[1]
+                assert collision.can_move(tile, dx, dy) and can_move(flags, tile, dx, dy)
+                tile = step
+            assert tile == destination
+
+
+def test_walls_and_corners():
+    flags = numpy.zeros((3, 3), dtype=int)
+    flags[1, 0] = WALL_EAST
+    collision = CollisionMap(flags)
+    # a wall on the east side of (1, 0) stops moving onto it from the east, not the west
+    assert not collision.can_move((2, 0), -1, 0)
+    assert collision.can_move((0, 0), 1, 0)
+    # or cutting a corner past that side
+    assert not collision.can_move((2, 1), -1, -1)
+    assert not collision.can_move((2, 0), -1, 1)
+    assert collision.distance_field((0, 0)).route((2, 0)) == [(2, 1), (1, 1), (0, 0)]
+    with pytest.raises(ValueError):
+        collision.index((3, 0))
+
+
+def test_a_blocked_destination_is_unreachable():
+    flags = numpy.zeros((5, 5), dtype=int)
+    flags[2, 2] = 0x100
+    field = CollisionMap(flags).distance_field((2, 2))
+    assert field.route((0, 0)) is None and field.distance((2, 2)) == 0
+    assert field.route((2, 2)) == []
+
+
+def plane_flags(world, plane):
+    rows = world.fields["collisionMaps"].elements[plane].fields["flags"].elements
+    return numpy.array([list(row.elements) for row in rows])
+
+
+def test_the_region_is_read_once_per_key(reflector, lib, client):
+    world = client.world["client"]
+    pathfinder = Pathfinder(reflector, COLLISION_MAPS, FLAGS, BASE, PLANE)
+    start = (52, 52)
+    expected = distances(plane_flags(world, 0), start)
+    # the farthest tile that can reach the player's
+    destination = tuple(int(i) for i in numpy.unravel_index(expected.argmax(), expected.shape))
+    steps = pathfinder.distance(destination, start)
+    assert steps == expected[destination] > 10
+    route = pathfinder.route(destination, start)
+    assert len(route) == steps and route[-1] == start
+    assert pathfinder.stats() == {"regions": 1, "fields": 1, "hits": 1, "misses": 1}
+    assert lib.live == 0
+
+    world.fields["plane"] = 1
+    field = pathfinder.field(start)
+    assert numpy.array_equal(field.distances, distances(plane_flags(world, 1), start))
+    assert pathfinder.stats() == {"regions": 2, "fields": 1, "hits": 1, "misses": 2}
+    pathfinder.invalidate()
+    pathfinder.field(start)
+    assert pathfinder.stats() == {"regions": 3, "fields": 1, "hits": 1, "misses": 3}
+    assert lib.live == 0
+
+
+def test_hooks_are_checked(reflector):
+    with pytest.raises(ValueError):
+        Pathfinder(reflector, FLAGS, FLAGS, BASE, PLANE)
+    with pytest.raises(ValueError):
+        Pathfinder(reflector, COLLISION_MAPS, Hook("CollisionMap", "flags", "[I"), BASE, PLANE)
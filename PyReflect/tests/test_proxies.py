@@ -0,0 +1,101 @@
+import pytest
+
+from proxies import Field, Proxy, ProxyContext, generate, load, parse_hooks
+from reflection import Hook, ObjectArena
+
+HOOKS = """
+# name                 field               descriptor          multiplier
+Client.localPlayer     client.localPlayer  LPlayer;
+Client.loginState      client.loginState   I
+Client.skillLevels     client.skillLevels  [I
+Client.npcs            client.npcs         [LNPC;
+Player.x               Player.x            I                   3
+Player.name            Player.name         Ljava/lang/String;
+"""
+
+
+@pytest.fixture
+def classes(tmp_path):
+    path = tmp_path / "hooks.txt"
+    path.write_text(HOOKS)
+    return load(str(path))
+
+
+@pytest.fixture
+def context(reflector):
+    return ProxyContext(reflector)
+
+
+def test_generated_classes(classes):
+    assert list(classes) == ["Client", "Player"]
+    assert classes["Player"].java_class == "Player"
+    assert classes["Client"].localPlayer.proxy == "Player"
+    source = generate(parse_hooks(HOOKS))
+    assert "class Player(Proxy):" in source
+
+
+def test_fields_decode_and_memoize(classes, context, lib, client):
+    Client = classes["Client"]
+    world = client.world["client"]
+    game = Client(context)
+    assert game.loginState == 30
+    world.fields["loginState"] = 10
+    assert game.loginState == 30
+    context.next_tick()
+    assert game.loginState == 10
+
+    player = game.localPlayer
+    assert isinstance(player, classes["Player"])
+    assert player.x == (52 * 128 + 64) * 3
+    assert player.name == "Fake Player"
+    assert list(game.skillLevels) == list(world.fields["skillLevels"].elements)
+    context.next_tick()
+    assert lib.live == 0
+
+
+def test_memoized_references_outlive_arenas_of_the_same_tick(classes, context, reflector, lib):
+    game = classes["Client"](context)
+    with ObjectArena(reflector):
+        player = game.localPlayer
+        npcs = game.npcs
+        assert player.x
+    with ObjectArena(reflector):
+        assert game.localPlayer is player
+        # read through the memoized reference, released with the first arena before
+        assert game.localPlayer.name == "Fake Player"
+        assert reflector.array_size(npcs) == 2048
+    assert lib.live == 2
+    context.next_tick()
+    assert lib.live == 0
+
+
+def test_sync_starts_a_tick_when_the_hook_changes(classes, reflector, client):
+    world = client.world["client"]
+    context = ProxyContext(reflector, tick=Hook("client", "loginState", "I"))
+    game = classes["Client"](context)
+    assert context.sync() and not context.sync()
+    assert game.loginState == 30
+    world.fields["loginState"] = 10
+    assert context.sync() and game.loginState == 10
+
+
+def test_sync_without_a_hook_counts_periods(context):
+    context.period = 1e-3
+    assert context.sync()
+    context.period = 1e6
+    assert context.sync() and not context.sync()
+
+
+def test_multiplier_wraps_like_java():
+    class Wrapped(Proxy):
+        __slots__ = ()
+        value = Field("client", "value", "I", multiplier=0x7FFFFFFF)
+
+    decode = Wrapped.value.decode
+    assert decode(3) == 0x7FFFFFFD
+    assert decode(-1) == -0x7FFFFFFF
+
+
+def test_bad_hooks_lines_name_the_line():
+    with pytest.raises(ValueError, match="<hooks>:1"):
+        parse_hooks("Player.x Player.x Q")
@@ -0,0 +1,106 @@
+import pytest
+
+from frame import Frame
+from grabber import FrameGrabber
+from querycache import TTL, QueryCache
+
+
+@pytest.fixture
+def cache(reflect):
+    with QueryCache(reflect) as cache:
+        yield cache
+
+
+def test_answers_from_the_cache_until_the_ttl(reflect, target, client, monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr("querycache.time.monotonic", lambda: now[0])
+    cache = QueryCache(reflect).enable()
+    assert reflect.EIOS_HasFocus(target) == client.focus
+    client.focus = not client.focus
+    assert reflect.EIOS_HasFocus(target) != client.focus
+    now[0] += TTL["EIOS_HasFocus"]
+    assert reflect.EIOS_HasFocus(target) == client.focus
+    assert cache.stats()["queries"]["EIOS_HasFocus"] == {
+        "hits": 1,
+        "misses": 2,
+        "hit_rate": pytest.approx(1 / 3),
+    }
+
+
+def test_mouse_calls_update_the_position(reflect, target, client, cache):
+    reflect.EIOS_GetMousePosition(target)
+    reflect.EIOS_MoveMouse(target, 10, 20)
+    assert reflect.EIOS_GetMousePosition(target) == (10, 20)
+    reflect.EIOS_HoldMouse(target, 30, 40, 1)
+    reflect.EIOS_ReleaseMouse(target, 50, 60, 1)
+    assert reflect.EIOS_GetMousePosition(target) == (50, 60) == client.mouse
+    assert cache.misses["EIOS_GetMousePosition"] == 1
+
+
+def test_focus_calls_drop_the_focus(reflect, target, client, cache):
+    reflect.EIOS_HasFocus(target)
+    reflect.EIOS_LoseFocus(target)
+    assert reflect.EIOS_HasFocus(target) is False
+    reflect.EIOS_GainFocus(target)
+    assert reflect.EIOS_HasFocus(target) is True
+    assert cache.misses["EIOS_HasFocus"] == 3
+
+
+def test_set_input_enabled_stores_the_flag(reflect, target, cache):
+    reflect.EIOS_SetInputEnabled(target, False)
+    assert reflect.EIOS_IsInputEnabled(target) is False
+    assert cache.misses["EIOS_IsInputEnabled"] == 0
+
+
+def test_a_call_that_raises_drops_the_target(reflect, target):
+    def broken(target, x, y):
+        raise OSError("lost the client")
+
+    reflect.EIOS_MoveMouse = broken
+    with QueryCache(reflect) as cache:
+        reflect.EIOS_GetMousePosition(target)
+        reflect.EIOS_HasFocus(target)
+        with pytest.raises(OSError):
+            reflect.EIOS_MoveMouse(target, 1, 2)
+        reflect.EIOS_GetMousePosition(target)
+        reflect.EIOS_HasFocus(target)
+        assert cache.misses == dict(cache.misses, EIOS_GetMousePosition=2, EIOS_HasFocus=2)
+    assert reflect.EIOS_MoveMouse is broken
+
+
+def test_dimensions_are_copies(reflect, target, cache):
+    reflect.EIOS_GetTargetDimensions(target)[0] = 1
+    assert reflect.EIOS_GetTargetDimensions(target)[0] != 1
+
+
+def test_zero_and_none_ttls(reflect, target, client):
+    with QueryCache(reflect, {"EIOS_HasFocus": 0, "EIOS_IsInputEnabled": None}) as cache:
+        reflect.EIOS_HasFocus(target)
+        reflect.EIOS_HasFocus(target)
+        reflect.EIOS_IsInputEnabled(target)
+        reflect.EIOS_IsInputEnabled(target)
+        assert cache.misses["EIOS_HasFocus"] == 2
+        assert cache.hits["EIOS_IsInputEnabled"] == 1
+    with pytest.raises(ValueError):
+        QueryCache(reflect, {"EIOS_IsKeyHeld": 1.0})
+
+
+def test_disable_puts_the_methods_back(reflect, target):
+    cache = QueryCache(reflect).enable()
+    assert "EIOS_HasFocus" in vars(reflect)
+    cache.disable()
+    assert "EIOS_HasFocus" not in vars(reflect)
+    reflect.EIOS_HasFocus(target)
+    assert cache.stats()["misses"] == 0
+
+
+def test_images_are_sized_by_the_client_not_the_cache(reflect, target, client, cache):
+    assert reflect.EIOS_GetTargetDimensions(target) == [client.width, client.height]
+    # the player shrinks the client
+    client.resize(200, 100)
+    assert reflect.EIOS_GetTargetDimensions(target) != [200, 100]
+
+    frame = Frame.from_target(reflect, target)
+    assert (frame.width, frame.height) == (200, 100)
+    captured = FrameGrabber(reflect, target).capture()
+    assert (captured.frame.width, captured.frame.height) == (200, 100)
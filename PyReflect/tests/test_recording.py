@@ -0,0 +1,87 @@
+import numpy
+import pytest
+
+from grabber import FrameGrabber
+from recording import DELTA, KEYFRAME, Recorder, Recording, ReplayLibrary
+from RemoteInput import RemoteInput
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "session.rec")
+
+
+def record(reflect, target, client, path, frames=12, **options):
+    images = []
+    with Recorder(reflect, path, **options) as recorder:
+        grabber = FrameGrabber(reflect, target)
+        for i in range(frames):
+            if i == frames // 2:
+                client.resize(200, 120)
+            images.append(grabber.capture().frame.copy().array)
+            reflect.EIOS_MoveMouse(target, i, 2 * i)
+        reflect.EIOS_SendString(target, "héllo", 10, 20)
+    return recorder, images
+
+
+def replay(recording, **options):
+    library = ReplayLibrary(recording, **options)
+    reflect = RemoteInput(library)
+    target = reflect.EIOS_PairClient(reflect.EIOS_GetClientPID(0))
+    return library, FrameGrabber(reflect, target)
+
+
+def test_frames_and_inputs_are_recorded(reflect, target, client, path):
+    recorder, images = record(reflect, target, client, path, keyframe_interval=4)
+    stats = recorder.stats()
+    assert stats["frames"] == 12 and stats["inputs"] == 13
+    assert stats["written"] < stats["raw_bytes"]
+    with Recording(path) as recording:
+        assert recording.targets == [target]
+        frames = recording.frames[target]
+        # every 4th frame, counted again from the first one after the resize
+        encodings = [frame.encoding for frame in frames]
+        assert encodings == [KEYFRAME, DELTA, DELTA, DELTA, KEYFRAME, DELTA] * 2
+        assert [(frame.width, frame.height) for frame in frames[5:7]] == [(765, 503), (200, 120)]
+        assert recording.inputs[0][2:] == ("EIOS_MoveMouse", (0, 0))
+        assert recording.inputs[-1][2:] == ("EIOS_SendString", ("héllo", 10, 20))
+        timestamps = [frame.timestamp for frame in frames]
+        assert timestamps == sorted(timestamps) and recording.duration >= timestamps[-1]
+    # recording stopped with the recorder
+    reflect.EIOS_MoveMouse(target, 0, 0)
+    assert recorder.stats()["inputs"] == 13
+
+
+def test_a_replay_shows_the_recorded_frames(reflect, target, client, path):
+    _, images = record(reflect, target, client, path, keyframe_interval=5)
+    with Recording(path) as recording:
+        library, grabber = replay(recording)
+        shown = []
+        while not library.finished:
+            shown.append(grabber.capture().frame.array.copy())
+        assert len(shown) == len(images)
+        for image, frame in zip(images, shown):
+            assert numpy.array_equal(image, frame)
+
+        library, grabber = replay(recording, loop=True)
+        for image in images + images[:2]:
+            assert numpy.array_equal(grabber.capture().frame.array, image)
+        assert not library.finished
+
+
+def test_a_replay_at_speed_skips_ahead(reflect, target, client, path):
+    _, images = record(reflect, target, client, path, frames=6)
+    with Recording(path) as recording:
+        library, grabber = replay(recording, speed=1e9)
+        # the clock starts at the first frame
+        assert numpy.array_equal(grabber.capture().frame.array, images[0])
+        assert not library.finished
+        assert numpy.array_equal(grabber.capture().frame.array, images[-1])
+        assert library.finished
+
+
+def test_other_files_are_refused(tmp_path):
+    path = tmp_path / "other.rec"
+    path.write_bytes(b"\0" * 64)
+    with pytest.raises(ValueError):
+        Recording(str(path))
@@ -0,0 +1,222 @@
+import numpy
+import pytest
+
+from fakeclient import REGION, JavaObject
+from reflection import (
+    Hook,
+    ObjectArena,
+    StringBuffers,
+    StringCache,
+    array_type_for,
+    reader_for,
+)
+from RemoteInput import ReflectionArrayType
+
+LOCAL_PLAYER = Hook("client", "localPlayer", "LPlayer;")
+PLAYER_X = Hook("Player", "x", "I")
+PLAYER_NAME = Hook("Player", "name", "Ljava/lang/String;")
+SKILL_LEVELS = Hook("client", "skillLevels", "[I")
+COLLISION_MAPS = Hook("client", "collisionMaps", "[LCollisionMap;")
+FLAGS = Hook("CollisionMap", "flags", "[[I")
+NPCS = Hook("client", "npcs", "[LNPC;")
+NPC_FIELDS = [Hook("NPC", "x", "I"), Hook("NPC", "index", "I"), Hook("NPC", "animation", "I")]
+NPC_DEFINITION = Hook("NPC", "definition", "LNPCDefinition;")
+DEFINITION_ID = Hook("NPCDefinition", "id", "I")
+DEFINITION_NAME = Hook("NPCDefinition", "name", "Ljava/lang/String;")
+
+
+@pytest.fixture
+def world(client):
+    return client.world["client"]
+
+
+def test_hooks_pick_their_reader_from_the_descriptor():
+    assert reader_for("I") == "Reflect_Int" and reader_for("Z") == "Reflect_Bool"
+    assert reader_for("Lcy;") == "Reflect_Object" and reader_for("[[I") == "Reflect_Array"
+    assert [arg.value for arg in PLAYER_X.args] == [b"Player", b"x", b"I"]
+    for desc in ("Q", "", "cy"):
+        with pytest.raises(ValueError):
+            Hook("client", "field", desc)
+
+
+def test_fields_read_and_release(reflector, lib, world):
+    player = reflector.read(None, LOCAL_PLAYER)
+    assert reflector.read(player, PLAYER_X) == world.fields["localPlayer"].fields["x"]
+    statics = [Hook("client", "baseX", "I"), Hook("client", "plane", "I")]
+    assert reflector.read_all(None, statics) == [3200, 0]
+    assert reflector.read(None, Hook("client", "missing", "LPlayer;")) is None
+    again = reflector.read(None, LOCAL_PLAYER)
+    assert lib.live == 2
+    reflector.release(player)
+    reflector.release(again)
+    assert lib.live == 0
+
+
+def test_array_hooks_know_their_element_type():
+    assert array_type_for("[I") == ReflectionArrayType.INT
+    assert array_type_for("[Ljava/lang/String;") == ReflectionArrayType.STRING
+    assert array_type_for("[Lcy;") == ReflectionArrayType.OBJECT
+    with pytest.raises(ValueError):
+        array_type_for("I")
+
+
+def test_arrays_are_copied_out(reflector, lib, world):
+    levels = list(world.fields["skillLevels"].elements)
+    assert reflector.read_array_field(None, SKILL_LEVELS).tolist() == levels
+    array = reflector.read(None, SKILL_LEVELS)
+    assert reflector.array_size(array) == 25
+    assert reflector.read_array(array, ReflectionArrayType.INT, 5, 10).tolist() == levels[10:15]
+    assert reflector.read_array_index(array, ReflectionArrayType.INT, 24) == levels[24]
+    with pytest.raises(ValueError):
+        reflector.read_array(array, ReflectionArrayType.INT, 30)
+    with pytest.raises(ValueError):
+        reflector.read_array(array, ReflectionArrayType.STRING, 1)
+    reflector.release(array)
+    assert reflector.read_array_field(None, Hook("client", "missing", "[I")) is None
+    assert lib.live == 0
+
+
+def test_nested_array_hooks_are_typed_by_their_elements():
+    assert array_type_for("[[[I") == ReflectionArrayType.INT
+    assert (FLAGS.dimensions, FLAGS.array_type) == (2, ReflectionArrayType.INT)
+
+
+def test_scattered_elements_are_read_in_one_call(reflector, lib, world):
+    levels = list(world.fields["skillLevels"].elements)
+    array = reflector.read(None, SKILL_LEVELS)
+    indices = [3, 0, 20]
+    picked = reflector.read_array_indices(array, ReflectionArrayType.INT, indices)
+    assert picked.tolist() == [levels[index] for index in indices]
+    reflector.release(array)
+    assert lib.live == 0
+
+
+def test_nested_arrays_read_row_by_row(reflector, lib, world):
+    rows = world.fields["collisionMaps"].elements[1].fields["flags"].elements
+    expected = numpy.array([list(row.elements) for row in rows], dtype=numpy.int32)
+    maps = reflector.read_array_field(None, COLLISION_MAPS)
+    flags = reflector.read(int(maps[1]), FLAGS)
+    grid = reflector.read_array_nd(flags, ReflectionArrayType.INT, (REGION, REGION))
+    assert numpy.array_equal(grid, expected)
+    with pytest.raises(ValueError):
+        reflector.read_array_nd(flags, ReflectionArrayType.INT, (2, 2), numpy.zeros((2, 3)))
+    reflector.release(flags)
+    for reference in maps:
+        reflector.release(int(reference))
+    assert lib.live == 0
+
+
+def test_arenas_release_everything_in_one_call(reflector, lib):
+    with ObjectArena(reflector) as outer:
+        player = reflector.read(None, LOCAL_PLAYER)
+        with ObjectArena(reflector) as inner:
+            maps = reflector.read_array_field(None, COLLISION_MAPS)
+            kept = inner.keep(reflector.read(None, LOCAL_PLAYER))
+            assert len(inner) == len(maps) and kept not in inner
+        assert reflector.arena is outer and player in outer
+        assert lib.live == 2
+    assert reflector.arena is None
+    assert lib.live == 1
+    reflector.release(kept)
+    stats = reflector.arena_stats.as_dict()
+    assert stats["live"] == 0 and stats["tracked"] == len(maps) + 2
+    assert stats["released"] == len(maps) + 1
+    assert stats["batches"] == 2 and stats["largest_batch"] == len(maps)
+    # outside an arena reads aren't tracked
+    reflector.release(reflector.read(None, LOCAL_PLAYER))
+    assert reflector.arena_stats.tracked == len(maps) + 2
+
+
+def test_gather_matches_reading_each_element(reflector, lib, world):
+    slots = world.fields["npcs"].elements
+    gathered = reflector.gather_field(None, NPCS, NPC_FIELDS, names=["x", "index", "animation"])
+    assert lib.live == 0
+    assert len(gathered) == len(slots)
+    assert gathered.mask.tolist() == [npc is not None for npc in slots]
+    assert gathered.indices.tolist() == [i for i, npc in enumerate(slots) if npc is not None]
+    for name in ("x", "index", "animation"):
+        expected = [0 if npc is None else npc.fields[name] for npc in slots]
+        assert gathered[name].tolist() == expected
+    assert gathered.masked("index").count() == len(gathered.indices)
+    assert "x" in gathered and "health" not in gathered
+    assert reflector.gather_field(None, Hook("client", "missing", "[LNPC;"), NPC_FIELDS) is None
+
+
+def test_gathered_references_belong_to_the_arena(reflector, lib, world):
+    slots = world.fields["npcs"].elements
+    with ObjectArena(reflector) as arena:
+        array = reflector.read(None, NPCS)
+        gathered = reflector.gather(array, [NPC_DEFINITION], 8, 4)
+        assert gathered.mask.tolist() == [slot is not None for slot in slots[4:12]]
+        definitions = gathered["definition"][gathered.mask].tolist()
+        ids = [reflector.read(definition, DEFINITION_ID) for definition in definitions]
+        assert ids == [npc.fields["definition"].fields["id"] for npc in slots[4:12] if npc]
+        # the array, its elements and their definitions
+        assert len(arena) == 1 + 2 * len(definitions)
+    assert lib.live == 0
+
+
+def test_strings_read_through_reused_buffers(reflector, lib):
+    player = reflector.read(None, LOCAL_PLAYER)
+    assert reflector.read_string(player, PLAYER_NAME) == "Fake Player"
+    assert reflector.read_string(player, Hook("Player", "missing", "Ljava/lang/String;")) == ""
+    again = reflector.read(None, LOCAL_PLAYER)
+    assert again != player and reflector.is_same(player, again)
+    reflector.release(player)
+    reflector.release(again)
+    assert lib.live == 0
+
+
+def test_long_strings_grow_the_buffer(reflector, world):
+    reflector.strings = StringBuffers(initial=4, maximum=16)
+    player = world.fields["localPlayer"]
+    with ObjectArena(reflector):
+        reference = reflector.read(None, LOCAL_PLAYER)
+        assert reflector.read_string(reference, PLAYER_NAME) == "Fake Player"
+        assert reflector.strings.allocations == 3
+        player.fields["name"] = "x" * 40
+        # cut short at the largest buffer, less its terminator
+        assert reflector.read_string(reference, PLAYER_NAME) == "x" * 15
+
+
+def test_string_cache_checks_the_object_is_the_same(reflector, lib, world):
+    cache = StringCache(reflector, capacity=2)
+    # slots of npcs with different definitions
+    slots, ids = [], set()
+    for slot, npc in enumerate(world.fields["npcs"].elements):
+        if npc is not None and npc.fields["definition"].fields["id"] not in ids:
+            slots.append(slot)
+            ids.add(npc.fields["definition"].fields["id"])
+    npc = world.fields["npcs"].elements[slots[0]]
+
+    def read_name(slot):
+        reference = reflector.read_array_index(npcs, ReflectionArrayType.OBJECT, slot)
+        definition = reflector.read(reference, NPC_DEFINITION)
+        return cache.read(definition, DEFINITION_NAME, reflector.read(definition, DEFINITION_ID))
+
+    with ObjectArena(reflector):
+        npcs = reflector.read(None, NPCS)
+        name = npc.fields["definition"].fields["name"]
+        assert read_name(slots[0]) == read_name(slots[0]) == name
+        assert (cache.hits, cache.misses, len(cache)) == (1, 1, 1)
+        # the client reloaded the definition
+        key = npc.fields["definition"].fields["id"]
+        npc.fields["definition"] = JavaObject("NPCDefinition", {"id": key, "name": "Renamed"})
+        assert read_name(slots[0]) == "Renamed"
+        assert (cache.hits, cache.misses, len(cache)) == (1, 2, 1)
+        for slot in slots[1:4]:
+            read_name(slot)
+    assert cache.stats() == {"entries": 2, "hits": 1, "misses": 5, "evictions": 2}
+    assert lib.live == 2
+    cache.clear()
+    assert lib.live == 0
+
+    # outside an arena strings are read but not kept
+    with ObjectArena(reflector) as arena:
+        npcs = reflector.read(None, NPCS)
+        reference = reflector.read_array_index(npcs, ReflectionArrayType.OBJECT, slots[1])
+        definition = arena.keep(reflector.read(reference, NPC_DEFINITION))
+    assert cache.read(definition, DEFINITION_NAME, 0) != ""
+    assert len(cache) == 0
+    reflector.release(definition)
+    assert lib.live == 0
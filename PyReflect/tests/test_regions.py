@@ -0,0 +1,75 @@
+import numpy
+import pytest
+
+from fakeclient import FakeLibrary, JavaArray, JavaObject
+from reflection import Hook, Reflector, array_type_for
+from regions import RegionArray
+from RemoteInput import ReflectionArrayType, RemoteInput
+
+BASE_X = Hook("client", "baseX", "I")
+BASE_Y = Hook("client", "baseY", "I")
+TILE_HEIGHTS = Hook("client", "tileHeights", "[[[I")
+
+
+def nested(values: numpy.ndarray) -> JavaArray:
+    if values.ndim == 1:
+        return JavaArray(ReflectionArrayType.INT, values.tolist())
+    return JavaArray(ReflectionArrayType.OBJECT, [nested(row) for row in values])
+
+
+@pytest.fixture
+def heights():
+    return numpy.arange(4 * 13 * 11, dtype=numpy.int32).reshape(4, 13, 11) * 7 - 300
+
+
+@pytest.fixture
+def world(heights):
+    fields = {"baseX": 3200, "baseY": 3200, "tileHeights": nested(heights)}
+    return {"client": JavaObject("client", fields)}
+
+
+@pytest.fixture
+def reflector(world):
+    lib = FakeLibrary(world=world)
+    reflect = RemoteInput(lib)
+    return Reflector(reflect, reflect.EIOS_PairClient(lib.clients[0].pid))
+
+
+@pytest.mark.parametrize(
+    "desc, expected",
+    [
+        ("[I", ReflectionArrayType.INT),
+        ("[[I", ReflectionArrayType.INT),
+        ("[[[B", ReflectionArrayType.BYTE),
+        ("[Ljava/lang/String;", ReflectionArrayType.STRING),
+        ("[[LNPC;", ReflectionArrayType.OBJECT),
+    ],
+)
+def test_array_type_is_the_innermost_element_type(desc, expected):
+    assert array_type_for(desc) == expected
+    assert Hook("a", "b", desc).dimensions == desc.count("[")
+
+
+def test_reads_a_3d_int_region_without_leaking_references(reflector, heights):
+    region = RegionArray(reflector, TILE_HEIGHTS, heights.shape, base=(BASE_X, BASE_Y))
+    value = region.read()
+    assert value.dtype == numpy.int32
+    numpy.testing.assert_array_equal(value, heights)
+    assert reflector.reflect.ri.live == 0
+
+
+def test_reads_again_only_when_the_region_changes(reflector, world, heights):
+    region = RegionArray(reflector, TILE_HEIGHTS, heights.shape, base=(BASE_X, BASE_Y))
+    first = region.read()
+    assert region.read() is first
+    assert region.reads == 1
+
+    world["client"].fields["baseX"] = 3264
+    world["client"].fields["tileHeights"] = nested(heights + 1)
+    numpy.testing.assert_array_equal(region.read(), heights + 1)
+    assert region.reads == 2
+
+
+def test_shape_must_match_the_dimensions(reflector):
+    with pytest.raises(ValueError):
+        RegionArray(reflector, TILE_HEIGHTS, (4, 13))
@@ -0,0 +1,66 @@
+import ctypes.util
+import sys
+
+import pytest
+
+import RemoteInput as remoteinput
+from fakeclient import FakeLibrary
+from RemoteInput import RemoteInput, default_library_path, load_library
+
+LIBC = ctypes.util.find_library("c")
+
+
+def test_the_library_is_opened_on_first_use(tmp_path):
+    missing = str(tmp_path / "libremoteinput.so")
+    reflect = RemoteInput(path=missing)
+    assert not reflect.loaded
+    with pytest.raises(AttributeError):
+        reflect.not_a_function
+    assert not reflect.loaded
+    with pytest.raises(OSError):
+        reflect.EIOS_GetClients(False)
+
+
+@pytest.mark.skipif(LIBC is None or sys.platform == "win32", reason="needs a C library")
+def test_a_library_is_loaded_once_per_path():
+    first = RemoteInput(path=LIBC)
+    second = RemoteInput(path=LIBC)
+    assert first.load().ri is second.load().ri is load_library(LIBC).ri
+    assert first.loaded
+    # none of the functions are exported, so none are bound
+    assert load_library(LIBC).functions == {}
+    with pytest.raises(AttributeError):
+        first._EIOS_GetClients
+
+
+def test_a_given_library_is_bound_at_once(lib, client):
+    reflect = RemoteInput(lib)
+    assert reflect.loaded and reflect.ri is lib
+    assert reflect._EIOS_GetClients is not None
+    assert reflect.EIOS_GetClients(False) == 1
+    assert reflect.EIOS_GetClientPID(0) == client.pid
+
+
+def test_clients_are_listed_before_the_first_query():
+    lib = FakeLibrary(clients=2)
+    reflect = RemoteInput(lib)
+    target = reflect.EIOS_PairClient(reflect.EIOS_GetClientPID(0))
+    assert target and lib.clients[0].paired
+    assert reflect.EIOS_GetClientPID(1) == lib.clients[1].pid
+    assert reflect.EIOS_GetClients(True) == 1
+    assert reflect.EIOS_GetClientPID(0) == lib.clients[1].pid
+
+
+def test_library_path(monkeypatch):
+    monkeypatch.setenv("REMOTEINPUT_LIBRARY", "/opt/libremoteinput.so")
+    assert default_library_path() == "/opt/libremoteinput.so"
+    monkeypatch.delenv("REMOTEINPUT_LIBRARY")
+    assert default_library_path().startswith("./libremoteinput.")
+
+
+def test_key_constants_are_imported_when_used():
+    with pytest.raises(AttributeError):
+        remoteinput.NOT_A_KEY
+    # hex_keycodes is the gist linked from RemoteInput's docstring, not part of the repo
+    hex_keycodes = pytest.importorskip("hex_keycodes")
+    assert remoteinput.VK_ESC == hex_keycodes.VK_ESC
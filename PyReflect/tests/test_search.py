@@ -0,0 +1,144 @@
+import numpy
+import pytest
+
+from fakeclient import SQUARE, SQUARE_COLOUR
+from frame import BLUE, GREEN, RED, Frame
+from search import (
+    CTS_HSL,
+    CTS_RGB,
+    ColorMask,
+    CountColor,
+    FindBitmap,
+    FindBitmaps,
+    FindColor,
+    FindColors,
+    FindColorTolerance,
+    color_to_rgb,
+    rgb_to_color,
+    rgb_to_hsl,
+)
+
+BOXES = [None, (10, 5, 70, 40), (-5, -5, 500, 500)]
+
+
+@pytest.fixture
+def pixels():
+    rng = numpy.random.default_rng(7)
+    pixels = rng.integers(0, 256, (90, 130, 4), dtype=numpy.uint8)
+    # a few flat areas, so exact searches and greys have something to find
+    pixels[20:30, 40:60, :3] = (0x10, 0x20, 0x30)
+    pixels[60:70, 0:10, :3] = 128
+    return pixels
+
+
+def frame_of(pixels):
+    height, width = pixels.shape[:2]
+    return Frame(bytearray(pixels.tobytes()), width, height)
+
+
+def expected_mask(pixels, color, tolerance, cts, hue_mod=0.2, sat_mod=0.2):
+    # the definitions, pixel by pixel
+    r, g, b = color_to_rgb(color)
+    if cts == CTS_RGB:
+        difference = numpy.abs(pixels[..., :3].astype(int) - (b, g, r))
+        return (difference <= tolerance).all(axis=-1)
+    hue, saturation, lightness = rgb_to_hsl(numpy.array([b, g, r], dtype=numpy.uint8))
+    hsl = rgb_to_hsl(pixels)
+    hue_delta = numpy.abs(hsl[..., 0] - hue)
+    hue_delta = numpy.minimum(hue_delta, 100 - hue_delta)
+    return (
+        (hue_delta <= tolerance * hue_mod)
+        & (numpy.abs(hsl[..., 1] - saturation) <= tolerance * sat_mod)
+        & (numpy.abs(hsl[..., 2] - lightness) <= tolerance)
+    )
+
+
+def clip(mask, box):
+    if box is None:
+        return mask
+    x1, y1, x2, y2 = box
+    return mask[max(y1, 0) : y2 + 1, max(x1, 0) : x2 + 1]
+
+
+@pytest.mark.parametrize("cts", [CTS_RGB, CTS_HSL])
+@pytest.mark.parametrize("tolerance", [0, 5, 20])
+@pytest.mark.parametrize("box", BOXES)
+def test_frames_and_arrays_find_the_same_pixels(pixels, cts, tolerance, box):
+    for y, x in ((25, 50), (65, 5), (3, 7)):
+        color = rgb_to_color(*(int(value) for value in pixels[y, x, 2::-1]))
+        expected = clip(expected_mask(pixels, color, tolerance, cts), box)
+        for image in (pixels, frame_of(pixels)):
+            mask, left, top = ColorMask(image, color, tolerance, box, cts)
+            assert (left, top) == ((max(box[0], 0), max(box[1], 0)) if box else (0, 0))
+            assert numpy.array_equal(mask, expected)
+            assert CountColor(image, color, box, tolerance, cts) == expected.sum()
+            points = FindColors(image, color, box, tolerance, cts)
+            rows, columns = numpy.nonzero(expected)
+            assert points.tolist() == [[left + x, top + y] for y, x in zip(rows, columns)]
+            first = FindColorTolerance(image, color, tolerance, box, cts)
+            assert first == (tuple(points[0]) if len(points) else None)
+
+
+def test_find_color_is_exact(pixels):
+    assert FindColor(pixels, rgb_to_color(0x30, 0x20, 0x10)) == (40, 20)
+    assert FindColor(pixels, rgb_to_color(0x30, 0x20, 0x10), (45, 0, 129, 89)) == (45, 20)
+    pixels[..., :3] = 0
+    assert FindColor(frame_of(pixels), rgb_to_color(1, 2, 3)) is None
+
+
+def test_frame_searches_share_views(pixels):
+    frame = frame_of(pixels)
+    CountColor(frame, 0x102030, tolerance=10, cts=CTS_HSL)
+    pairs = frame.cached("hsl pairs")
+    assert pairs is not None
+    CountColor(frame, 0x808080, tolerance=4, cts=CTS_HSL)
+    assert frame.cached("hsl pairs") is pairs
+
+    CountColor(frame, 0x102030, tolerance=10)
+    planes = [frame.cached(("plane", channel)) for channel in (BLUE, GREEN, RED)]
+    assert all(plane is not None for plane in planes)
+    FindColors(frame, 0x808080, tolerance=3)
+    assert frame.cached(("plane", BLUE)) is planes[0]
+    mask = frame.cached(("mask", 0x808080, 3, CTS_RGB))
+    assert ColorMask(frame, 0x808080, 3, (10, 10, 20, 20))[0].base is mask
+
+
+def test_views_are_dropped_when_the_image_updates(reflect, target, client):
+    reflect.EIOS_UpdateImageBuffer(target)
+    frame = Frame.from_target(reflect, target)
+    blue, green, red, _ = SQUARE_COLOUR
+    color = rgb_to_color(red, green, blue)
+    assert FindColors(frame, color, tolerance=2)[0].tolist() == list(client.square)
+    assert frame.cached(("plane", BLUE)) is not None
+    reflect.EIOS_UpdateImageBuffer(target)
+    assert frame.stale
+    assert frame.cached(("plane", BLUE)) is None
+    assert FindColors(frame, color, tolerance=2)[0].tolist() == list(client.square)
+    assert CountColor(frame, color, tolerance=2) == SQUARE * SQUARE
+
+
+def test_unknown_mode_raises(pixels):
+    with pytest.raises(ValueError):
+        CountColor(pixels, 0, tolerance=1, cts="lab")
+
+
+def test_bitmaps(pixels):
+    bitmap = pixels[40:46, 90:98].copy()
+    assert FindBitmap(pixels, bitmap) == (90, 40)
+    assert FindBitmap(frame_of(pixels), frame_of(bitmap)) == (90, 40)
+    assert FindBitmap(pixels, bitmap, (91, 0, 129, 89)) is None
+
+    noisy = bitmap.astype(int)
+    noisy[..., :3] += 3
+    noisy = numpy.clip(noisy, 0, 255).astype(numpy.uint8)
+    assert FindBitmap(pixels, noisy) is None
+    assert FindBitmap(pixels, noisy, tolerance=3) == (90, 40)
+
+    # transparent pixels match anything
+    bitmap[0, 0, :3] = (1, 2, 3)
+    assert FindBitmap(pixels, bitmap) is None
+    assert FindBitmap(pixels, bitmap, transparent=rgb_to_color(3, 2, 1)) == (90, 40)
+
+    pixels[70:76, 10:18] = pixels[40:46, 90:98]
+    corners = FindBitmaps(pixels, pixels[40:46, 90:98].copy())
+    assert corners.tolist() == [[90, 40], [10, 70]]
@@ -0,0 +1,105 @@
+import gc
+import multiprocessing
+
+import numpy
+import pytest
+
+from sharedframes import SharedFrameRing
+
+
+def pixels(value, width=8, height=4):
+    return numpy.full((height, width, 4), value, numpy.uint8)
+
+
+@pytest.fixture
+def ring():
+    ring = SharedFrameRing.create(8, 4, slots=2)
+    yield ring
+    ring.close()
+
+
+def test_published_frames_read_back_until_their_slot_is_reused(ring):
+    assert ring.latest() is None and ring.get(0) is None
+    first = ring.publish(pixels(1), 1.5)
+    captured = ring.get(first)
+    assert captured.sequence == first and captured.timestamp == 1.5
+    assert captured.frame.array.shape == (4, 8, 4)
+    assert (captured.frame.array == 1).all()
+    assert not captured.frame.array.flags.writeable
+
+    second = ring.publish(pixels(2, width=4, height=2), 2.5)
+    assert ring.latest().sequence == second == ring.latest_sequence
+    assert ring.latest().frame.array.shape == (2, 4, 4)
+    assert ring.valid(captured)
+
+    ring.publish(pixels(3), 3.5)
+    assert not ring.valid(captured)
+    assert ring.get(first) is None
+
+
+def test_a_frame_too_large_is_refused(ring):
+    with pytest.raises(ValueError):
+        ring.publish(pixels(0, width=9), 0.0)
+    with pytest.raises(ValueError):
+        SharedFrameRing.create(8, 4, slots=1)
+
+
+def read(name, sequence, answers):
+    ring = SharedFrameRing.attach(name)
+    captured = ring.get(sequence)
+    answers.put(int(captured.frame.array.sum()))
+    ring.close()
+
+
+def test_another_process_reads_by_name(ring):
+    sequence = ring.publish(pixels(3), 0.0)
+    answers = multiprocessing.Queue()
+    worker = multiprocessing.Process(target=read, args=(ring.name, sequence, answers))
+    worker.start()
+    assert answers.get(timeout=10) == 3 * 8 * 4 * 4
+    worker.join(10)
+    assert worker.exitcode == 0
+
+
+def test_a_ring_closes_its_block_normally_once_its_frames_are_gone():
+    ring = SharedFrameRing.create(8, 4, slots=2)
+    frame = ring.get(ring.publish(pixels(1), 0.0)).frame
+    del frame
+    closes = []
+    close = ring.memory.close
+
+    def counted():
+        closes.append(True)
+        close()
+
+    ring.memory.close = counted
+    ring.close()
+    # the buffers it wrote through and the header views are let go of first
+    assert len(closes) == 1
+
+
+def test_the_owner_frees_the_ring_while_frames_are_alive():
+    ring = SharedFrameRing.create(8, 4, slots=2)
+    sequence = ring.publish(pixels(5), 0.0)
+    array = ring.get(sequence).frame.array
+    buffer = ring.buffer(sequence + 1, 8, 4)
+    ring.close()
+    gc.collect()
+    with pytest.raises(FileNotFoundError):
+        SharedFrameRing.attach(ring.name)
+    # still mapped here until they're gone
+    assert (array == 5).all()
+    del array, buffer
+    gc.collect()
+
+
+def test_a_reader_detaches_while_frames_are_alive(ring):
+    sequence = ring.publish(pixels(5), 0.0)
+    reader = SharedFrameRing.attach(ring.name)
+    array = reader.get(sequence).frame.array
+    reader.close()
+    gc.collect()
+    assert (array == 5).all()
+    assert ring.get(sequence) is not None
+    del array
+    gc.collect()
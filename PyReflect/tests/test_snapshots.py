@@ -0,0 +1,94 @@
+import pytest
+
+from fakeclient import JavaObject
+from reflection import Hook
+from snapshots import Table, TickSnapshots
+
+CYCLE = Hook("client", "loginState", "I")
+PLANE = Hook("client", "plane", "I")
+NPCS = Table(
+    "npcs",
+    Hook("client", "npcs", "[LNPC;"),
+    [Hook("NPC", name, "I") for name in ("x", "y", "index", "health")],
+    key="index",
+)
+
+
+@pytest.fixture
+def world(client):
+    return client.world["client"]
+
+
+@pytest.fixture
+def state(reflector):
+    return TickSnapshots(reflector, values=[PLANE], tables=[NPCS], tick=CYCLE)
+
+
+def test_a_tick_is_read_once(state, world, lib):
+    snapshot = state.current()
+    assert state.current() is snapshot and snapshot.tick == 30
+    world.fields["plane"] = 2
+    assert state.current()["plane"] == 0
+    world.fields["loginState"] = 31
+    later = state.current()
+    assert later["plane"] == 2 and later.changed("plane")
+    assert later.previous.tick == snapshot.tick and later.previous.values == snapshot.values
+    assert later.previous.previous is None and snapshot.previous is None
+    latest = state.refresh()
+    assert latest.previous.values == later.values and latest.previous.previous is None
+    # taking a snapshot doesn't change the ones before
+    assert later.previous.tick == snapshot.tick
+    assert state.stats() == {"taken": 3, "shared": 2}
+    assert lib.live == 0
+
+
+def test_records_are_the_non_null_elements(state, world):
+    slots = world.fields["npcs"].elements
+    records = list(state.current().records("npcs"))
+    assert [record.index for record in records] == [i for i, npc in enumerate(slots) if npc]
+    npc = slots[records[3].index]
+    assert (records[3].x, records[3].health) == (npc.fields["x"], npc.fields["health"])
+    with pytest.raises(AttributeError):
+        records[0].animation
+
+
+def test_diff_against_the_previous_tick(state, world):
+    first = state.current()
+    spawned = first.diff("npcs").spawned
+    assert spawned.tolist() == first["npcs"].indices.tolist()
+    assert first.diff("npcs") is first.diff("npcs")
+
+    slots = world.fields["npcs"].elements
+    slots[1].fields["x"] += 128
+    slots[3].fields["health"] -= 1
+    slots[5] = None
+    slots[7].fields["index"] = 9999
+    slots[8] = JavaObject("NPC", {"x": 64, "y": 64, "index": 8, "health": 10})
+    world.fields["loginState"] = 31
+    second = state.current()
+    # diffed after the tick after it, still against its own previous
+    world.fields["loginState"] = 32
+    state.current()
+    diff = second.diff("npcs")
+    assert diff.spawned.tolist() == [7, 8]
+    assert diff.despawned.tolist() == [5, 7]
+    assert diff.moved.tolist() == [1]
+    assert {name: changed.tolist() for name, changed in diff.changed.items()} == {
+        "x": [1],
+        "health": [3],
+    }
+
+
+def test_a_null_array_is_an_empty_table(state, world):
+    world.fields["npcs"] = None
+    snapshot = state.current()
+    assert len(snapshot["npcs"]) == 0 and list(snapshot.records("npcs")) == []
+
+
+def test_snapshots_hold_values_only(reflector):
+    with pytest.raises(ValueError):
+        TickSnapshots(reflector, values=[Hook("client", "localPlayer", "LPlayer;")])
+    with pytest.raises(ValueError):
+        Table("player", Hook("client", "localPlayer", "LPlayer;"), [])
+    with pytest.raises(ValueError):
+        Table("npcs", NPCS.array, NPCS.hooks, key="id")
@@ -0,0 +1,106 @@
+import time
+
+import pytest
+
+from timeline import InputScheduler, Timeline
+
+VK_A, VK_SHIFT, LEFT = 0x41, 0x10, 1
+
+
+def inputs(client):
+    return [(function, args) for _, function, args in client.inputs]
+
+
+def test_timelines_are_written_like_scripts():
+    timeline = (
+        Timeline()
+        .tap_key(VK_A, 0.1)
+        .wait(0.2)
+        .click(5, 6, LEFT, 0.05)
+        .send_string("ab", 10, 5)
+        .move_mouse(0, 0)
+    )
+    assert [(round(at, 3), method) for at, method, _ in timeline.events] == [
+        (0.0, "EIOS_HoldKey"),
+        (0.1, "EIOS_ReleaseKey"),
+        (0.3, "EIOS_MoveMouse"),
+        (0.3, "EIOS_HoldMouse"),
+        (0.35, "EIOS_ReleaseMouse"),
+        (0.35, "EIOS_SendString"),
+        (0.38, "EIOS_MoveMouse"),
+    ]
+    assert timeline.duration == pytest.approx(0.38)
+    later = timeline.shifted(1.0)
+    assert later.events[0].at == 1.0 and later.cursor == pytest.approx(timeline.cursor + 1.0)
+    assert len(later) == len(timeline) and timeline.events[0].at == 0.0
+
+
+def test_events_go_out_in_time_order_never_early(reflect, target, client):
+    first = Timeline().move_mouse(1, 1).wait(0.06).move_mouse(3, 3)
+    second = Timeline().wait(0.03).move_mouse(2, 2).wait(0.06).move_mouse(4, 4)
+    with InputScheduler(reflect) as scheduler:
+        start = time.perf_counter() + 0.02
+        handles = [scheduler.schedule(target, timeline, start) for timeline in (first, second)]
+        assert all(handle.wait(5) for handle in handles)
+    assert [args for _, args in inputs(client)] == [(1, 1), (2, 2), (3, 3), (4, 4)]
+    due = sorted(start + event.at for timeline in (first, second) for event in timeline.events)
+    assert all(sent >= at for (sent, _, _), at in zip(client.inputs, due))
+    metrics = scheduler.metrics()
+    assert metrics["sent"] == 4 and 0 <= metrics["p50_error"] <= metrics["max_error"]
+
+
+def test_cancelling_releases_what_is_held(reflect, target, client):
+    timeline = Timeline().hold_key(VK_SHIFT).hold_mouse(5, 6, LEFT).wait(10).release_key(VK_SHIFT)
+    with InputScheduler(reflect) as scheduler:
+        handle = scheduler.schedule(target, timeline)
+        deadline = time.monotonic() + 5
+        while len(client.inputs) < 2 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert client.keys == {VK_SHIFT} and client.buttons == {LEFT}
+        scheduler.cancel(handle)
+        assert handle.wait(5) and handle.cancelled
+    assert not client.keys and not client.buttons
+    assert inputs(client)[2:] == [
+        ("EIOS_ReleaseKey", (VK_SHIFT,)),
+        ("EIOS_ReleaseMouse", (5, 6, LEFT)),
+    ]
+
+
+def test_cancelling_while_the_last_event_is_due(reflect, target, client):
+    # spins through the whole wait, so cancel() can't wake it before the event is taken
+    timeline = Timeline().hold_key(VK_SHIFT).wait(0.2).move_mouse(1, 1)
+    with InputScheduler(reflect, spin=1.0) as scheduler:
+        handle = scheduler.schedule(target, timeline)
+        deadline = time.monotonic() + 5
+        while not client.keys and time.monotonic() < deadline:
+            time.sleep(0.01)
+        scheduler.cancel(handle)
+        assert handle.wait(5) and handle.cancelled
+    assert not client.keys
+    assert inputs(client) == [("EIOS_HoldKey", (VK_SHIFT,)), ("EIOS_ReleaseKey", (VK_SHIFT,))]
+
+
+def test_stopping_cancels_the_rest(reflect, target, client):
+    scheduler = InputScheduler(reflect).start()
+    handle = scheduler.schedule(target, Timeline().hold_key(VK_A).wait(10).release_key(VK_A))
+    deadline = time.monotonic() + 5
+    while not client.keys and time.monotonic() < deadline:
+        time.sleep(0.01)
+    scheduler.stop(5)
+    assert handle.done and handle.cancelled
+    assert not client.keys
+    with pytest.raises(RuntimeError):
+        scheduler.start().start()
+    scheduler.stop(5)
+
+
+def test_errors_end_the_timeline(reflect, target):
+    def fail():
+        raise OSError("gone")
+
+    with InputScheduler(reflect) as scheduler:
+        handle = scheduler.call_at(target, time.perf_counter(), fail)
+        assert handle.wait(5)
+    assert isinstance(handle.error, OSError) and handle.cancelled
+    empty = InputScheduler(reflect).schedule(target, Timeline())
+    assert empty.done
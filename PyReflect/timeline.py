@@ -0,0 +1,375 @@
+"""
+Timed input sequences, sent by a scheduler thread instead of paced with time.sleep.
+
+A Timeline is a list of input events at offsets from its start, written like a script
+where wait() moves the time the next event goes at:
+
+    login = (
+        Timeline()
+        .tap_key(VK_ESC, 0.3).wait(0.3)
+        .click(478, 294, VK_LBUTTON, 0.3).wait(0.3)
+        .send_string(password, 100, 100)
+    )
+    scheduler = InputScheduler(reflect).start()
+    handle = scheduler.schedule(eios_ptr, login)
+    ...                          # the script carries on
+    handle.wait()
+    print(scheduler.metrics())   # how late the events were sent
+
+The scheduler sleeps until just before an event is due and spins on perf_counter for the
+rest, so events go out within microseconds of their time instead of the 1-15 ms an OS
+sleep is off by, at the cost of `spin` seconds of one core per event.
+
+Events are sent one at a time on that one thread, for every target. A call that takes
+long holds back everything due while it runs: EIOS_SendString blocks for the whole
+string, keywait and keymodwait included, so the other targets' events go out that much
+late. Send long text in short pieces, or give each client its own InputScheduler.
+"""
+import heapq
+import itertools
+import platform
+import threading
+import time
+from collections import deque
+from typing import Callable, List, NamedTuple, Optional
+
+# last part of every wait spent spinning, Windows sleeps are far coarser
+SPIN = 0.016 if platform.system() == "Windows" else 0.002
+
+
+class Event(NamedTuple):
+    # seconds after the timeline starts
+    at: float
+    # RemoteInput method name, called with the target and `args`
+    method: str
+    args: tuple
+
+
+class Timeline:
+    """
+    Input events at offsets from a start time, built up in order.
+    """
+
+    def __init__(self):
+        self.events: List[Event] = []
+        # where the next event goes
+        self.cursor = 0.0
+
+    def __len__(self) -> int:
+        return len(self.events)
+
+    @property
+    def duration(self) -> float:
+        return max((event.at for event in self.events), default=0.0)
+
+    def add(self, method: str, *args, delay: float = 0.0) -> "Timeline":
+        """
+        Calls RemoteInput.`method`(target, *args) `delay` seconds after the cursor.
+        """
+        self.events.append(Event(self.cursor + delay, method, args))
+        return self
+
+    def wait(self, seconds: float) -> "Timeline":
+        """
+        Moves the cursor `seconds` later.
+        """
+        self.cursor += seconds
+        return self
+
+    def hold_key(self, key: int) -> "Timeline":
+        return self.add("EIOS_HoldKey", key)
+
+    def release_key(self, key: int) -> "Timeline":
+        return self.add("EIOS_ReleaseKey", key)
+
+    def tap_key(self, key: int, hold: float = 0.05) -> "Timeline":
+        """
+        Holds `key` for `hold` seconds; the cursor ends up at the release.
+        """
+        return self.hold_key(key).wait(hold).release_key(key)
+
+    def move_mouse(self, x: int, y: int) -> "Timeline":
+        return self.add("EIOS_MoveMouse", x, y)
+
+    def hold_mouse(self, x: int, y: int, button: int) -> "Timeline":
+        return self.add("EIOS_HoldMouse", x, y, button)
+
+    def release_mouse(self, x: int, y: int, button: int) -> "Timeline":
+        return self.add("EIOS_ReleaseMouse", x, y, button)
+
+    def click(self, x: int, y: int, button: int, hold: float = 0.05) -> "Timeline":
+        """
+        Moves to (x, y) and holds `button` for `hold` seconds.
+        """
+        self.move_mouse(x, y).hold_mouse(x, y, button)
+        return self.wait(hold).release_mouse(x, y, button)
+
+    def send_string(self, text: str, keywait: int, keymodwait: int) -> "Timeline":
+        """
+        EIOS_SendString blocks for about len(text) * keywait ms, the cursor is moved past it.
+        The scheduler sends nothing else meanwhile, to any target.
+        """
+        self.add("EIOS_SendString", text, keywait, keymodwait)
+        return self.wait(len(text) * (keywait + keymodwait) / 1000.0)
+
+    def shifted(self, seconds: float) -> "Timeline":
+        """
+        A copy with every event `seconds` later.
+        """
+        timeline = Timeline()
+        timeline.events = [event._replace(at=event.at + seconds) for event in self.events]
+        timeline.cursor = self.cursor + seconds
+        return timeline
+
+
+class ScheduledTimeline:
+    """
+    A timeline given to an InputScheduler.
+    """
+
+    def __init__(self, target, start: float, remaining: int):
+        self.target = target
+        # perf_counter() time of offset 0
+        self.start = start
+        self.remaining = remaining
+        self.cancelled = False
+        self.error: Optional[BaseException] = None
+        # keys and (x, y, button) held and not released yet
+        self.held_keys = set()
+        self.held_buttons = set()
+        self._done = threading.Event()
+
+    @property
+    def done(self) -> bool:
+        return self._done.is_set()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """
+        Waits until every event was sent or the timeline was cancelled.
+        """
+        return self._done.wait(timeout)
+
+
+class InputScheduler:
+    """
+    Sends the events of every scheduled timeline on one thread, in time order.
+
+    Metrics are about `error`, how much later than asked an event was sent.
+    """
+
+    def __init__(self, reflect, spin: float = SPIN, history: int = 4096):
+        """
+        :param reflect: a RemoteInput instance
+        :param spin: seconds before an event to stop sleeping and start spinning
+        :param history: number of recent errors kept for the percentiles
+        """
+        self.reflect = reflect
+        self.spin = spin
+        # (deadline, order, scheduled, method, args)
+        self._queue = []
+        self._order = itertools.count()
+        self._condition = threading.Condition()
+        self._stop = False
+        self._thread = None
+        self._errors = deque(maxlen=history)
+        self.reset_metrics()
+
+    def start(self) -> "InputScheduler":
+        if self._thread is not None:
+            raise RuntimeError("InputScheduler is already running")
+        self._stop = False
+        self._thread = threading.Thread(target=self._run, name="InputScheduler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """
+        Stops the thread, cancelling whatever is still scheduled.
+        """
+        with self._condition:
+            self._stop = True
+            self._condition.notify()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+    def schedule(
+        self, target, timeline: Timeline, start: Optional[float] = None
+    ) -> ScheduledTimeline:
+        """
+        Sends the events of `timeline` to `target`, offset 0 being `start`, a perf_counter()
+        time, or now. Returns at once.
+        """
+        if start is None:
+            start = time.perf_counter()
+        scheduled = ScheduledTimeline(target, start, len(timeline.events))
+        if not timeline.events:
+            scheduled._done.set()
+            return scheduled
+        with self._condition:
+            for event in timeline.events:
+                entry = (start + event.at, next(self._order), scheduled, event.method, event.args)
+                heapq.heappush(self._queue, entry)
+            self._condition.notify()
+        return scheduled
+
+    def call_at(self, target, deadline: float, function: Callable, *args) -> ScheduledTimeline:
+        """
+        Calls `function(*args)` on the scheduler thread at perf_counter() time `deadline`.
+        """
+        scheduled = ScheduledTimeline(target, deadline, 1)
+        with self._condition:
+            heapq.heappush(self._queue, (deadline, next(self._order), scheduled, function, args))
+            self._condition.notify()
+        return scheduled
+
+    def cancel(self, scheduled: ScheduledTimeline) -> None:
+        """
+        Drops the events of `scheduled` not sent yet and releases what it holds.
+        """
+        with self._condition:
+            scheduled.cancelled = True
+            self._condition.notify()
+
+    ## metrics
+
+    def reset_metrics(self) -> None:
+        self.sent = 0
+        self.total_error = 0.0
+        self.max_error = 0.0
+        self._errors.clear()
+
+    def metrics(self, late: float = 0.001) -> dict:
+        """
+        :param late: error in seconds from which an event counts as late
+        :return: event count and error statistics in seconds
+        """
+        errors = sorted(self._errors)
+
+        def percentile(fraction: float) -> float:
+            if not errors:
+                return 0.0
+            return errors[min(int(fraction * len(errors)), len(errors) - 1)]
+
+        return {
+            "sent": self.sent,
+            "late": sum(1 for error in errors if error > late),
+            "mean_error": self.total_error / self.sent if self.sent else 0.0,
+            "max_error": self.max_error,
+            "p50_error": percentile(0.5),
+            "p99_error": percentile(0.99),
+        }
+
+    ## scheduler thread
+
+    def _wait_until(self, deadline: float) -> bool:
+        """
+        Sleeps, then spins, until `deadline`. Called holding the condition.
+
+        :return: False if woken early by schedule(), cancel() or stop()
+        """
+        remaining = deadline - time.perf_counter()
+        if remaining > self.spin:
+            # schedule() may add an earlier event, so look again after waking
+            self._condition.wait(remaining - self.spin)
+            return False
+        self._condition.release()
+        try:
+            while time.perf_counter() < deadline:
+                pass
+        finally:
+            self._condition.acquire()
+        return True
+
+    def _run(self) -> None:
+        queue = self._queue
+        with self._condition:
+            while not self._stop:
+                self._release_cancelled()
+                if not queue:
+                    self._condition.wait()
+                    continue
+                deadline = queue[0][0]
+                if not self._wait_until(deadline):
+                    continue
+                if not queue or queue[0][0] != deadline:
+                    continue
+                _, _, scheduled, method, args = heapq.heappop(queue)
+                if not scheduled.cancelled:
+                    self._condition.release()
+                    try:
+                        self._send(scheduled, method, args, deadline)
+                    finally:
+                        self._condition.acquire()
+                if scheduled.cancelled:
+                    # cancelled while spinning or sending, or sending failed: this event
+                    # may have been its last one in the queue
+                    self._finish_cancelled(scheduled)
+            # stopping cancels the rest
+            for entry in queue:
+                entry[2].cancelled = True
+            self._release_cancelled()
+
+    def _send(self, scheduled: ScheduledTimeline, method, args, deadline: float) -> None:
+        sent = time.perf_counter()
+        try:
+            if callable(method):
+                method(*args)
+            else:
+                getattr(self.reflect, method)(scheduled.target, *args)
+                self._track_held(scheduled, method, args)
+        except Exception as error:
+            scheduled.error = error
+            scheduled.cancelled = True
+        error = sent - deadline
+        self.sent += 1
+        self.total_error += error
+        self.max_error = max(self.max_error, error)
+        self._errors.append(error)
+        scheduled.remaining -= 1
+        if scheduled.remaining == 0:
+            scheduled._done.set()
+
+    @staticmethod
+    def _track_held(scheduled: ScheduledTimeline, method: str, args: tuple) -> None:
+        if method == "EIOS_HoldKey":
+            scheduled.held_keys.add(args[0])
+        elif method == "EIOS_ReleaseKey":
+            scheduled.held_keys.discard(args[0])
+        elif method == "EIOS_HoldMouse":
+            scheduled.held_buttons.add(args)
+        elif method == "EIOS_ReleaseMouse":
+            button = args[2]
+            scheduled.held_buttons = {held for held in scheduled.held_buttons if held[2] != button}
+
+    def _release_cancelled(self) -> None:
+        """
+        Removes the events of cancelled timelines and releases what they held.
+        Called holding the condition.
+        """
+        cancelled = {id(entry[2]): entry[2] for entry in self._queue if entry[2].cancelled}
+        if not cancelled:
+            return
+        self._queue[:] = [entry for entry in self._queue if not entry[2].cancelled]
+        heapq.heapify(self._queue)
+        for scheduled in cancelled.values():
+            self._finish_cancelled(scheduled)
+
+    def _finish_cancelled(self, scheduled: ScheduledTimeline) -> None:
+        """
+        Releases what a cancelled timeline holds and marks it done.
+        """
+        reflect, target = self.reflect, scheduled.target
+        for key in scheduled.held_keys:
+            reflect.EIOS_ReleaseKey(target, key)
+        for x, y, button in scheduled.held_buttons:
+            reflect.EIOS_ReleaseMouse(target, x, y, button)
+        scheduled.held_keys.clear()
+        scheduled.held_buttons.clear()
+        scheduled._done.set()